@@ -0,0 +1,346 @@
+from typing import Iterator, Optional, Union
+
+from chess.board import Board
+from chess.constants import POSITION
+from chess.fen import Fen
+from chess.pieces import EMPTY_SQUARE, Empty, Piece
+
+# Squares are numbered 0-63 from a1 (0) to h8 (63), so bit n of a bitboard is
+# the square at row n // 8 + 1, col n % 8 + 1.
+ROOK_DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def square_index(row: int, col: int) -> int:
+    return (row - 1) * 8 + (col - 1)
+
+
+def square_position(sq: int) -> POSITION:
+    return (sq // 8 + 1, sq % 8 + 1)
+
+
+SQUARE_POSITIONS = [((sq >> 3) + 1, (sq & 7) + 1) for sq in range(64)]
+
+
+def iter_squares(bb: int):
+    """Yield the index of every set bit, least significant first."""
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+def _leaper_attacks(offsets: list[tuple[int, int]]) -> list[int]:
+    table = []
+    for sq in range(64):
+        row, col = square_position(sq)
+        bb = 0
+        for d_row, d_col in offsets:
+            r, c = row + d_row, col + d_col
+            if 1 <= r <= 8 and 1 <= c <= 8:
+                bb |= 1 << square_index(r, c)
+        table.append(bb)
+    return table
+
+
+def _rays(d_row: int, d_col: int) -> list[int]:
+    table = []
+    for sq in range(64):
+        row, col = square_position(sq)
+        bb = 0
+        r, c = row + d_row, col + d_col
+        while 1 <= r <= 8 and 1 <= c <= 8:
+            bb |= 1 << square_index(r, c)
+            r, c = r + d_row, c + d_col
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks(
+    [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+)
+KING_ATTACKS = _leaper_attacks(
+    [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+)
+# Squares attacked by a pawn of the given colour standing on each square
+PAWN_ATTACKS = {
+    1: _leaper_attacks([(1, 1), (1, -1)]),
+    -1: _leaper_attacks([(-1, 1), (-1, -1)]),
+}
+# Full-length rays per direction, used to find the first blocker on a line
+RAYS = {
+    direction: _rays(*direction)
+    for direction in ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+}
+
+
+def ray_attacks(sq: int, occupied: int, directions: list[tuple[int, int]]) -> int:
+    """
+    Squares a slider on sq attacks along the given directions, stopping at and
+    including the first occupied square on each ray.
+    """
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][sq]
+        blockers = ray & occupied
+        if blockers:
+            # Rays pointing up the board hit the lowest set bit first
+            if direction[0] > 0 or (direction[0] == 0 and direction[1] > 0):
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= RAYS[direction][blocker]
+        attacks |= ray
+    return attacks
+
+
+def _slider_tables(directions: list[tuple[int, int]]) -> tuple[list[int], list[dict]]:
+    """
+    Build, for every square, the mask of blocker squares that matter to a
+    slider and a table mapping each subset of that mask to the attacked
+    squares. The edge square of each ray is left out of the mask since a piece
+    there cannot block anything further along.
+
+    Each ray is enumerated on its own and the rays are then combined, which is
+    much cheaper than running ray_attacks for every occupancy of the full mask.
+    """
+    masks = []
+    tables = []
+    for sq in range(64):
+        mask = 0
+        table = {0: 0}
+        for direction in directions:
+            ray = RAYS[direction][sq]
+            if not ray:
+                continue
+            if direction[0] > 0 or (direction[0] == 0 and direction[1] > 0):
+                edge = ray.bit_length() - 1
+            else:
+                edge = (ray & -ray).bit_length() - 1
+            relevant = ray ^ (1 << edge)
+            mask |= relevant
+
+            # Carry-rippler enumeration of every subset of the relevant squares
+            ray_table = []
+            subset = 0
+            while True:
+                ray_table.append((subset, ray_attacks(sq, subset, [direction])))
+                subset = (subset - relevant) & relevant
+                if not subset:
+                    break
+            table = {
+                occupied | ray_occupied: attacks | ray_attack
+                for occupied, attacks in table.items()
+                for ray_occupied, ray_attack in ray_table
+            }
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+ROOK_MASKS, ROOK_ATTACKS = _slider_tables(ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_ATTACKS = _slider_tables(BISHOP_DIRECTIONS)
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    return ROOK_ATTACKS[sq][occupied & ROOK_MASKS[sq]]
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    return BISHOP_ATTACKS[sq][occupied & BISHOP_MASKS[sq]]
+
+
+def queen_attacks(sq: int, occupied: int) -> int:
+    return (
+        ROOK_ATTACKS[sq][occupied & ROOK_MASKS[sq]]
+        | BISHOP_ATTACKS[sq][occupied & BISHOP_MASKS[sq]]
+    )
+
+
+# Piece keys in self.bitboards by colour
+PIECE_KEYS = {
+    1: {
+        "Pawn": "P",
+        "Knight": "N",
+        "Bishop": "B",
+        "Rook": "R",
+        "Queen": "Q",
+        "King": "K",
+    },
+    -1: {
+        "Pawn": "p",
+        "Knight": "n",
+        "Bishop": "b",
+        "Rook": "r",
+        "Queen": "q",
+        "King": "k",
+    },
+}
+SLIDERS = {"B", "R", "Q", "b", "r", "q"}
+
+
+class BitBoard(Board):
+    """
+    Board backed by one 64-bit integer per piece type and colour plus occupancy
+    masks. A 64-entry mailbox is kept alongside so get_piece stays O(1).
+
+    Optionally (see track_attacks) the board also keeps the attack set of every
+    piece up to date as pieces are changed, so whole-side attack maps can be
+    read without recomputing slider attacks.
+    """
+
+    bitboards: dict[str, int]
+    occupancy: dict[int, int]
+    occupied: int
+    squares: list[Piece]
+    attacks_from: Optional[list[int]]
+
+    def __init__(self, fen: Optional[Fen] = None):
+        self.attacks_from = None
+        super().__init__(fen)
+
+    def create_indexes(self) -> None:
+        self.bitboards = {key: 0 for key in self.piece_key if key != "."}
+        self.occupancy = {1: 0, -1: 0}
+        self.occupied = 0
+
+    def piece_attacks(self, sq: int) -> int:
+        """Squares attacked by the piece on sq with the current occupancy."""
+        piece_str = self.squares[sq].piece_str
+        match piece_str:
+            case "P":
+                return PAWN_ATTACKS[1][sq]
+            case "p":
+                return PAWN_ATTACKS[-1][sq]
+            case "N" | "n":
+                return KNIGHT_ATTACKS[sq]
+            case "B" | "b":
+                return bishop_attacks(sq, self.occupied)
+            case "R" | "r":
+                return rook_attacks(sq, self.occupied)
+            case "Q" | "q":
+                return queen_attacks(sq, self.occupied)
+            case "K" | "k":
+                return KING_ATTACKS[sq]
+        return 0
+
+    def track_attacks(self, enabled: bool = True) -> None:
+        """Start (or stop) maintaining per-piece attack sets incrementally."""
+        if enabled:
+            self.attacks_from = [self.piece_attacks(sq) for sq in range(64)]
+        else:
+            self.attacks_from = None
+
+    def attack_map(self, colour: int) -> int:
+        """Every square attacked by at least one piece of colour."""
+        attacks_from = self.attacks_from
+        attacked = 0
+        for sq in iter_squares(self.occupancy[colour]):
+            if attacks_from is not None:
+                attacked |= attacks_from[sq]
+            else:
+                attacked |= self.piece_attacks(sq)
+        return attacked
+
+    def squares_of(self, colour: int) -> list[int]:
+        return list(iter_squares(self.occupancy[colour]))
+
+    def squares_of_piece(self, piece_str: str) -> list[int]:
+        return list(iter_squares(self.bitboards[piece_str]))
+
+    def find_king(self, colour: int) -> Optional[POSITION]:
+        king = self.bitboards["K" if colour == 1 else "k"]
+        if not king:
+            return None
+        return square_position(king.bit_length() - 1)
+
+    def is_square_attacked(self, row: int, col: int, by_colour: int) -> bool:
+        sq = (row - 1) * 8 + (col - 1)
+        keys = PIECE_KEYS[by_colour]
+        bitboards = self.bitboards
+        if KNIGHT_ATTACKS[sq] & bitboards[keys["Knight"]]:
+            return True
+        if PAWN_ATTACKS[-by_colour][sq] & bitboards[keys["Pawn"]]:
+            return True
+        if KING_ATTACKS[sq] & bitboards[keys["King"]]:
+            return True
+        queens = bitboards[keys["Queen"]]
+        if rook_attacks(sq, self.occupied) & (bitboards[keys["Rook"]] | queens):
+            return True
+        if bishop_attacks(sq, self.occupied) & (bitboards[keys["Bishop"]] | queens):
+            return True
+        return False
+
+    def get_piece(self, row: int, col: int) -> Union[Piece, Empty]:
+        if self.is_impossible(row, col):
+            return EMPTY_SQUARE
+        return self.squares[(row - 1) * 8 + (col - 1)]
+
+    def piece_at(self, sq: int) -> Union[Piece, Empty]:
+        return self.squares[sq]
+
+    def load_fen(self, fen: Fen) -> None:
+        """Set the board up from a FEN, reusing the bitboard dicts."""
+        tracking = self.attacks_from is not None
+        self.attacks_from = None
+        bitboards = self.bitboards
+        occupancy = self.occupancy
+        for piece_str in bitboards:
+            bitboards[piece_str] = 0
+        occupancy[1] = occupancy[-1] = 0
+        squares = self.squares = [self.piece_key["."]] * 64
+        sq = 56
+        for tokens in fen.get_board_str().split('/'):
+            for token in tokens:
+                if token.isnumeric():
+                    sq += int(token)
+                else:
+                    piece = self.piece_key[token]
+                    bitboards[token] |= 1 << sq
+                    occupancy[piece.colour] |= 1 << sq
+                    squares[sq] = piece
+                    sq += 1
+            sq -= 16
+        self.occupied = occupancy[1] | occupancy[-1]
+        if tracking:
+            self.track_attacks()
+
+    def piece_squares(self) -> Iterator[tuple[str, int]]:
+        """The piece_str and square index of every piece on the board."""
+        for piece_str, bitboard in self.bitboards.items():
+            for sq in iter_squares(bitboard):
+                yield piece_str, sq
+
+    @property
+    def board(self) -> list[list[Piece]]:
+        return [self.squares[row * 8:row * 8 + 8] for row in range(8)]
+
+    def change_piece_in_location(self, row: int, col: int, piece: Piece):
+        sq = (row - 1) * 8 + (col - 1)
+        bit = 1 << sq
+        old = self.squares[sq]
+        if old.colour:
+            self.bitboards[old.piece_str] ^= bit
+            self.occupancy[old.colour] ^= bit
+            self.occupied ^= bit
+        if piece.colour:
+            self.bitboards[piece.piece_str] |= bit
+            self.occupancy[piece.colour] |= bit
+            self.occupied |= bit
+        self.squares[sq] = piece
+
+        attacks_from = self.attacks_from
+        if attacks_from is not None:
+            # Only the changed square and sliders whose rays reach it can change
+            attacks_from[sq] = self.piece_attacks(sq)
+            for other in iter_squares(self.occupied & ~bit):
+                if (
+                    attacks_from[other] & bit
+                    and self.squares[other].piece_str in SLIDERS
+                ):
+                    attacks_from[other] = self.piece_attacks(other)
+
+
+if __name__ == "__main__":
+    board = BitBoard()
+    print(board)
@@ -1,8 +1,7 @@
-import logging
-import logging
-from typing import Literal, Optional, Union
+from typing import Iterator, Literal, Optional, Union
 
-from chess.constants import EMPTY, PIECE
+from chess import tracing
+from chess.constants import EMPTY, PIECE, POSITION
 from chess.fen import STARTING_FEN_STR, Fen
 from chess.pieces import (
     Pawn,
@@ -12,13 +11,73 @@ from chess.pieces import (
     Bishop,
     King,
     Queen,
-    Empty
+    Empty,
+    EMPTY_SQUARE,
 )
 
 
+KNIGHT_OFFSETS = [
+    (2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)
+]
+KING_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+ORTHOGONAL_DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+DIAGONAL_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def _square_table(offsets: list[tuple[int, int]]) -> list[list[int]]:
+    """For every square index (a1 = 0), the on-board squares at the offsets."""
+    table = []
+    for sq in range(64):
+        row, col = sq // 8 + 1, sq % 8 + 1
+        table.append([
+            (row + d_row - 1) * 8 + col + d_col - 1
+            for d_row, d_col in offsets
+            if 1 <= row + d_row <= 8 and 1 <= col + d_col <= 8
+        ])
+    return table
+
+
+def _ray_table(directions: list[tuple[int, int]]) -> list[list[list[int]]]:
+    """For every square index, the squares along each direction, nearest first."""
+    table = []
+    for sq in range(64):
+        row, col = sq // 8 + 1, sq % 8 + 1
+        rays = []
+        for d_row, d_col in directions:
+            ray = []
+            r, c = row + d_row, col + d_col
+            while 1 <= r <= 8 and 1 <= c <= 8:
+                ray.append((r - 1) * 8 + c - 1)
+                r, c = r + d_row, c + d_col
+            if ray:
+                rays.append(ray)
+        table.append(rays)
+    return table
+
+
+KNIGHT_SQUARES = _square_table(KNIGHT_OFFSETS)
+KING_SQUARES = _square_table(KING_OFFSETS)
+# Squares a pawn of the given colour on each square captures on
+PAWN_CAPTURE_SQUARES = {
+    1: _square_table([(1, 1), (1, -1)]),
+    -1: _square_table([(-1, 1), (-1, -1)]),
+}
+ORTHOGONAL_RAYS = _ray_table(ORTHOGONAL_DIRECTIONS)
+DIAGONAL_RAYS = _ray_table(DIAGONAL_DIRECTIONS)
+
+
 class Board:
+    """
+    Board held as a list of rows, a1 at board[0][0]. Alongside the rows the
+    board indexes the squares (a1 = 0 ... h8 = 63) of every piece by piece_str
+    and by colour, kept up to date by change_piece_in_location, so pieces can
+    be found without scanning all 64 squares.
+    """
+
     board: list[list[Union[Piece, EMPTY]]]
     piece_key: dict[str, PIECE]
+    piece_index: dict[str, set[int]]
+    colour_index: dict[int, set[int]]
 
     def __init__(self, fen: Optional[Fen] = None):
         self.piece_key = {
@@ -34,8 +93,9 @@ class Board:
             "Q": Queen(1),
             "k": King(-1),
             "K": King(1),
-            ".": Empty()
+            ".": EMPTY_SQUARE,
         }
+        self.create_indexes()
         if fen:
             self.load_fen(fen)
         else:
@@ -43,9 +103,13 @@ class Board:
 
     def get_piece(self, row: int, col: int) -> Union[Piece, Empty]:
         if self.is_impossible(row, col):
-            return Empty()
+            return EMPTY_SQUARE
         return self.board[row-1][col-1]
 
+    def piece_at(self, sq: int) -> Union[Piece, Empty]:
+        """The piece on a square index (a1 = 0 ... h8 = 63)."""
+        return self.board[sq >> 3][sq & 7]
+
     def is_impossible(self, col: int, row: int) -> bool:
         if row > 8 or row < 1 or col > 8 or col < 1:
             return True
@@ -54,24 +118,48 @@ class Board:
     def load_start_position(self):
         self.load_fen(Fen(STARTING_FEN_STR))
 
+    def create_indexes(self) -> None:
+        """The containers of piece locations, which load_fen empties and refills."""
+        self.piece_index = {key: set() for key in self.piece_key if key != "."}
+        self.colour_index = {1: set(), -1: set()}
+
     def load_fen(self, fen: Fen) -> None:
-        # TODO: Validate FEN
+        """Set the board up from a FEN, reusing the piece and colour sets."""
+        piece_index = self.piece_index
+        colour_index = self.colour_index
+        for squares in piece_index.values():
+            squares.clear()
+        colour_index[1].clear()
+        colour_index[-1].clear()
+        trace = tracing.enabled
         board = []
+        sq = 56
         for tokens in fen.get_board_str().split('/'):
             row = []
             for token in tokens:
                 if token.isnumeric():
-                    row += [Empty()] * int(token)
+                    row += [EMPTY_SQUARE] * int(token)
+                    sq += int(token)
                 else:
                     piece = self.piece_key[token]
-                    logging.info(f"Loading piece {token} with colour {piece.colour}")
-                    row.append(piece)
-                    piece = self.piece_key[token]
-                    logging.info(f"Loading piece {token} with colour {piece.colour}")
+                    if trace:
+                        tracing.logger.debug(
+                            "Loading piece %s with colour %d", token, piece.colour
+                        )
                     row.append(piece)
+                    piece_index[token].add(sq)
+                    colour_index[piece.colour].add(sq)
+                    sq += 1
             board.append(row)
+            sq -= 16
         self.board = board[::-1]
 
+    def piece_squares(self) -> Iterator[tuple[str, int]]:
+        """The piece_str and square index of every piece on the board."""
+        for piece_str, squares in self.piece_index.items():
+            for sq in squares:
+                yield piece_str, sq
+
     def __str__(self) -> str:
         s = ["========"]
         for row in self.board:
@@ -80,9 +168,67 @@ class Board:
         return "\n".join(s[::-1])
     
     def change_piece_in_location(self, row: int, col: int, piece: Piece):
+        sq = (row - 1) * 8 + (col - 1)
+        old = self.board[row-1][col-1]
+        if old.colour:
+            self.piece_index[old.piece_str].discard(sq)
+            self.colour_index[old.colour].discard(sq)
+        if piece.colour:
+            self.piece_index[piece.piece_str].add(sq)
+            self.colour_index[piece.colour].add(sq)
         self.board[row-1][col-1] = piece
-    def change_piece_in_location(self, row: int, col: int, piece: Piece):
-        self.board[row-1][col-1] = piece
+
+    def squares_of(self, colour: int) -> list[int]:
+        """Square indices of every piece of colour."""
+        return list(self.colour_index[colour])
+
+    def squares_of_piece(self, piece_str: str) -> list[int]:
+        """Square indices of every piece with the given piece_str, e.g. "N"."""
+        return list(self.piece_index[piece_str])
+
+    def find_king(self, colour: int) -> Optional[POSITION]:
+        kings = self.piece_index["K" if colour == 1 else "k"]
+        if not kings:
+            return None
+        sq = next(iter(kings))
+        return (sq // 8 + 1, sq % 8 + 1)
+
+    def is_square_attacked(self, row: int, col: int, by_colour: int) -> bool:
+        """
+        Whether any piece of by_colour attacks the square, found by looking
+        outward from the square rather than generating the attackers' moves.
+        """
+        for d_row, d_col in KNIGHT_OFFSETS:
+            piece = self.get_piece(row + d_row, col + d_col)
+            if piece.colour == by_colour and type(piece) is Knight:
+                return True
+
+        for d_row, d_col in KING_OFFSETS:
+            piece = self.get_piece(row + d_row, col + d_col)
+            if piece.colour == by_colour and type(piece) is King:
+                return True
+
+        # A pawn attacks diagonally forward, so attackers sit one row behind
+        for d_col in (1, -1):
+            piece = self.get_piece(row - by_colour, col + d_col)
+            if piece.colour == by_colour and type(piece) is Pawn:
+                return True
+
+        for directions, sliders in (
+            (ORTHOGONAL_DIRECTIONS, (Rook, Queen)),
+            (DIAGONAL_DIRECTIONS, (Bishop, Queen)),
+        ):
+            for d_row, d_col in directions:
+                r, c = row + d_row, col + d_col
+                while not self.is_impossible(r, c):
+                    piece = self.board[r-1][c-1]
+                    if piece.colour:
+                        if piece.colour == by_colour and type(piece) in sliders:
+                            return True
+                        break
+                    r, c = r + d_row, c + d_col
+
+        return False
 
 if __name__ == "__main__":
     board = Board()
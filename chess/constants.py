@@ -1,7 +1,6 @@
 from pathlib import Path
 from typing import Literal
 
-EMPTY = Literal['.']
 EMPTY = Literal['.']
 PIECE = Literal['p', 'r', 'n', 'b', 'q', 'k', 'P', 'R', 'N', 'B', 'Q', 'K']
 
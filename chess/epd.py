@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from chess.exceptions import FENError, PGNError
+from chess.fen import parse_epd
+from chess.game import BACKENDS, Game
+from chess.move import code_to_uci
+from chess.pgn import format_san, parse_san
+from chess.search import MAX_DEPTH, Search
+
+# Positions are shipped to the pool as EPD lines, like the FEN strings of
+# chess.parallel, and results come back as plain dicts ready for JSON.
+
+DEFAULT_DEPTH = 4
+
+
+def solution_moves(game: Game, operand: str) -> list[int]:
+    """
+    The moves of a bm or am operand, e.g. "Qg6" or "Rxb2 Nf3+", packed as ints.
+    Raises:
+        PGNError: If a move is illegal or cannot be read
+    """
+    return [parse_san(game, san) for san in operand.split()]
+
+
+def run_position(
+    line: str,
+    depth: Optional[int] = None,
+    nodes: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    hash_mb: float = 16,
+    backend: str = "list",
+) -> dict:
+    """
+    Search one EPD position and check the move found against its bm (best
+    move) and am (avoid move) operations.
+    Args:
+        line: The EPD record
+        depth: The deepest iteration to run
+        nodes: Number of nodes to search before stopping
+        time_limit: Seconds to search before stopping
+        hash_mb: Size of the position's own transposition table
+        backend: The board backend to search with
+    Returns:
+        The position's id, FEN and solutions, the move found (SAN and UCI)
+        with its score, depth, nodes, seconds and nps, and whether it solved
+        the position. A solved position also has the depth, seconds and nodes
+        of the iteration from which the search kept a solution as its best
+        move. A position that cannot be read, or has no bm or am operation
+        to check, has an error instead and is not searched.
+    """
+    record: dict = {"epd": line}
+    try:
+        fen, operations = parse_epd(line)
+        if "bm" not in operations and "am" not in operations:
+            raise FENError("no bm/am operation")
+        game = Game(fen, backend=backend)
+        best = solution_moves(game, operations.get("bm", ""))
+        avoid = solution_moves(game, operations.get("am", ""))
+    except (FENError, PGNError) as error:
+        record["error"] = str(error)
+        return record
+    record = {
+        "id": operations.get("id", ""),
+        "fen": str(fen),
+        "bm": [format_san(game, code) for code in best],
+        "am": [format_san(game, code) for code in avoid],
+    }
+    best_uci = {code_to_uci(code) for code in best}
+    avoid_uci = {code_to_uci(code) for code in avoid}
+
+    def is_solution(uci: Optional[str]) -> bool:
+        if uci is None:
+            return False
+        if best_uci and uci not in best_uci:
+            return False
+        return uci not in avoid_uci
+
+    # Time to solution: the first iteration of the run of solving iterations
+    # that the search ended on
+    solved_at = None
+
+    def on_iteration(result) -> None:
+        nonlocal solved_at
+        if not is_solution(str(result.best_move)):
+            solved_at = None
+        elif solved_at is None:
+            solved_at = (result.depth, result.seconds, result.nodes)
+
+    search = Search(game, hash_mb)
+    result = search.search(
+        depth=depth if depth is not None else MAX_DEPTH,
+        time_limit=time_limit,
+        nodes=nodes,
+        on_iteration=on_iteration,
+    )
+    uci = str(result.best_move) if result.best_move is not None else None
+    solved = is_solution(uci)
+    if solved and solved_at is None:
+        # Forced moves return before the first iteration
+        solved_at = (result.depth, result.seconds, result.nodes)
+    record.update(
+        move=format_san(game, game.parse_uci(uci)) if uci is not None else None,
+        uci=uci,
+        score=result.score,
+        depth=result.depth,
+        nodes=result.nodes,
+        seconds=round(result.seconds, 6),
+        nps=result.nps,
+        solved=solved,
+    )
+    if solved:
+        record.update(
+            solved_depth=solved_at[0],
+            solved_seconds=round(solved_at[1], 6),
+            solved_nodes=solved_at[2],
+        )
+    return record
+
+
+def run_suite(
+    lines: Iterable[str],
+    depth: Optional[int] = None,
+    nodes: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    workers: int = 1,
+    hash_mb: float = 16,
+    backend: str = "list",
+) -> dict:
+    """
+    Run every position of an EPD suite, skipping blank lines and lines
+    starting with "#". With no depth, node or time budget the search stops at
+    DEFAULT_DEPTH.
+    Args:
+        workers: Number of processes to spread the positions over. With 1,
+            positions are searched in this process, one after another.
+    Returns:
+        The settings, one record per position (see run_position) in file
+        order, and totals: positions, solved, errors, solve rate, nodes,
+        seconds of wall-clock time and nps.
+    """
+    lines = [line.strip() for line in lines]
+    lines = [line for line in lines if line and not line.startswith("#")]
+    if depth is None and nodes is None and time_limit is None:
+        depth = DEFAULT_DEPTH
+    args = (depth, nodes, time_limit, hash_mb, backend)
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            positions = list(
+                executor.map(run_position, lines, *([arg] * len(lines) for arg in args))
+            )
+    else:
+        positions = [run_position(line, *args) for line in lines]
+    seconds = time.perf_counter() - start
+
+    searched = [position for position in positions if "error" not in position]
+    solved = sum(position["solved"] for position in searched)
+    total_nodes = sum(position["nodes"] for position in searched)
+    return {
+        "settings": {
+            "depth": depth,
+            "nodes": nodes,
+            "time": time_limit,
+            "workers": workers,
+            "hash_mb": hash_mb,
+            "backend": backend,
+        },
+        "positions": positions,
+        "summary": {
+            "positions": len(positions),
+            "solved": solved,
+            "errors": len(positions) - len(searched),
+            "solve_rate": round(solved / len(searched), 4) if searched else 0.0,
+            "nodes": total_nodes,
+            "seconds": round(seconds, 6),
+            "nps": int(total_nodes / seconds) if seconds > 0 else 0,
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chess.epd",
+        description="Run EPD test suites (bm/am) and report the solve rate as JSON.",
+    )
+    parser.add_argument("files", nargs="+", help="EPD files to run, in order")
+    parser.add_argument("--depth", type=int, help="deepest iteration to search")
+    parser.add_argument("--nodes", type=int, help="nodes to search per position")
+    parser.add_argument("--time", type=float, help="seconds to search per position")
+    parser.add_argument("--hash", type=float, default=16, help="hash size in MB")
+    parser.add_argument("--backend", choices=BACKENDS, default="list")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=f"processes to spread positions over (this machine has {os.cpu_count()})",
+    )
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    lines = []
+    for path in args.files:
+        with open(path, encoding="utf-8") as file:
+            lines += file.readlines()
+    report = run_suite(
+        lines, args.depth, args.nodes, args.time, args.workers, args.hash, args.backend
+    )
+    report["files"] = args.files
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+        summary = report["summary"]
+        print(
+            f"solved {summary['solved']}/{summary['positions'] - summary['errors']} "
+            f"errors {summary['errors']} nodes {summary['nodes']} "
+            f"time {summary['seconds']:.3f}s nps {summary['nps']}",
+            file=sys.stderr,
+        )
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
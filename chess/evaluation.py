@@ -0,0 +1,155 @@
+# Tables are written from white's side with rank 8 on the first line, as they
+# would be printed; black uses the same tables mirrored vertically.
+# Values are Tomasz Michniewski's Simplified Evaluation Function, with separate
+# endgame tables for the pawn and king.
+PAWN_MG = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+]
+PAWN_EG = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    20, 20, 20, 20, 20, 20, 20, 20,
+    10, 10, 10, 10, 10, 10, 10, 10,
+    0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0,
+]
+KNIGHT = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]
+BISHOP = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]
+ROOK = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+]
+QUEEN = [
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+]
+KING_MG = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+]
+KING_EG = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+]
+
+# Centipawn material, matching Piece.value; kings are never traded so carry none
+MATERIAL = {"P": 100, "N": 300, "B": 300, "R": 500, "Q": 900, "K": 0}
+# Game phase contributed by each piece; 24 with all pieces on, 0 with none
+PHASE_WEIGHTS = {"P": 0, "N": 1, "B": 1, "R": 2, "Q": 4, "K": 0}
+TOTAL_PHASE = 24
+
+_TABLES = {
+    "P": (PAWN_MG, PAWN_EG),
+    "N": (KNIGHT, KNIGHT),
+    "B": (BISHOP, BISHOP),
+    "R": (ROOK, ROOK),
+    "Q": (QUEEN, QUEEN),
+    "K": (KING_MG, KING_EG),
+}
+
+
+def _signed_tables(phase_index: int) -> dict[str, list[int]]:
+    """
+    Material plus square bonus for every piece on every square (0 = a1), as
+    seen by white: positive for white pieces, negative for black pieces.
+    """
+    tables = {}
+    for piece_str, printed in _TABLES.items():
+        table = printed[phase_index]
+        tables[piece_str] = [
+            MATERIAL[piece_str] + table[(7 - sq // 8) * 8 + sq % 8] for sq in range(64)
+        ]
+        tables[piece_str.lower()] = [
+            -(MATERIAL[piece_str] + table[sq]) for sq in range(64)
+        ]
+    return tables
+
+
+MG_TABLES = _signed_tables(0)
+EG_TABLES = _signed_tables(1)
+PHASES = {
+    **PHASE_WEIGHTS,
+    **{piece_str.lower(): weight for piece_str, weight in PHASE_WEIGHTS.items()},
+}
+
+
+def compute_scores(board) -> tuple[int, int, int]:
+    """
+    Middlegame score, endgame score and phase of a board from scratch. Game
+    keeps these up to date as pieces move, so this is only needed on load.
+    """
+    mg_score = 0
+    eg_score = 0
+    phase = 0
+    for row in range(1, 9):
+        for col in range(1, 9):
+            piece_str = board.get_piece(row, col).piece_str
+            if piece_str != ".":
+                sq = (row - 1) * 8 + (col - 1)
+                mg_score += MG_TABLES[piece_str][sq]
+                eg_score += EG_TABLES[piece_str][sq]
+                phase += PHASES[piece_str]
+    return mg_score, eg_score, phase
+
+
+def evaluate(game) -> int:
+    """
+    Static evaluation in centipawns from the side to move's point of view,
+    blending the middlegame and endgame scores by the material left.
+    """
+    phase = min(game.phase, TOTAL_PHASE)
+    score = (
+        game.mg_score * phase + game.eg_score * (TOTAL_PHASE - phase)
+    ) // TOTAL_PHASE
+    return score * game.current_player
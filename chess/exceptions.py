@@ -1,3 +1,21 @@
 class TurnOrderError(Exception):
     """Raised when a player attempts to move a piece out of turn."""
-    pass 
\ No newline at end of file
+    pass 
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time or node budget runs out."""
+    pass
+
+
+class PGNError(ValueError):
+    """Raised when PGN text cannot be parsed or a move does not fit the position."""
+    pass
+
+
+class FENError(ValueError):
+    """
+    Raised when a FEN or EPD record is malformed or describes an impossible
+    position.
+    """
+    pass
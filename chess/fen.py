@@ -1,28 +1,188 @@
+import re
+from typing import Iterable, Iterator
+
+from chess.exceptions import FENError
+
 STARTING_FEN_STR = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 
+PIECE_LETTERS = set("pnbrqkPNBRQK")
+CASTLING_ORDER = "KQkq"
+# An EPD operation: an opcode, its operands (words or quoted strings) and ";"
+EPD_OPERATION = re.compile(r'\s*([A-Za-z]\w*)((?:\s+(?:"[^"]*"|[^\s;"]+))*)\s*;')
+
 
 class Fen:
+    """
+    A position in Forsyth-Edwards Notation, split into typed fields once
+    when it is created. The move counters may be left out, as they are in
+    EPD, and default to 0 and 1.
+    """
+
     def __init__(self, fen: str = STARTING_FEN_STR):
-        self.fen_str = fen
+        """
+        Raises:
+            FENError: If the string is not a valid FEN
+        """
+        fields = fen.split()
+        if len(fields) not in (4, 6):
+            raise FENError(f"expected 6 fields, found {len(fields)}: {fen!r}")
+        self.board_str, self.turn, self.castles, en_passant = fields[:4]
+        self.validate_board()
+        if self.turn not in ("w", "b"):
+            raise FENError(f"bad side to move {self.turn!r}")
+        if self.castles != "-" and (
+            not self.castles
+            or any(right not in CASTLING_ORDER for right in self.castles)
+            or len(set(self.castles)) != len(self.castles)
+        ):
+            raise FENError(f"bad castling rights {self.castles!r}")
+        self.validate_castles()
+
+        if en_passant == "-":
+            self.en_passant = (-1, -1)
+        elif (
+            len(en_passant) == 2
+            and en_passant[0] in "abcdefgh"
+            and en_passant[1] == ("6" if self.turn == "w" else "3")
+        ):
+            self.en_passant = (int(en_passant[1]), ord(en_passant[0]) - 96)
+        else:
+            raise FENError(f"bad en passant square {en_passant!r}")
+
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        if len(fields) == 6:
+            if not fields[4].isdigit() or not fields[5].isdigit() or fields[5] == "0":
+                raise FENError(f"bad move counters {fields[4]!r} {fields[5]!r}")
+            self.halfmove_clock = int(fields[4])
+            self.fullmove_number = int(fields[5])
+        self.fen_str = " ".join(
+            [*fields[:4], str(self.halfmove_clock), str(self.fullmove_number)]
+        )
+
+    def validate_board(self) -> None:
+        ranks = self.board_str.split("/")
+        if len(ranks) != 8:
+            raise FENError(f"expected 8 ranks, found {len(ranks)}")
+        for rank in ranks:
+            squares = 0
+            for token in rank:
+                if token in PIECE_LETTERS:
+                    squares += 1
+                elif token in "12345678":
+                    squares += int(token)
+                else:
+                    raise FENError(f"bad piece {token!r}")
+            if squares != 8:
+                raise FENError(f"rank {rank!r} has {squares} squares")
+        if self.board_str.count("K") != 1 or self.board_str.count("k") != 1:
+            raise FENError("each side needs exactly one king")
+        if any(pawn in ranks[0] + ranks[7] for pawn in "Pp"):
+            raise FENError("pawns on the first or last rank")
+
+    def validate_castles(self) -> None:
+        """Each castling right needs its king and rook on their home squares."""
+        if self.castles == "-":
+            return
+        ranks = self.board_str.split("/")
+        back_ranks = {}
+        for colour, rank in (("w", ranks[7]), ("b", ranks[0])):
+            back_ranks[colour] = "".join(
+                "." * int(token) if token.isdigit() else token for token in rank
+            )
+        for right in self.castles:
+            rank = back_ranks["w" if right.isupper() else "b"]
+            king, rook = ("K", "R") if right.isupper() else ("k", "r")
+            if rank[4] != king or rank[7 if right in "Kk" else 0] != rook:
+                raise FENError(
+                    f"castling right {right!r} without its king and rook at home"
+                )
+
+    def __str__(self) -> str:
+        return self.fen_str
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Fen) and self.fen_str == other.fen_str
+
+    def __hash__(self) -> int:
+        return hash(self.fen_str)
 
     def get_board_str(self) -> str:
-        return self.fen_str.split()[0]
+        return self.board_str
 
     def get_turn(self) -> str:
-        return self.fen_str.split()[1]
+        return self.turn
 
     def get_castles(self) -> str:
-        return list(self.fen_str.split()[2])
+        return self.castles
 
-    def get_en_passant(self) -> tuple[int]:
-        en_passant_str = self.fen_str.split()[3]
-        if en_passant_str == "-":
-            return (-1, -1)
-        else:
-            return (int(en_passant_str[1]), ord(en_passant_str[0]) - 96)
+    def get_en_passant(self) -> tuple[int, int]:
+        return self.en_passant
+
+    def get_halfmove_clock(self) -> int:
+        return self.halfmove_clock
+
+    def get_fullmove_number(self) -> int:
+        return self.fullmove_number
+
+
+def parse_epd(line: str) -> tuple[Fen, dict[str, str]]:
+    """
+    Read a line holding a FEN, or an EPD record: the first four FEN fields
+    followed by operations such as ``bm Nf3; id "WAC.001";``.
+    Returns:
+        The position and the operands of each opcode, with the quotes of a
+        single quoted string removed. The hmvc and fmvn opcodes set the move
+        counters.
+    Raises:
+        FENError: If the position or the operations cannot be read
+    """
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise FENError(f"expected at least 4 fields: {line!r}")
+    rest = fields[4] if len(fields) == 5 else ""
+    counters = rest.split(None, 2)
+    if len(counters) >= 2 and counters[0].isdigit() and counters[1].isdigit():
+        fen = Fen(" ".join(fields[:4] + counters[:2]))
+        rest = counters[2] if len(counters) == 3 else ""
+    else:
+        fen = None
+
+    operations = {}
+    rest = rest.strip()
+    position = 0
+    while position < len(rest):
+        match = EPD_OPERATION.match(rest, position)
+        if match is None:
+            raise FENError(f"bad EPD operations {rest[position:]!r}")
+        operand = match.group(2).strip()
+        if (
+            len(operand) >= 2
+            and operand[0] == operand[-1] == '"'
+            and operand.count('"') == 2
+        ):
+            operand = operand[1:-1]
+        operations[match.group(1)] = operand
+        position = match.end()
+        while position < len(rest) and rest[position].isspace():
+            position += 1
+
+    if fen is None:
+        fen = Fen(
+            " ".join(
+                fields[:4]
+                + [operations.get("hmvc", "0"), operations.get("fmvn", "1")]
+            )
+        )
+    return fen, operations
 
-    def get_halfmove_clock(self) -> str:
-        return self.fen_str.split()[4]
 
-    def get_fullmove_number(self) -> str:
-        return self.fen_str.split()[5]
+def read_fens(stream: Iterable[str]) -> Iterator[tuple[Fen, dict[str, str]]]:
+    """
+    Parse the FEN or EPD on each line of a stream, such as an open file,
+    skipping blank lines and lines starting with "#".
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield parse_epd(line)
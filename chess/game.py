@@ -1,362 +1,860 @@
-import logging
-from typing import Optional
-from chess.board import Board
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+from chess.bitboard import (
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    PAWN_ATTACKS,
+    SQUARE_POSITIONS,
+    BitBoard,
+    bishop_attacks,
+    iter_squares,
+    rook_attacks,
+    square_index,
+)
+from chess.board import (
+    DIAGONAL_RAYS,
+    KING_SQUARES,
+    KNIGHT_SQUARES,
+    ORTHOGONAL_RAYS,
+    PAWN_CAPTURE_SQUARES,
+    Board,
+)
+from chess import tracing
 from chess.constants import POSITION
-from chess.fen import STARTING_FEN_STR, Fen
-from chess.exceptions import TurnOrderError
-from chess.pieces import Empty, Piece, Pawn, Knight, Rook, Bishop, Queen, King
-from chess.move import Move
-from copy import deepcopy
+from chess.fen import STARTING_FEN_STR, Fen, read_fens
+from chess.evaluation import EG_TABLES, MG_TABLES, PHASES
+from chess.pieces import Piece, Pawn, Knight, Rook, Bishop, Queen, King
+from chess.move import (
+    CAPTURE,
+    DOUBLE_PAWN_PUSH,
+    EN_PASSANT,
+    KING_CASTLE,
+    PROMOTION,
+    PROMOTION_FLAGS,
+    PROMOTION_KINDS,
+    PROMOTION_PIECES,
+    QUEEN_CASTLE,
+    QUIET,
+    Move,
+    code_to_uci,
+    encode,
+)
+from chess.zobrist import (
+    PIECE_KEYS,
+    SIDE_KEY,
+    castling_key,
+    en_passant_key,
+)
+
+
+BACKENDS = {"list": Board, "bitboard": BitBoard}
+
+# Least valuable first, the order in which SEE brings in attackers
+SEE_ORDER = {1: "PNBRQK", -1: "pnbrqk"}
+# Piece.value of each piece_str, for SEE
+SEE_VALUES = {
+    piece_str: kind.value
+    for kind in (Pawn, Knight, Bishop, Rook, Queen, King)
+    for piece_str in (kind.letter, kind.letter.upper())
+}
+
+# The castling right lost when a piece moves from, or is captured on, a corner
+CASTLING_CORNERS = {0: "Q", 7: "K", 56: "q", 63: "k"}
+ALL_SQUARES = (1 << 64) - 1
 
 
 class Game:
-    def __init__(self, fen: Optional[Fen] = Fen(STARTING_FEN_STR)):
-        self.board = Board(fen)
+    def __init__(
+        self, fen: Optional[Fen] = Fen(STARTING_FEN_STR), backend: str = "list"
+    ):
+        self.backend = backend
+        self.board = BACKENDS[backend](fen)
+        self.use_bitboards = isinstance(self.board, BitBoard)
+        self.player_key = {"w": 1, "b": -1}
+        self.captured = {1: [], -1: []}
+        self.check_moves = []
+        self.move_stack = []
+        # Position key before each move on the move stack, for finding
+        # repetitions
+        self.key_history = array("Q")
+        self.set_fen(fen, load_board=False)
+
+    def set_fen(self, fen: Fen, load_board: bool = True) -> None:
+        """
+        Reset the game in place to a position, keeping the board object and
+        its backend, so many positions can be loaded without building a new
+        Game for each.
+        Args:
+            fen: The position to load
+            load_board: Also place the pieces. Only __init__ skips this, as
+                the board has just been built from the same FEN.
+        """
+        if load_board:
+            self.board.load_fen(fen)
         self.turn = fen.get_turn()
         self.current_player = 1 if self.turn == "w" else -1
-        self.current_player = 1 if self.turn == "w" else -1
         self.castles = fen.get_castles()
         self.en_passant = fen.get_en_passant()
+        # Plies since the last capture or pawn move
         self.halfmove_clock = fen.get_halfmove_clock()
         self.fullmove_number = fen.get_fullmove_number()
-        self.player_key = {"w": 1, "b": -1}
-        self.captured = {1: [], -1: []}
-        self.check_moves = []
+        self.captured[1].clear()
+        self.captured[-1].clear()
+        self.check_moves.clear()
+        self.move_stack.clear()
+        del self.key_history[:]
+        # The key and evaluation in one pass over the pieces, rather than
+        # compute_key and compute_scores each scanning all 64 squares
+        key = castling_key(self.castles) ^ en_passant_key(self.en_passant)
+        if self.current_player == -1:
+            key ^= SIDE_KEY
+        mg_score = eg_score = phase = 0
+        for piece_str, sq in self.board.piece_squares():
+            key ^= PIECE_KEYS[piece_str][sq]
+            mg_score += MG_TABLES[piece_str][sq]
+            eg_score += EG_TABLES[piece_str][sq]
+            phase += PHASES[piece_str]
+        self.zobrist_key = key
+        self.mg_score, self.eg_score, self.phase = mg_score, eg_score, phase
+        # Piece bitboards of the list board, kept for the position they were
+        # built for, so the SEE calls of one node share them
+        self.bitboards_key: Optional[int] = None
+        self.list_bitboards: dict[str, int] = {}
+
+    def to_fen(self) -> Fen:
+        """The current position as a FEN."""
+        ranks = []
+        for row in range(7, -1, -1):
+            rank = ""
+            empty = 0
+            for sq in range(row * 8, row * 8 + 8):
+                piece = self.board.piece_at(sq)
+                if piece.colour:
+                    if empty:
+                        rank += str(empty)
+                        empty = 0
+                    rank += piece.piece_str
+                else:
+                    empty += 1
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+        castles = "".join(right for right in "KQkq" if right in self.castles) or "-"
+        if self.en_passant == (-1, -1):
+            en_passant = "-"
+        else:
+            row, col = self.en_passant
+            en_passant = chr(96 + col) + str(row)
+        return Fen(
+            f"{'/'.join(ranks)} {'w' if self.current_player == 1 else 'b'} "
+            f"{castles} {en_passant} {self.halfmove_clock} {self.fullmove_number}"
+        )
 
     def check_if_in_check(
         self, player: Optional[int] = None, move: Optional[Move] = None
     ):
         if not player:
             player = self.current_player
-        checking_moves = []
-        locations = self.get_piece_locations(-player)
-        for location in locations:
-            legal_moves = self.get_legal_moves(*location, ignore_check=True)
-            for legal_move in legal_moves:
-                if self.board.get_piece(*legal_move.end_pos).name == "King":
-                    checking_moves.append(
-                        Move(location, legal_move, self.board.get_piece(*location))
-                    )
-
-        if len(checking_moves) > 0:
-            return True
-        else:
+        king_position = self.board.find_king(player)
+        if king_position is None:
             return False
+        return self.is_square_attacked(king_position, -player)
+
+    def is_square_attacked(self, square: POSITION, by_colour: int) -> bool:
+        return self.board.is_square_attacked(*square, by_colour)
 
     def piece_matches_player(self, piece: Piece, player: Optional[int] = None) -> bool:
         if player is None:
             player = self.current_player
-
-        logging.info(
-            f"Checking piece {piece.piece_str} (colour={piece.colour}) against player {player}"
-        )
         return piece.colour == player
 
-    def get_piece_locations(self, player: int) -> list[POSITION]:
-        locations = []
-        for row in range(1, 9):
-            for col in range(1, 9):
-                if self.piece_matches_player(self.board.get_piece(row, col), player):
-                    locations.append((row, col))
+    def repetitions(self) -> int:
+        """
+        How many times the current position occurred before. Only positions
+        since the last capture or pawn move can repeat it, and only every
+        other one has the same side to move, so just those keys are compared.
+        """
+        keys = self.key_history
+        key = self.zobrist_key
+        count = 0
+        for index in range(len(keys) - 2, len(keys) - self.halfmove_clock - 1, -2):
+            if index < 0:
+                break
+            if keys[index] == key:
+                count += 1
+        return count
+
+    def is_threefold_repetition(self) -> bool:
+        return self.repetitions() >= 2
+
+    def is_fifty_move_rule(self) -> bool:
+        return self.halfmove_clock >= 100
+
+    def outcome(self) -> Optional[str]:
+        """
+        Returns:
+            "checkmate", "stalemate", "fifty-move rule" or "threefold
+            repetition" if the game is over (or, for the draws, may be
+            claimed), otherwise None.
+        """
+        if not self.generate_legal_move_codes():
+            return "checkmate" if self.check_if_in_check() else "stalemate"
+        if self.is_fifty_move_rule():
+            return "fifty-move rule"
+        if self.is_threefold_repetition():
+            return "threefold repetition"
+        return None
 
-        return locations
+    def get_piece_locations(self, player: int) -> list[POSITION]:
+        return [SQUARE_POSITIONS[sq] for sq in sorted(self.board.squares_of(player))]
 
     def get_legal_moves(self, row, col, ignore_check=False) -> list[Move]:
-        legal_moves: list[Move] = []
         piece = self.board.get_piece(row, col)
-        match piece.name:
-            case "Pawn":
-                poss_legal_moves = self.get_legal_moves_pawn(row, col, piece.colour)
-            case "Knight":
-                poss_legal_moves = self.get_legal_moves_knight(
-                    row, col, piece.colour
-                )
-            case "Rook":
-                poss_legal_moves = self.get_legal_moves_rook(row, col, piece.colour)
-            case "Bishop":
-                poss_legal_moves = self.get_legal_moves_bishop(
-                    row, col, piece.colour
-                )
-            case "Queen":
-                poss_legal_moves = self.get_legal_moves_queen(
-                    row, col, piece.colour
-                )
-            case "King":
-                poss_legal_moves = self.get_legal_moves_king(row, col, piece.colour, ignore_check)
-
-        if ignore_check:
-            return poss_legal_moves
-        else:
-            for move in poss_legal_moves:
-                temp_game = deepcopy(self)
-                temp_game.make_move(move)
-                in_check = temp_game.check_if_in_check(piece.colour)
+        codes = self.get_move_codes(square_index(row, col), piece, not ignore_check)
+        if not ignore_check:
+            legal_codes = []
+            for code in codes:
+                self.make_move(code, validate=False)
+                in_check = self.check_if_in_check(piece.colour)
+                self.unmake_move()
                 if not in_check:
-                    legal_moves.append(move)
-
-            return legal_moves
-
-    def get_legal_moves_knight(self, row: int, col: int, colour: int):
-        legal_moves: list[POSITION] = []
-        possible_moves = [
-            (row + 2, col + 1),
-            (row + 2, col - 1),
-            (row - 2, col + 1),
-            (row - 2, col - 1),
-            (row + 1, col + 2),
-            (row + 1, col - 2),
-            (row - 1, col + 2),
-            (row - 1, col - 2),
-        ]
-
-        for square in possible_moves:
-            if self.board.is_impossible(*square):
-                continue
-            piece = self.board.get_piece(*square)
-            if piece.colour == colour:
-                continue
-            else:
-                legal_moves.append(Move((row, col), square))
-        return legal_moves
-
-    def get_legal_moves_pawn(self, row: int, col: int, colour: int):
-        legal_moves = []
-        square_1 = (row + colour, col)
-        square_2 = (row + 2 * colour, col)
-
-        if (
-            not self.board.is_impossible(*square_1)
-            and self.board.get_piece(*square_1).piece_str == "."
+                    legal_codes.append(code)
+            codes = legal_codes
+        return [Move.from_code(code) for code in codes]
+
+    def get_move_codes(
+        self, sq: int, piece: Piece, castling: bool = False
+    ) -> list[int]:
+        """Pseudo-legal moves of the piece on sq, packed as ints (see chess.move)."""
+        codes = []
+        colour = piece.colour
+        kind = type(piece)
+        if kind is Pawn:
+            self.add_pawn_codes(codes, sq, colour)
+        elif kind is Knight:
+            self.add_knight_codes(codes, sq, colour)
+        elif kind is Rook:
+            self.add_rook_codes(codes, sq, colour)
+        elif kind is Bishop:
+            self.add_bishop_codes(codes, sq, colour)
+        elif kind is Queen:
+            self.add_rook_codes(codes, sq, colour)
+            self.add_bishop_codes(codes, sq, colour)
+        elif kind is King:
+            self.add_king_codes(codes, sq, colour, castling)
+        return codes
+
+    def get_checks_and_pins(
+        self, colour: int, king: int
+    ) -> tuple[list[int], dict[int, int]]:
+        """
+        Find the pieces checking the king of colour and the pieces absolutely
+        pinned to it, by looking outward from the king square.
+        Args:
+            colour: The colour of the king
+            king: The square index of the king
+        Returns:
+            One mask per checker of the squares that resolve that check (the
+            checker itself plus any squares between it and the king).
+            A mapping from each pinned piece's square to a mask of the squares
+            it may move to (the line between the king and the pinner,
+            including the pinner).
+        """
+        piece_at = self.board.piece_at
+        checkers = []
+        pins = {}
+
+        for sq in KNIGHT_SQUARES[king]:
+            piece = piece_at(sq)
+            if piece.colour == -colour and type(piece) is Knight:
+                checkers.append(1 << sq)
+
+        # Enemy pawns attacking the king stand where a pawn of colour on the
+        # king square would capture
+        for sq in PAWN_CAPTURE_SQUARES[colour][king]:
+            piece = piece_at(sq)
+            if piece.colour == -colour and type(piece) is Pawn:
+                checkers.append(1 << sq)
+
+        for rays, sliders in (
+            (ORTHOGONAL_RAYS, (Rook, Queen)),
+            (DIAGONAL_RAYS, (Bishop, Queen)),
         ):
-            legal_moves.append(Move((row, col), square_1))
-            if (
-                not self.board.is_impossible(*square_2)
-                and self.board.get_piece(*square_2).piece_str == "."
-                and 2 * row == (9 - 5 * colour)
-            ):
-                legal_moves.append(Move((row, col), square_2))
-
-        attack_squares = [
-            (row + colour, col + 1),
-            (row + colour, col - 1),
-        ]
-        for square in attack_squares:
-            if not self.board.is_impossible(*square):
-                if (
-                    self.board.get_piece(*square).colour == -colour
-                    or self.en_passant == square
-                ):
-                    legal_moves.append(Move((row, col), square))
-
-        return legal_moves
-
-    def get_legal_moves_rook(self, row: int, col: int, colour: int):
-        legal_moves = []
-
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-
-        for dir in directions:
-            steps = 0
-            while True:
-                steps += 1
-                square = (row + steps * dir[0], col + steps * dir[1])
-                if self.board.is_impossible(*square):
-                    break
-                piece = self.board.get_piece(*square)
-                if piece.colour == colour:
-                    break
-                elif piece.colour == -colour:
-                    legal_moves.append(Move((row, col), square))
-                    break
-                else:
-                    legal_moves.append(Move((row, col), square))
-
-        return legal_moves
-
-    def get_legal_moves_bishop(self, row: int, col: int, colour: int):
-        legal_moves = []
-
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        for dir in directions:
-            steps = 0
-            while True:
-                steps += 1
-                square = (row + steps * dir[0], col + steps * dir[1])
-                if self.board.is_impossible(*square):
-                    break
-                piece = self.board.get_piece(*square)
-                if piece.colour == colour:
-                    break
-                elif piece.colour == -colour:
-                    legal_moves.append(Move((row, col), square))
-                    break
-                else:
-                    legal_moves.append(Move((row, col), square))
-
-        return legal_moves
-
-    def get_legal_moves_queen(self, row: int, col: int, colour: int):
-        legal_moves = []
-
-        directions = [
-            (0, 1),
-            (0, -1),
-            (1, 0),
-            (-1, 0),
-            (1, 1),
-            (1, -1),
-            (-1, 1),
-            (-1, -1),
-        ]
-
-        for dir in directions:
-            steps = 0
-            while True:
-                steps += 1
-                square = (row + steps * dir[0], col + steps * dir[1])
-                if self.board.is_impossible(*square):
-                    break
-                piece = self.board.get_piece(*square)
-                if piece.colour == colour:
-                    break
-                elif piece.colour == -colour:
-                    legal_moves.append(Move((row, col), square))
-                    break
-                else:
-                    legal_moves.append(Move((row, col), square))
-
-        return legal_moves
-
-    def get_legal_moves_king(self, row: int, col: int, colour: int, ignore_castle: bool = True):
-        legal_moves = []
-
-        directions = [
-            (0, 1),
-            (0, -1),
-            (1, 0),
-            (-1, 0),
-            (1, 1),
-            (1, -1),
-            (-1, 1),
-            (-1, -1),
-        ]
-
-        for dir in directions:
-            square = (row + dir[0], col + dir[1])
-            if self.board.is_impossible(*square):
-                continue
-            piece = self.board.get_piece(*square)
-            if piece.colour == colour:
-                continue
-            elif piece.colour == -colour:
-                legal_moves.append(Move((row, col), square))
+            for ray in rays[king]:
+                line = 0
+                pinned = -1
+                for sq in ray:
+                    line |= 1 << sq
+                    piece = piece_at(sq)
+                    if piece.colour == colour:
+                        if pinned >= 0:
+                            break
+                        pinned = sq
+                    elif piece.colour == -colour:
+                        if type(piece) in sliders:
+                            if pinned >= 0:
+                                pins[pinned] = line
+                            else:
+                                checkers.append(line)
+                        break
+
+        return checkers, pins
+
+    def generate_legal_moves(self) -> list[Move]:
+        return [Move.from_code(code) for code in self.generate_legal_move_codes()]
+
+    def generate_legal_move_codes(self) -> list[int]:
+        """
+        Generate every legal move for the side to move, packed as ints.
+
+        Checkers and pins are worked out once for the position, so moves are
+        filtered against bitmasks instead of being played out and tested for
+        check. In double check only king moves are generated. En passant
+        captures are the one exception and are verified with make/unmake, as
+        removing two pawns from a rank can expose the king along it.
+        """
+        colour = self.current_player
+        board = self.board
+        king_pos = board.find_king(colour)
+        if king_pos is None:
+            codes = []
+            for sq in board.squares_of(colour):
+                codes += self.get_move_codes(sq, board.piece_at(sq))
+            return codes
+
+        king = square_index(*king_pos)
+        checkers, pins = self.get_checks_and_pins(colour, king)
+        codes = []
+
+        # The king is lifted off the board while its destinations are tested so
+        # that it cannot shield a square from a slider it is moving away from.
+        king_piece = board.piece_at(king)
+        king_codes = []
+        self.add_king_codes(king_codes, king, colour, not checkers)
+        board.change_piece_in_location(*king_pos, board.piece_key["."])
+        for code in king_codes:
+            target = SQUARE_POSITIONS[(code >> 6) & 63]
+            if not board.is_square_attacked(*target, -colour):
+                codes.append(code)
+        board.change_piece_in_location(*king_pos, king_piece)
+
+        if len(checkers) > 1:
+            return codes
+
+        evasions = checkers[0] if checkers else ALL_SQUARES
+        for sq in board.squares_of(colour):
+            if sq == king:
                 continue
+            allowed = evasions & pins.get(sq, ALL_SQUARES)
+            for code in self.get_move_codes(sq, board.piece_at(sq)):
+                if code >> 12 == EN_PASSANT:
+                    self.make_move(code, validate=False)
+                    in_check = self.check_if_in_check(colour)
+                    self.unmake_move()
+                    if not in_check:
+                        codes.append(code)
+                elif (allowed >> ((code >> 6) & 63)) & 1:
+                    codes.append(code)
+
+        return codes
+
+    def is_legal(self, code: int) -> bool:
+        """
+        Whether a packed move is legal in the current position, tested without
+        generating every move, e.g. for a move taken from the transposition
+        table.
+        """
+        from_sq = code & 63
+        piece = self.board.piece_at(from_sq)
+        if piece.colour != self.current_player:
+            return False
+        if code not in self.get_move_codes(from_sq, piece, castling=True):
+            return False
+        self.make_move(code, validate=False)
+        in_check = self.check_if_in_check(piece.colour)
+        self.unmake_move()
+        return not in_check
+
+    def piece_bitboards(self) -> dict[str, int]:
+        """
+        A bitboard of the squares of each piece_str, e.g. "N". The list board
+        builds them once per position; do not modify the result.
+        """
+        if self.use_bitboards:
+            return self.board.bitboards
+        if self.bitboards_key != self.zobrist_key:
+            self.list_bitboards = {
+                piece_str: sum(1 << sq for sq in squares)
+                for piece_str, squares in self.board.piece_index.items()
+            }
+            self.bitboards_key = self.zobrist_key
+        return self.list_bitboards
+
+    def see(self, code: int) -> int:
+        """
+        Static exchange evaluation: the material won (in Piece.value units)
+        by the move and the best sequence of recaptures on its destination,
+        each side capturing with its least valuable piece and free to stop.
+        Pieces behind the capturers (x-rays) join in as the ones in front
+        come off. Nothing is played on the board.
+        """
+        board = self.board
+        from_sq, to_sq, flags = code & 63, (code >> 6) & 63, code >> 12
+        bitboards = self.piece_bitboards()
+        values = SEE_VALUES
+        if self.use_bitboards:
+            occupancy = board.occupancy
+        else:
+            occupancy = {
+                colour: sum(bitboards[piece_str] for piece_str in SEE_ORDER[colour])
+                for colour in (1, -1)
+            }
+        occupied = occupancy[1] | occupancy[-1]
+
+        mover = board.piece_at(from_sq)
+        if flags == EN_PASSANT:
+            gain = [Pawn.value]
+            occupied ^= 1 << (to_sq - 8 * mover.colour)
+        else:
+            gain = [board.piece_at(to_sq).value]
+        on_square = mover.value
+        if flags & PROMOTION:
+            on_square = PROMOTION_PIECES[mover.colour][flags & 3].value
+            gain[0] += on_square - mover.value
+        occupied ^= 1 << from_sq
+
+        bishops = bitboards["B"] | bitboards["b"] | bitboards["Q"] | bitboards["q"]
+        rooks = bitboards["R"] | bitboards["r"] | bitboards["Q"] | bitboards["q"]
+        attackers = (
+            (PAWN_ATTACKS[-1][to_sq] & bitboards["P"])
+            | (PAWN_ATTACKS[1][to_sq] & bitboards["p"])
+            | (KNIGHT_ATTACKS[to_sq] & (bitboards["N"] | bitboards["n"]))
+            | (KING_ATTACKS[to_sq] & (bitboards["K"] | bitboards["k"]))
+            | (bishop_attacks(to_sq, occupied) & bishops)
+            | (rook_attacks(to_sq, occupied) & rooks)
+        ) & occupied
+        last_rank = to_sq >= 56 or to_sq < 8
+        colour = -mover.colour
+        while True:
+            for piece_str in SEE_ORDER[colour]:
+                found = attackers & bitboards[piece_str]
+                if found:
+                    break
             else:
-                legal_moves.append(Move((row, col), square))
-
-        # castling
-        if not ignore_castle:
-            if Piece(colour).func("k") in self.castles:
-                safe_to_castle = True
-                for empty_col in range(6, 8):
-                    if self.board.get_piece(row, empty_col).name != "Empty":
-                        safe_to_castle = False
-
-                for king_col in range(5, 8):
-                    temp_board = deepcopy(self)
-                    temp_board.make_move(Move((row, col), (row, king_col)))
-                    if temp_board.check_if_in_check(colour):
-                        safe_to_castle = False
-
-
-                if safe_to_castle:
-                    legal_moves.append(Move((row, col), (row, col + 2), piece=King(colour)))
-
-            if Piece(colour).func("q") in self.castles:
-                safe_to_castle = True
-                for empty_col in range(2, 5):
-                    if self.board.get_piece(row, empty_col).name != "Empty":
-                        safe_to_castle = False
+                break
+            # The king may only take last, when nothing can take it back
+            if piece_str in "Kk" and attackers & occupancy[-colour]:
+                break
+            gain.append(on_square - gain[-1])
+            on_square = values[piece_str]
+            if piece_str in "Pp" and last_rank:
+                gain[-1] += values["Q"] - values["P"]
+                on_square = values["Q"]
+            occupied ^= found & -found
+            attackers |= (bishop_attacks(to_sq, occupied) & bishops) | (
+                rook_attacks(to_sq, occupied) & rooks
+            )
+            attackers &= occupied
+            colour = -colour
+
+        # Each side only continues the exchange while it pays
+        while len(gain) > 1:
+            last = gain.pop()
+            gain[-1] = -max(-gain[-1], last)
+        return gain[0]
+
+    def encode_move(self, move: Move) -> int:
+        """Pack a Move into an int, working out its flags from the position."""
+        from_sq = square_index(*move.start_pos)
+        to_sq = square_index(*move.end_pos)
+        piece = self.board.piece_at(from_sq)
+        flags = CAPTURE if self.board.piece_at(to_sq).colour else QUIET
+        if type(piece) is Pawn:
+            if move.end_pos == self.en_passant:
+                flags = EN_PASSANT
+            elif abs(to_sq - from_sq) == 16:
+                flags = DOUBLE_PAWN_PUSH
+            elif move.end_pos[0] in (1, 8):
+                kind = "q"
+                if move.piece is not None and type(move.piece) is not King:
+                    kind = move.piece.piece_str.lower()
+                flags |= PROMOTION | PROMOTION_KINDS.index(kind)
+        elif type(piece) is King and to_sq - from_sq == 2:
+            flags = KING_CASTLE
+        elif type(piece) is King and to_sq - from_sq == -2:
+            flags = QUEEN_CASTLE
+        return encode(from_sq, to_sq, flags)
+
+    def parse_uci(self, uci: str) -> int:
+        """
+        Pack a move given in UCI notation for the current position.
+        Raises:
+            ValueError: If the string is not a move in UCI notation
+        """
+        return self.encode_move(Move.from_uci(uci))
+
+    def is_capture(self, move: Union[Move, int]) -> bool:
+        if not isinstance(move, int):
+            move = self.encode_move(move)
+        return bool(move & (CAPTURE << 12))
+
+    def perft(self, depth: int) -> int:
+        """Count the leaf nodes of the legal move tree to the given depth."""
+        if depth == 0:
+            return 1
+        codes = self.generate_legal_move_codes()
+        if depth == 1:
+            return len(codes)
+        nodes = 0
+        for code in codes:
+            self.make_move(code, validate=False)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
+
+    def divide(self, depth: int) -> dict[str, int]:
+        """Perft split by root move, for finding where two generators disagree."""
+        counts = {}
+        for code in self.generate_legal_move_codes():
+            self.make_move(code, validate=False)
+            counts[code_to_uci(code)] = self.perft(depth - 1)
+            self.unmake_move()
+        return counts
+
+    def add_codes_from_bitboard(
+        self, codes: list[int], sq: int, targets: int, colour: int
+    ):
+        board = self.board
+        for target in iter_squares(targets & board.occupancy[-colour]):
+            codes.append(sq | target << 6 | CAPTURE << 12)
+        for target in iter_squares(targets & ~board.occupied):
+            codes.append(sq | target << 6)
+
+    def add_codes_from_squares(
+        self, codes: list[int], sq: int, targets: list[int], colour: int
+    ):
+        piece_at = self.board.piece_at
+        for target in targets:
+            other = piece_at(target).colour
+            if not other:
+                codes.append(sq | target << 6)
+            elif other != colour:
+                codes.append(sq | target << 6 | CAPTURE << 12)
+
+    def add_codes_along_rays(
+        self, codes: list[int], sq: int, rays: list[list[int]], colour: int
+    ):
+        piece_at = self.board.piece_at
+        for ray in rays:
+            for target in ray:
+                other = piece_at(target).colour
+                if not other:
+                    codes.append(sq | target << 6)
+                    continue
+                if other != colour:
+                    codes.append(sq | target << 6 | CAPTURE << 12)
+                break
+
+    def add_pawn_code(self, codes: list[int], sq: int, target: int, flags: int):
+        # A pawn reaching the last row gets one move per promotion piece
+        if target >= 56 or target < 8:
+            for promotion in PROMOTION_FLAGS:
+                codes.append(sq | target << 6 | (flags | promotion) << 12)
+        else:
+            codes.append(sq | target << 6 | flags << 12)
+
+    def add_pawn_codes(self, codes: list[int], sq: int, colour: int):
+        en_passant = -1
+        if self.en_passant != (-1, -1):
+            en_passant = square_index(*self.en_passant)
+        step = 8 * colour
+        start_row = 1 if colour == 1 else 6
+        target = sq + step
+
+        if self.use_bitboards:
+            occupied = self.board.occupied
+            if not (occupied >> target) & 1:
+                self.add_pawn_code(codes, sq, target, QUIET)
+                if sq >> 3 == start_row and not (occupied >> (target + step)) & 1:
+                    codes.append(sq | (target + step) << 6 | DOUBLE_PAWN_PUSH << 12)
+            attacks = PAWN_ATTACKS[colour][sq]
+            for target in iter_squares(attacks & self.board.occupancy[-colour]):
+                self.add_pawn_code(codes, sq, target, CAPTURE)
+            if en_passant >= 0 and (attacks >> en_passant) & 1:
+                codes.append(sq | en_passant << 6 | EN_PASSANT << 12)
+            return
 
-                for king_col in range(3, 6):
-                    temp_board = deepcopy(self)
-                    temp_board.make_move(Move((row, col), (row, king_col)))
-                    if temp_board.check_if_in_check(colour):
-                        safe_to_castle = False
+        piece_at = self.board.piece_at
+        if not piece_at(target).colour:
+            self.add_pawn_code(codes, sq, target, QUIET)
+            if sq >> 3 == start_row and not piece_at(target + step).colour:
+                codes.append(sq | (target + step) << 6 | DOUBLE_PAWN_PUSH << 12)
+        for target in PAWN_CAPTURE_SQUARES[colour][sq]:
+            if piece_at(target).colour == -colour:
+                self.add_pawn_code(codes, sq, target, CAPTURE)
+            elif target == en_passant:
+                codes.append(sq | target << 6 | EN_PASSANT << 12)
+
+    def add_knight_codes(self, codes: list[int], sq: int, colour: int):
+        if self.use_bitboards:
+            self.add_codes_from_bitboard(codes, sq, KNIGHT_ATTACKS[sq], colour)
+        else:
+            self.add_codes_from_squares(codes, sq, KNIGHT_SQUARES[sq], colour)
 
+    def add_rook_codes(self, codes: list[int], sq: int, colour: int):
+        if self.use_bitboards:
+            targets = rook_attacks(sq, self.board.occupied)
+            self.add_codes_from_bitboard(codes, sq, targets, colour)
+        else:
+            self.add_codes_along_rays(codes, sq, ORTHOGONAL_RAYS[sq], colour)
 
-                if safe_to_castle:
-                    legal_moves.append(Move((row, col), (row, col - 2), piece=King(colour)))
+    def add_bishop_codes(self, codes: list[int], sq: int, colour: int):
+        if self.use_bitboards:
+            targets = bishop_attacks(sq, self.board.occupied)
+            self.add_codes_from_bitboard(codes, sq, targets, colour)
+        else:
+            self.add_codes_along_rays(codes, sq, DIAGONAL_RAYS[sq], colour)
 
-        return legal_moves
+    def add_king_codes(
+        self, codes: list[int], sq: int, colour: int, castling: bool = False
+    ):
+        if self.use_bitboards:
+            self.add_codes_from_bitboard(codes, sq, KING_ATTACKS[sq], colour)
+        else:
+            self.add_codes_from_squares(codes, sq, KING_SQUARES[sq], colour)
 
-    def make_move(self, move: Move):
-        start_pos = move.start_pos
-        end_pos = move.end_pos
-        if start_pos not in self.get_piece_locations(self.current_player):
-            logging.warning(f"no valid piece in origin square {start_pos}")
+        # The king may not castle out of or through check. The destination square
+        # is covered by the legality filters, so only the start and transit
+        # squares are tested here.
+        if not castling or not self.castles:
             return
-
-        start_piece = self.board.get_piece(*start_pos)
-        end_piece = self.board.get_piece(*end_pos)
-
-        if end_piece.piece_str != ".":
-            self.captured[-1 * self.current_player].append(end_piece)
-        elif end_pos == self.en_passant and start_piece.name == "Pawn":
-            self.captured[-1 * self.current_player].append(
-                self.board.get_piece(end_pos[0] - self.current_player, end_pos[1])
+        row = 1 if colour == 1 else 8
+        if sq != square_index(row, 5):
+            return
+        board = self.board
+        piece_at = board.piece_at
+        kingside, queenside = ("K", "Q") if colour == 1 else ("k", "q")
+        rook = board.piece_key["R" if colour == 1 else "r"]
+        if (
+            kingside in self.castles
+            and piece_at(sq + 3) is rook
+            and not piece_at(sq + 1).colour
+            and not piece_at(sq + 2).colour
+            and not board.is_square_attacked(row, 5, -colour)
+            and not board.is_square_attacked(row, 6, -colour)
+        ):
+            codes.append(sq | (sq + 2) << 6 | KING_CASTLE << 12)
+        if (
+            queenside in self.castles
+            and piece_at(sq - 4) is rook
+            and not piece_at(sq - 1).colour
+            and not piece_at(sq - 2).colour
+            and not piece_at(sq - 3).colour
+            and not board.is_square_attacked(row, 5, -colour)
+            and not board.is_square_attacked(row, 4, -colour)
+        ):
+            codes.append(sq | (sq - 2) << 6 | QUEEN_CASTLE << 12)
+
+    def remove_piece(self, sq: int) -> None:
+        """Empty a square, keeping the position key and evaluation in step."""
+        piece_str = self.board.piece_at(sq).piece_str
+        self.zobrist_key ^= PIECE_KEYS[piece_str][sq]
+        self.mg_score -= MG_TABLES[piece_str][sq]
+        self.eg_score -= EG_TABLES[piece_str][sq]
+        self.phase -= PHASES[piece_str]
+        board = self.board
+        board.change_piece_in_location(*SQUARE_POSITIONS[sq], board.piece_key["."])
+
+    def place_piece(self, sq: int, piece: Piece) -> None:
+        """Put a piece on an empty square, keeping the key and evaluation in step."""
+        piece_str = piece.piece_str
+        self.zobrist_key ^= PIECE_KEYS[piece_str][sq]
+        self.mg_score += MG_TABLES[piece_str][sq]
+        self.eg_score += EG_TABLES[piece_str][sq]
+        self.phase += PHASES[piece_str]
+        self.board.change_piece_in_location(*SQUARE_POSITIONS[sq], piece)
+
+    def make_move(self, move: Union[Move, int], validate: bool = True):
+        """
+        Play a move on the board and push an undo record onto the move stack.
+        Args:
+            move: The move to play, either a Move or packed as an int
+            validate: Check the origin square holds a piece of the side to move.
+                Internal legality probes skip this as the move is known to be
+                pseudo-legal.
+        """
+        code = move if isinstance(move, int) else self.encode_move(move)
+        from_sq = code & 63
+        to_sq = (code >> 6) & 63
+        flags = code >> 12
+        if validate and self.board.piece_at(from_sq).colour != self.current_player:
+            tracing.logger.warning(
+                "no valid piece in origin square %s", SQUARE_POSITIONS[from_sq]
             )
-            self.board.change_piece_in_location(
-                end_pos[0] - self.current_player, end_pos[1], Empty()
+            return
+
+        board = self.board
+        start_piece = board.piece_at(from_sq)
+        colour = start_piece.colour
+
+        # Everything needed to restore the position in unmake_move
+        captured_piece = None
+        captured_sq = to_sq
+        if flags == EN_PASSANT:
+            captured_sq = to_sq - 8 * colour
+            captured_piece = board.piece_at(captured_sq)
+        elif flags & CAPTURE:
+            captured_piece = board.piece_at(to_sq)
+        self.move_stack.append(
+            (
+                move,
+                code,
+                start_piece,
+                captured_piece,
+                captured_sq,
+                self.castles,
+                self.en_passant,
+                self.halfmove_clock,
+                self.fullmove_number,
+                self.zobrist_key,
+                self.mg_score,
+                self.eg_score,
+                self.phase,
             )
+        )
+        self.key_history.append(self.zobrist_key)
+        castles = self.castles
+        en_passant = self.en_passant
 
-        if start_piece.name == "Pawn" and abs(start_pos[0] - end_pos[0]) == 2:
-            self.en_passant = ((start_pos[0] + end_pos[0]) // 2, start_pos[1])
+        if captured_piece is not None or type(start_piece) is Pawn:
+            self.halfmove_clock = 0
         else:
-            self.en_passant = (-1, -1)
-
-        if start_piece.name == "King":
-            self.castles = [i for i in self.castles if i != start_piece.func("k")]
-            self.castles = [i for i in self.castles if i != start_piece.func("q")]
-        
-        if start_piece.name == "Rook":
-            if start_pos[1] == 1:
-                self.castles = [i for i in self.castles if i != start_piece.func("q")]
-            elif start_pos[1] == 8:
-                self.castles = [i for i in self.castles if i != start_piece.func("k")]
-        
-        if start_piece.name == "King" and abs(start_pos[1] - end_pos[1]) == 2:
-            if end_pos[1] < start_pos[1]:
-                self.board.change_piece_in_location(start_pos[0], 1, Empty())
-                self.board.change_piece_in_location(start_pos[0], 4, Rook(start_piece.colour))
-            elif end_pos[1] > start_pos[1]:
-                self.board.change_piece_in_location(start_pos[0], 8, Empty())
-                self.board.change_piece_in_location(start_pos[0], 6, Rook(start_piece.colour))
+            self.halfmove_clock += 1
 
+        if captured_piece is not None:
+            self.captured[-colour].append(captured_piece)
+            self.remove_piece(captured_sq)
 
+        if flags == DOUBLE_PAWN_PUSH:
+            self.en_passant = SQUARE_POSITIONS[(from_sq + to_sq) // 2]
+        else:
+            self.en_passant = (-1, -1)
 
+        if castles:
+            if type(start_piece) is King:
+                self.castles = self.castles.replace(start_piece.func("k"), "")
+                self.castles = self.castles.replace(start_piece.func("q"), "")
+            if from_sq in CASTLING_CORNERS:
+                self.castles = self.castles.replace(CASTLING_CORNERS[from_sq], "")
+            if to_sq in CASTLING_CORNERS:
+                self.castles = self.castles.replace(CASTLING_CORNERS[to_sq], "")
+
+        if flags == KING_CASTLE:
+            rook = board.piece_at(to_sq + 1)
+            self.remove_piece(to_sq + 1)
+            self.place_piece(to_sq - 1, rook)
+        elif flags == QUEEN_CASTLE:
+            rook = board.piece_at(to_sq - 2)
+            self.remove_piece(to_sq - 2)
+            self.place_piece(to_sq + 1, rook)
+
+        end_piece = start_piece
+        if flags & PROMOTION:
+            end_piece = board.piece_key[start_piece.func(PROMOTION_KINDS[flags & 3])]
+
+        self.remove_piece(from_sq)
+        self.place_piece(to_sq, end_piece)
+
+        key = self.zobrist_key ^ SIDE_KEY
+        if castles != self.castles:
+            key ^= castling_key(castles) ^ castling_key(self.castles)
+        if en_passant != self.en_passant:
+            key ^= en_passant_key(en_passant) ^ en_passant_key(self.en_passant)
+        self.zobrist_key = key
+        if colour == -1:
+            self.fullmove_number += 1
+        if tracing.enabled:
+            tracing.logger.debug("made %s\n%s", code_to_uci(code), self.board)
 
+        self.current_player *= -1
 
-        self.board.change_piece_in_location(*start_pos, Empty())
-        self.board.change_piece_in_location(*end_pos, start_piece)
-        print(self.board)
+    def unmake_move(self) -> Optional[Union[Move, int]]:
+        """
+        Take back the last move played with make_move.
+        Returns:
+            The move that was taken back, as it was passed to make_move.
+            None if there are no moves to take back.
+        """
+        if not self.move_stack:
+            return None
+
+        (
+            move,
+            code,
+            start_piece,
+            captured_piece,
+            captured_sq,
+            self.castles,
+            self.en_passant,
+            self.halfmove_clock,
+            self.fullmove_number,
+            self.zobrist_key,
+            self.mg_score,
+            self.eg_score,
+            self.phase,
+        ) = self.move_stack.pop()
+        self.key_history.pop()
+        to_sq = (code >> 6) & 63
+        flags = code >> 12
+        change = self.board.change_piece_in_location
+        empty = self.board.piece_key["."]
+
+        change(*SQUARE_POSITIONS[to_sq], empty)
+        change(*SQUARE_POSITIONS[code & 63], start_piece)
+
+        if flags == KING_CASTLE:
+            change(*SQUARE_POSITIONS[to_sq + 1], self.board.piece_at(to_sq - 1))
+            change(*SQUARE_POSITIONS[to_sq - 1], empty)
+        elif flags == QUEEN_CASTLE:
+            change(*SQUARE_POSITIONS[to_sq - 2], self.board.piece_at(to_sq + 1))
+            change(*SQUARE_POSITIONS[to_sq + 1], empty)
+
+        if captured_piece is not None:
+            self.captured[-start_piece.colour].pop()
+            change(*SQUARE_POSITIONS[captured_sq], captured_piece)
 
         self.current_player *= -1
+        return move
+
+
+def load_positions(
+    stream: Iterable[str], game: Optional[Game] = None, backend: str = "list"
+) -> Iterator[tuple[Game, dict[str, str]]]:
+    """
+    Load the FEN or EPD on each line of a stream, such as an open file, into
+    one Game that is reset in place for every position.
+    Args:
+        stream: Lines of FEN or EPD
+        game: The game to reuse. A new one is made if this is None.
+        backend: The board backend of a new game
+    Returns:
+        The same Game for every position, so copy anything that must be kept,
+        with the EPD operations of the line.
+    Raises:
+        FENError: If a line is not a valid FEN or EPD
+    """
+    if game is None:
+        game = Game(Fen(STARTING_FEN_STR), backend=backend)
+    for fen, operations in read_fens(stream):
+        game.set_fen(fen)
+        yield game, operations
 
 
 if __name__ == "__main__":
     game = Game()
     print(game.board)
-    piece_locations = game.get_piece_locations(game.current_player)
-    possible_moves = []
-    for piece_location in piece_locations:
-        possible_moves += [
-            {"start_pos": piece_location, "end_pos": end_location}
-            for end_location in game.get_legal_moves(*piece_location)
-        ]
-
-    print(possible_moves[0])
-    game.make_move(**possible_moves[0])
+    possible_moves = game.generate_legal_moves()
+
+    print(possible_moves[0].start_pos, possible_moves[0].end_pos)
+    game.make_move(possible_moves[0])
     print(game.board)
-    pass
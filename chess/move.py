@@ -1,6 +1,59 @@
-from chess.pieces import Piece
+from chess.pieces import Piece, Knight, Bishop, Rook, Queen, King
 from typing import Literal, Optional, Union
 
+# Moves can be packed into a 16-bit int: bits 0-5 hold the origin square,
+# bits 6-11 the destination square (a1 = 0 ... h8 = 63) and bits 12-15 the
+# flags below. Promotion flags carry the piece in their two low bits and have
+# the CAPTURE bit set as well when the promotion takes a piece.
+QUIET = 0
+DOUBLE_PAWN_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8
+
+# Promotion piece letters indexed by the low two flag bits
+PROMOTION_KINDS = "nbrq"
+# Queen first, as generated moves are tried in this order
+PROMOTION_FLAGS = [PROMOTION | 3, PROMOTION | 2, PROMOTION | 1, PROMOTION]
+# Shared promotion pieces so that decoded moves compare equal
+PROMOTION_PIECES = {
+    colour: [Knight(colour), Bishop(colour), Rook(colour), Queen(colour)]
+    for colour in (1, -1)
+}
+
+
+def encode(from_sq: int, to_sq: int, flags: int = QUIET) -> int:
+    return from_sq | to_sq << 6 | flags << 12
+
+
+def code_to(code: int) -> int:
+    return (code >> 6) & 63
+
+
+def code_flags(code: int) -> int:
+    return code >> 12
+
+
+def promotion_kind(code: int) -> Optional[str]:
+    """The promotion piece letter of a packed move, or None."""
+    if code & (PROMOTION << 12):
+        return PROMOTION_KINDS[(code >> 12) & 3]
+    return None
+
+
+def square_name(sq: int) -> str:
+    return chr(97 + (sq & 7)) + str((sq >> 3) + 1)
+
+
+def code_to_uci(code: int) -> str:
+    """UCI long algebraic notation of a packed move, e.g. e2e4 or e7e8q."""
+    uci = square_name(code & 63) + square_name((code >> 6) & 63)
+    if code & (PROMOTION << 12):
+        uci += PROMOTION_KINDS[(code >> 12) & 3]
+    return uci
+
 
 class Move:
     def __init__(
@@ -14,13 +67,66 @@ class Move:
         self.end_pos = end_pos
         self.piece = piece
         self.spaces = spaces
-    
+
+    @classmethod
+    def from_code(cls, code: int) -> "Move":
+        from_sq = code & 63
+        to_sq = (code >> 6) & 63
+        piece = None
+        if code & (PROMOTION << 12):
+            colour = 1 if to_sq >= 56 else -1
+            piece = PROMOTION_PIECES[colour][(code >> 12) & 3]
+        return cls(
+            ((from_sq >> 3) + 1, (from_sq & 7) + 1),
+            ((to_sq >> 3) + 1, (to_sq & 7) + 1),
+            piece=piece,
+        )
+
+    @classmethod
+    def from_uci(cls, uci: str) -> "Move":
+        """
+        Parse UCI long algebraic notation.
+        Raises:
+            ValueError: If the string is not a move in UCI notation
+        """
+        uci = uci.strip()
+        if len(uci) not in (4, 5):
+            raise ValueError(f"not a UCI move: {uci!r}")
+        squares = []
+        for file, rank in (uci[0:2], uci[2:4]):
+            if file not in "abcdefgh" or rank not in "12345678":
+                raise ValueError(f"not a UCI move: {uci!r}")
+            squares.append((int(rank), ord(file) - 96))
+        piece = None
+        if len(uci) == 5:
+            if uci[4] not in PROMOTION_KINDS:
+                raise ValueError(f"not a UCI move: {uci!r}")
+            colour = 1 if squares[1][0] == 8 else -1
+            piece = PROMOTION_PIECES[colour][PROMOTION_KINDS.index(uci[4])]
+        return cls(squares[0], squares[1], piece=piece)
+
+    def to_uci(self) -> str:
+        return str(self)
+
     def __eq__(self, other):
+        if not isinstance(other, Move):
+            return NotImplemented
         start_pos_match = self.start_pos == other.start_pos
         end_pos_match = self.end_pos == other.end_pos
         piece_match = self.piece == other.piece if self.piece and other.piece else True
 
         return start_pos_match and end_pos_match and piece_match
 
+    def __hash__(self) -> int:
+        # A move without a piece equals the same move with any piece, so the
+        # piece is left out
+        return hash((self.start_pos, self.end_pos))
 
-
+    def __str__(self) -> str:
+        """Coordinate notation, e.g. e2e4 or e7e8q."""
+        s = "".join(
+            chr(96 + col) + str(row) for row, col in (self.start_pos, self.end_pos)
+        )
+        if self.piece and type(self.piece) is not King:
+            s += self.piece.piece_str.lower()
+        return s
@@ -0,0 +1,236 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from chess.fen import STARTING_FEN_STR, Fen, read_fens
+from chess.game import BACKENDS, Game
+from chess.move import code_to_uci
+from chess.perft import PERFT_POSITIONS
+from chess.search import Search
+
+# Work is shipped to the pool as FEN strings and UCI moves, never as pickled
+# Game objects, so every task rebuilds its position from a few bytes.
+
+
+def _divide_task(fen_str: str, uci: str, depth: int, backend: str) -> tuple[str, int]:
+    game = Game(Fen(fen_str), backend=backend)
+    game.make_move(game.parse_uci(uci), validate=False)
+    return uci, game.perft(depth - 1)
+
+
+def parallel_divide(
+    fen_str: str = STARTING_FEN_STR,
+    depth: int = 1,
+    workers: Optional[int] = None,
+    backend: str = "list",
+) -> dict[str, int]:
+    """
+    Perft split by root move, with one pool task per root move.
+    Args:
+        fen_str: The position to search
+        depth: Search depth in plies, at least 1
+        workers: Number of processes, defaults to the number of CPUs
+        backend: The board backend each worker uses
+    Returns:
+        The node count of each root move in UCI notation, sorted by move so
+        the result does not depend on the order workers finish in.
+    """
+    game = Game(Fen(fen_str), backend=backend)
+    moves = [code_to_uci(code) for code in game.generate_legal_move_codes()]
+    if depth <= 1:
+        return {uci: 1 for uci in sorted(moves)}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            _divide_task,
+            [fen_str] * len(moves),
+            moves,
+            [depth] * len(moves),
+            [backend] * len(moves),
+        )
+        counts = dict(results)
+    return {uci: counts[uci] for uci in sorted(counts)}
+
+
+def parallel_perft(
+    fen_str: str = STARTING_FEN_STR,
+    depth: int = 1,
+    workers: Optional[int] = None,
+    backend: str = "list",
+) -> tuple[int, float]:
+    """
+    Returns:
+        The number of leaf nodes and the wall-clock time taken in seconds.
+    """
+    start = time.perf_counter()
+    nodes = sum(parallel_divide(fen_str, depth, workers, backend).values())
+    return nodes, time.perf_counter() - start
+
+
+class AnalysisResult:
+    def __init__(
+        self,
+        fen: str,
+        best_move: Optional[str],
+        score: int,
+        pv: list[str],
+        depth: int,
+        nodes: int,
+        seconds: float,
+    ):
+        self.fen = fen
+        self.best_move = best_move
+        self.score = score
+        self.pv = pv
+        self.depth = depth
+        self.nodes = nodes
+        self.seconds = seconds
+
+
+def _analyse_task(
+    fen_str: str, depth: int, hash_mb: float, backend: str
+) -> AnalysisResult:
+    game = Game(Fen(fen_str), backend=backend)
+    result = Search(game, hash_mb=hash_mb).search(depth=depth)
+    return AnalysisResult(
+        fen_str,
+        str(result.best_move) if result.best_move is not None else None,
+        result.score,
+        [str(move) for move in result.pv],
+        result.depth,
+        result.nodes,
+        result.seconds,
+    )
+
+
+def analyse_positions(
+    fen_strs: list[str],
+    depth: int,
+    workers: Optional[int] = None,
+    hash_mb: float = 16,
+    backend: str = "list",
+) -> list[AnalysisResult]:
+    """
+    Run a fixed-depth search on each position, spreading the positions over a
+    process pool. Every position gets its own transposition table of hash_mb.
+    Returns:
+        One result per position, in the order the positions were given.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                _analyse_task,
+                fen_strs,
+                [depth] * len(fen_strs),
+                [hash_mb] * len(fen_strs),
+                [backend] * len(fen_strs),
+            )
+        )
+
+
+def scaling(
+    fen_str: str, depth: int, worker_counts: list[int], backend: str = "list"
+) -> list[tuple[int, int, float]]:
+    """
+    Run the same parallel perft with each worker count.
+    Returns:
+        The worker count, node count and wall-clock seconds of each run.
+    """
+    runs = []
+    for workers in worker_counts:
+        nodes, seconds = parallel_perft(fen_str, depth, workers, backend)
+        runs.append((workers, nodes, seconds))
+    return runs
+
+
+def print_scaling(runs: list[tuple[int, int, float]]) -> None:
+    base = runs[0][2]
+    print(f"{'workers':>7} {'nodes':>12} {'time (s)':>9} {'nps':>9} {'speedup':>8}")
+    for workers, nodes, seconds in runs:
+        print(
+            f"{workers:>7} {nodes:>12} {seconds:>9.3f} {nodes / seconds:>9.0f} "
+            f"{base / seconds:>8.2f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chess.parallel",
+        description="Run perft or batch analysis across a process pool.",
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="list")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="number of processes"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    perft = commands.add_parser("perft", help="parallel perft split by root move")
+    perft.add_argument("depth", type=int, help="search depth in plies")
+    position = perft.add_mutually_exclusive_group()
+    position.add_argument("--fen", help="FEN of the position to search")
+    position.add_argument("--position", choices=PERFT_POSITIONS, default="start")
+    perft.add_argument(
+        "--divide", action="store_true", help="print the node count of each root move"
+    )
+    perft.add_argument(
+        "--scaling",
+        action="store_true",
+        help="repeat the run with 1, 2, 4, ... workers up to --workers",
+    )
+
+    analyse = commands.add_parser("analyse", help="search every FEN in a file")
+    analyse.add_argument("file", help="file with one FEN or EPD per line")
+    analyse.add_argument("--depth", type=int, default=3)
+    analyse.add_argument("--hash", type=float, default=16, help="hash size in MB")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "analyse":
+        with open(args.file) as file:
+            fen_strs = [str(fen) for fen, _ in read_fens(file)]
+        start = time.perf_counter()
+        results = analyse_positions(
+            fen_strs, args.depth, args.workers, args.hash, args.backend
+        )
+        seconds = time.perf_counter() - start
+        for result in results:
+            print(
+                f"{result.fen} | bestmove {result.best_move} score {result.score} "
+                f"nodes {result.nodes}"
+            )
+        nodes = sum(result.nodes for result in results)
+        print(
+            f"positions {len(results)} nodes {nodes} time {seconds:.3f}s "
+            f"workers {args.workers}"
+        )
+        return 0
+
+    fen_str = args.fen or PERFT_POSITIONS[args.position][0]
+    if args.scaling:
+        worker_counts = []
+        workers = 1
+        while workers < args.workers:
+            worker_counts.append(workers)
+            workers *= 2
+        worker_counts.append(args.workers)
+        print_scaling(scaling(fen_str, args.depth, worker_counts, args.backend))
+        return 0
+
+    start = time.perf_counter()
+    counts = parallel_divide(fen_str, args.depth, args.workers, args.backend)
+    seconds = time.perf_counter() - start
+    if args.divide:
+        for move, count in counts.items():
+            print(f"{move}: {count}")
+    nodes = sum(counts.values())
+    print(
+        f"nodes {nodes} time {seconds:.3f}s nps {nodes / seconds:.0f} "
+        f"workers {args.workers}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+import argparse
+import time
+
+from chess.fen import STARTING_FEN_STR, Fen
+from chess.game import BACKENDS, Game
+
+# Standard perft positions with known leaf counts for depth 1, 2, 3, ...
+# https://www.chessprogramming.org/Perft_Results
+PERFT_POSITIONS = {
+    "start": (
+        STARTING_FEN_STR,
+        [20, 400, 8902, 197281, 4865609, 119060324],
+    ),
+    "kiwipete": (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        [48, 2039, 97862, 4085603, 193690690],
+    ),
+    "position3": (
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        [14, 191, 2812, 43238, 674624, 11030083],
+    ),
+    "position4": (
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        [6, 264, 9467, 422333, 15833292],
+    ),
+    "position5": (
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        [44, 1486, 62379, 2103487, 89941194],
+    ),
+    "position6": (
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        [46, 2079, 89890, 3894594, 164075551],
+    ),
+}
+
+
+def run_perft(fen_str: str, depth: int, backend: str = "list") -> tuple[int, float]:
+    """
+    Run perft on a position.
+    Returns:
+        The number of leaf nodes and the time taken in seconds.
+    """
+    game = Game(Fen(fen_str), backend=backend)
+    start = time.perf_counter()
+    nodes = game.perft(depth)
+    return nodes, time.perf_counter() - start
+
+
+def run_divide(fen_str: str, depth: int, backend: str = "list") -> dict[str, int]:
+    game = Game(Fen(fen_str), backend=backend)
+    return game.divide(depth)
+
+
+def benchmark(depth: int, backend: str = "list") -> bool:
+    """
+    Run every standard position to depth (or its deepest known count) and
+    print nodes, time and nodes per second.
+    Returns:
+        Whether every node count matched.
+    """
+    all_passed = True
+    total_nodes = 0
+    total_time = 0.0
+    print(f"{'position':<10} {'depth':>5} {'nodes':>12} {'time (s)':>9} {'nps':>9}")
+    for name, (fen_str, expected) in PERFT_POSITIONS.items():
+        position_depth = min(depth, len(expected))
+        nodes, seconds = run_perft(fen_str, position_depth, backend)
+        passed = nodes == expected[position_depth - 1]
+        all_passed = all_passed and passed
+        total_nodes += nodes
+        total_time += seconds
+        print(
+            f"{name:<10} {position_depth:>5} {nodes:>12} {seconds:>9.3f} "
+            f"{nodes / seconds:>9.0f}{'' if passed else '  MISMATCH'}"
+        )
+    print(
+        f"{'total':<10} {'':>5} {total_nodes:>12} {total_time:>9.3f} "
+        f"{total_nodes / total_time:>9.0f}"
+    )
+    return all_passed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chess.perft",
+        description="Count move generator leaf nodes and measure nodes/second.",
+    )
+    parser.add_argument("depth", type=int, help="search depth in plies")
+    position = parser.add_mutually_exclusive_group()
+    position.add_argument("--fen", help="FEN of the position to search")
+    position.add_argument(
+        "--position",
+        choices=PERFT_POSITIONS,
+        help="one of the standard perft positions",
+    )
+    parser.add_argument(
+        "--divide", action="store_true", help="print the node count of each root move"
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="list")
+    args = parser.parse_args(argv)
+
+    if args.fen is None and args.position is None:
+        return 0 if benchmark(args.depth, args.backend) else 1
+
+    fen_str = args.fen or PERFT_POSITIONS[args.position][0]
+    if args.divide:
+        start = time.perf_counter()
+        counts = run_divide(fen_str, args.depth, args.backend)
+        seconds = time.perf_counter() - start
+        for move, count in sorted(counts.items()):
+            print(f"{move}: {count}")
+        nodes = sum(counts.values())
+    else:
+        nodes, seconds = run_perft(fen_str, args.depth, args.backend)
+    print(f"nodes {nodes} time {seconds:.3f}s nps {nodes / seconds:.0f}")
+
+    if args.position is not None:
+        expected = PERFT_POSITIONS[args.position][1]
+        if args.depth <= len(expected) and nodes != expected[args.depth - 1]:
+            print(f"expected {expected[args.depth - 1]}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,378 @@
+import argparse
+import re
+import time
+from typing import Iterable, Iterator, Optional, TextIO
+
+from chess.exceptions import FENError, PGNError
+from chess.fen import STARTING_FEN_STR, Fen
+from chess.game import BACKENDS, Game
+from chess.move import (
+    CAPTURE,
+    KING_CASTLE,
+    QUEEN_CASTLE,
+    encode,
+    promotion_kind,
+    square_name,
+)
+from chess.pieces import Pawn
+
+# One movetext token after optional whitespace. The group that matched tells
+# what it is, in this order: comment start, rest-of-line comment, variation
+# start, variation end, NAG, result, move number, move.
+TOKEN = re.compile(
+    r"\s*(?:(\{)|(;)|(\()|(\))|(\$\d+)|(1-0|0-1|1/2-1/2|\*)|(\d+\.+)|([^\s{}();$]+))"
+)
+(
+    COMMENT,
+    LINE_COMMENT,
+    VARIATION,
+    VARIATION_END,
+    NAG,
+    RESULT,
+    MOVE_NUMBER,
+    MOVE,
+) = range(1, 9)
+HEADER = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+SAN = re.compile(r"([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?")
+CASTLING_SAN = {
+    "O-O": KING_CASTLE,
+    "0-0": KING_CASTLE,
+    "O-O-O": QUEEN_CASTLE,
+    "0-0-0": QUEEN_CASTLE,
+}
+
+# The tags every exported game carries, in their required order
+SEVEN_TAG_ROSTER = {
+    "Event": "?",
+    "Site": "?",
+    "Date": "????.??.??",
+    "Round": "?",
+    "White": "?",
+    "Black": "?",
+    "Result": "*",
+}
+LINE_LENGTH = 80
+
+
+class PGNGame:
+    """
+    One game read from PGN: its tags, its moves as SAN strings and its
+    result. Moves are resolved against a Game only when the game is replayed,
+    so games that are not needed can be skipped cheaply.
+    """
+
+    def __init__(self, headers: dict[str, str], sans: list[str], result: str):
+        self.headers = headers
+        self.sans = sans
+        self.result = result
+
+    @property
+    def fen(self) -> str:
+        return self.headers.get("FEN", STARTING_FEN_STR)
+
+    def replay(
+        self, validate: bool = True, backend: str = "list"
+    ) -> Iterator[tuple[Game, int]]:
+        """
+        Play the game through, yielding the position before each move (the
+        same Game object each time, so copy anything that must be kept) and
+        the move packed as an int.
+        Args:
+            validate: Check every move is legal. For trusted input, skipping
+                this only generates moves for the pieces that could have
+                made each move.
+            backend: The board backend of the Game
+        Raises:
+            PGNError: If the FEN tag or a move cannot be read, or a move does
+                not fit the position
+        """
+        try:
+            fen = Fen(self.fen)
+        except FENError as error:
+            raise PGNError(f"bad FEN tag: {error}") from error
+        game = Game(fen, backend=backend)
+        for san in self.sans:
+            code = parse_san(game, san, validate)
+            yield game, code
+            game.make_move(code, validate=False)
+
+    def moves(self, validate: bool = True) -> list[int]:
+        """The moves of the game, packed as ints."""
+        return [code for _, code in self.replay(validate)]
+
+
+def read_games(stream: Iterable[str]) -> Iterator[PGNGame]:
+    """
+    Read games one at a time from lines of PGN, such as an open file. Only
+    the game being read is held in memory, so archives of any size can be
+    streamed. Comments, variations and NAGs are skipped.
+    """
+    headers: dict[str, str] = {}
+    sans: list[str] = []
+    in_comment = False
+    depth = 0
+    for line in stream:
+        if not in_comment and not depth:
+            stripped = line.strip()
+            if stripped.startswith("["):
+                if sans:
+                    yield PGNGame(headers, sans, headers.get("Result", "*"))
+                    headers, sans = {}, []
+                match = HEADER.match(stripped)
+                if match:
+                    headers[match.group(1)] = re.sub(r"\\(.)", r"\1", match.group(2))
+                continue
+            if stripped.startswith("%"):
+                continue
+
+        pos = 0
+        while pos < len(line):
+            if in_comment:
+                end = line.find("}", pos)
+                if end < 0:
+                    break
+                pos = end + 1
+                in_comment = False
+                continue
+            match = TOKEN.match(line, pos)
+            if match is None:
+                break
+            pos = match.end()
+            kind = match.lastindex
+            if kind == COMMENT:
+                in_comment = True
+            elif kind == LINE_COMMENT:
+                break
+            elif kind == VARIATION:
+                depth += 1
+            elif kind == VARIATION_END:
+                depth = max(depth - 1, 0)
+            elif depth:
+                continue
+            elif kind == RESULT:
+                yield PGNGame(headers, sans, match.group(RESULT))
+                headers, sans = {}, []
+            elif kind == MOVE:
+                sans.append(match.group(MOVE))
+
+    if headers or sans:
+        yield PGNGame(headers, sans, headers.get("Result", "*"))
+
+
+def parse_san(game: Game, san: str, validate: bool = True) -> int:
+    """
+    Resolve a move in Standard Algebraic Notation against the position.
+    Args:
+        game: The game whose side to move plays the move
+        san: The move, e.g. "Nbd7", "exd5", "e8=Q+" or "O-O"
+        validate: Check the move is legal rather than only pseudo-legal
+    Returns:
+        The move packed as an int.
+    Raises:
+        PGNError: If the move cannot be read, or is illegal or ambiguous
+    """
+    board = game.board
+    white = game.current_player == 1
+    token = san.rstrip("+#!?")
+    if token in CASTLING_SAN:
+        flags = CASTLING_SAN[token]
+        kings = board.squares_of_piece("K" if white else "k")
+        if not kings:
+            raise PGNError(f"illegal move {san}")
+        king = kings[0]
+        code = encode(king, king + (2 if flags == KING_CASTLE else -2), flags)
+        if validate and code not in game.generate_legal_move_codes():
+            raise PGNError(f"illegal move {san}")
+        return code
+
+    match = SAN.fullmatch(token)
+    if match is None:
+        raise PGNError(f"cannot read move {san}")
+    letter, from_file, from_rank, to_name, promotion = match.groups()
+    piece_str = (letter or "P") if white else (letter or "P").lower()
+    to_sq = (int(to_name[1]) - 1) * 8 + ord(to_name[0]) - 97
+    promotion = promotion.lower() if promotion else None
+
+    if validate:
+        candidates = game.generate_legal_move_codes()
+    else:
+        candidates = []
+        for sq in board.squares_of_piece(piece_str):
+            candidates += game.get_move_codes(sq, board.piece_at(sq))
+    matches = []
+    for code in candidates:
+        from_sq = code & 63
+        if (
+            (code >> 6) & 63 == to_sq
+            and board.piece_at(from_sq).piece_str == piece_str
+            and (from_file is None or from_sq % 8 == ord(from_file) - 97)
+            and (from_rank is None or from_sq // 8 == int(from_rank) - 1)
+            and promotion_kind(code) == promotion
+        ):
+            matches.append(code)
+    if len(matches) > 1 and not validate:
+        # SAN leaves out what a pin rules out, so this needs legality
+        legal = set(game.generate_legal_move_codes())
+        matches = [code for code in matches if code in legal]
+    if len(matches) != 1:
+        raise PGNError(f"{'ambiguous' if matches else 'illegal'} move {san}")
+    return matches[0]
+
+
+def format_san(game: Game, code: int, legal: Optional[list[int]] = None) -> str:
+    """
+    Write a legal move in Standard Algebraic Notation.
+    Args:
+        game: The game the move is about to be played in
+        code: The move, packed as an int
+        legal: The legal moves of the position, if already generated
+    """
+    board = game.board
+    from_sq, to_sq, flags = code & 63, (code >> 6) & 63, code >> 12
+    if flags == KING_CASTLE:
+        san = "O-O"
+    elif flags == QUEEN_CASTLE:
+        san = "O-O-O"
+    else:
+        piece = board.piece_at(from_sq)
+        capture = "x" if flags & CAPTURE else ""
+        if type(piece) is Pawn:
+            san = square_name(to_sq)
+            if capture:
+                san = square_name(from_sq)[0] + capture + san
+            kind = promotion_kind(code)
+            if kind:
+                san += "=" + kind.upper()
+        else:
+            if legal is None:
+                legal = game.generate_legal_move_codes()
+            others = [
+                other & 63
+                for other in legal
+                if other != code
+                and (other >> 6) & 63 == to_sq
+                and board.piece_at(other & 63) is piece
+            ]
+            disambiguation = ""
+            if others:
+                name = square_name(from_sq)
+                if all(sq % 8 != from_sq % 8 for sq in others):
+                    disambiguation = name[0]
+                elif all(sq // 8 != from_sq // 8 for sq in others):
+                    disambiguation = name[1]
+                else:
+                    disambiguation = name
+            san = piece.letter.upper() + disambiguation + capture + square_name(to_sq)
+
+    game.make_move(code, validate=False)
+    if game.check_if_in_check():
+        san += "+" if game.generate_legal_move_codes() else "#"
+    game.unmake_move()
+    return san
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def format_game(
+    codes: list[int],
+    headers: Optional[dict[str, str]] = None,
+    fen_str: str = STARTING_FEN_STR,
+    result: str = "*",
+) -> str:
+    """
+    Write a game as PGN.
+    Args:
+        codes: The moves played from fen_str, packed as ints
+        headers: Tags to write, after the seven tag roster
+        fen_str: The starting position, written as a FEN tag if it is not
+            the standard one
+        result: "1-0", "0-1", "1/2-1/2" or "*"
+    """
+    tags = {**SEVEN_TAG_ROSTER, **(headers or {}), "Result": result}
+    if fen_str != STARTING_FEN_STR:
+        tags["SetUp"] = "1"
+        tags["FEN"] = fen_str
+    lines = [f'[{name} "{escape(value)}"]' for name, value in tags.items()]
+    lines.append("")
+
+    game = Game(Fen(fen_str))
+    number = game.fullmove_number
+    tokens = []
+    for index, code in enumerate(codes):
+        legal = game.generate_legal_move_codes()
+        if code not in legal:
+            raise PGNError(
+                f"illegal move {square_name(code & 63)}{square_name((code >> 6) & 63)}"
+            )
+        if game.current_player == 1:
+            tokens.append(f"{number}.")
+        elif index == 0:
+            tokens.append(f"{number}...")
+        tokens.append(format_san(game, code, legal))
+        game.make_move(code, validate=False)
+        if game.current_player == 1:
+            number += 1
+    tokens.append(result)
+
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_LENGTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def write_game(
+    stream: TextIO,
+    codes: list[int],
+    headers: Optional[dict[str, str]] = None,
+    fen_str: str = STARTING_FEN_STR,
+    result: str = "*",
+) -> None:
+    """Append a game to a PGN file, followed by the blank line between games."""
+    stream.write(format_game(codes, headers, fen_str, result) + "\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chess.pgn",
+        description="Replay every game of a PGN file and report throughput.",
+    )
+    parser.add_argument("file", help="PGN file to read")
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="trust the moves instead of checking they are legal",
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="list")
+    parser.add_argument("--limit", type=int, help="stop after this many games")
+    args = parser.parse_args(argv)
+
+    games = moves = errors = 0
+    start = time.perf_counter()
+    with open(args.file, encoding="utf-8", errors="replace") as file:
+        for pgn_game in read_games(file):
+            try:
+                for _ in pgn_game.replay(not args.no_validate, args.backend):
+                    moves += 1
+            except PGNError as error:
+                errors += 1
+                print(f"game {games + 1}: {error}")
+            games += 1
+            if args.limit is not None and games >= args.limit:
+                break
+    seconds = time.perf_counter() - start
+    print(
+        f"games {games} moves {moves} errors {errors} time {seconds:.3f}s "
+        f"games/s {games / seconds:.1f} moves/s {moves / seconds:.0f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
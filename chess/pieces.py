@@ -1,87 +1,113 @@
 from abc import abstractmethod
 from chess.constants import POSITION
-from abc import abstractmethod
-from chess.constants import POSITION
+
+# One instance per piece type and colour, shared by every board
+_INSTANCES: dict[tuple[type, int], "Piece"] = {}
 
 
 class Piece:
-    colour: int
-    piece_str: str
+    """
+    Pieces are immutable flyweights: Knight(1) always returns the same white
+    knight, so boards hold references to shared objects and a piece's type can
+    be tested by identity, e.g. ``type(piece) is Knight``.
+    """
+
+    __slots__ = ("colour", "piece_str")
     colour: int
     piece_str: str
 
-    def __init__(self, colour: int):
-        self.colour = colour
-        if colour == 1:
-            self.func = lambda x: x.upper()
-        elif colour == -1:
-            self.func = lambda x: x.lower()
+    # Shared by every instance of a type
+    letter = ""
+    name = ""
+    value = 0
 
-    @abstractmethod
-    def get_legal_moves(self, board, pos: POSITION) -> list[POSITION]: ...
+    def __new__(cls, colour: int):
+        piece = _INSTANCES.get((cls, colour))
+        if piece is None:
+            piece = object.__new__(cls)
+            object.__setattr__(piece, "colour", colour)
+            object.__setattr__(
+                piece, "piece_str", cls.letter.upper() if colour == 1 else cls.letter
+            )
+            _INSTANCES[(cls, colour)] = piece
+        return piece
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} pieces are immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
+    def __reduce__(self):
+        return (type(self), (self.colour,))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.colour})"
+
+    def func(self, s: str) -> str:
+        """Convert a piece letter to this piece's case (upper case for white)."""
+        return s.upper() if self.colour == 1 else s.lower()
 
     @abstractmethod
     def get_legal_moves(self, board, pos: POSITION) -> list[POSITION]: ...
 
 
 class Knight(Piece):
-
-    def __init__(self, colour):
-        super().__init__(colour)
-        self.piece_str = self.func("n")
-        self.name = "Knight"
-        self.value = 3
-
+    __slots__ = ()
+    name = "Knight"
+    letter = "n"
+    value = 3
 
 
 class Pawn(Piece):
-    def __init__(self, colour):
-        super().__init__(colour)
-        self.piece_str = self.func("p")
-        self.name = "Pawn"
-        self.value = 1
+    __slots__ = ()
+    name = "Pawn"
+    letter = "p"
+    value = 1
 
 
 class Rook(Piece):
-    def __init__(self, colour):
-        super().__init__(colour)
-        self.piece_str = self.func("r")
-        self.name = "Rook"
-        self.value = 5
+    __slots__ = ()
+    name = "Rook"
+    letter = "r"
+    value = 5
 
 
 class Bishop(Piece):
-    def __init__(self, colour):
-        super().__init__(colour)
-        self.piece_str = self.func("b")
-        self.name = "Bishop"
-        self.value = 3
-
+    __slots__ = ()
+    name = "Bishop"
+    letter = "b"
+    value = 3
 
 
 class Queen(Piece):
-    def __init__(self, colour):
-        super().__init__(colour)
-        self.piece_str = self.func("q")
-        self.name = "Queen"
-        self.value = 9
-
+    __slots__ = ()
+    name = "Queen"
+    letter = "q"
+    value = 9
 
 
 class King(Piece):
-    def __init__(self, colour):
-        super().__init__(colour)
-        self.piece_str = self.func("k")
-        self.name = "King"
-        self.value = 100
+    __slots__ = ()
+    name = "King"
+    letter = "k"
+    value = 100
 
 
 class Empty(Piece):
+    __slots__ = ()
+    name = "Empty"
+    letter = "."
+    value = 0
 
-class Empty(Piece):
-    def __init__(self):
-        self.colour = 0
-        self.piece_str = "."
-        self.name = "Empty"
-        self.value = 0
+    def __new__(cls):
+        return super().__new__(cls, 0)
+
+    def __reduce__(self):
+        return (Empty, ())
+
+
+EMPTY_SQUARE = Empty()
@@ -0,0 +1,531 @@
+import argparse
+import time
+from array import array
+from typing import Callable, Iterator, Optional
+
+from chess.evaluation import evaluate
+from chess.exceptions import SearchTimeout
+from chess.fen import Fen
+from chess.game import BACKENDS, Game
+from chess.move import CAPTURE, PROMOTION, PROMOTION_PIECES, Move
+from chess.perft import PERFT_POSITIONS
+from chess.tablebase import Tablebases
+from chess.timeman import TimeManager
+
+MATE_SCORE = 100_000
+INFINITY = 1_000_000
+# Scores beyond this are mates; they are stored in the table relative to the
+# node so that they stay correct when reached through a different path
+MATE_THRESHOLD = MATE_SCORE - 1_000
+MAX_DEPTH = 64
+MAX_PLY = 128
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results, sized from a memory budget.
+
+    Entries live in two flat arrays of 64-bit ints (the full key XORed with
+    the packed data, for verification, and the packed data), grouped into
+    buckets of BUCKET_SIZE slots. Storing the key XORed with the data means an
+    entry whose two halves come from different writes (possible when several
+    processes share the table without locks) fails verification and reads as
+    a miss. On a store the bucket's slot with the same key is reused, otherwise
+    the shallowest entry is replaced, preferring entries left over from
+    earlier searches.
+    """
+
+    BUCKET_SIZE = 4
+    ENTRY_BYTES = 16
+    # Packed data layout: move (16 bits, as packed by chess.move), depth (8),
+    # flag (2), age (6), score
+    SCORE_OFFSET = 1 << 21
+
+    def __init__(self, size_mb: float = 16):
+        entries = max(self.BUCKET_SIZE, int(size_mb * 1024 * 1024) // self.ENTRY_BYTES)
+        self.num_buckets = entries // self.BUCKET_SIZE
+        self.size = self.num_buckets * self.BUCKET_SIZE
+        self.age = 0
+        self.clear()
+
+    def clear(self) -> None:
+        self.keys = array("Q", bytes(8 * self.size))
+        self.data = array("Q", bytes(8 * self.size))
+
+    def new_search(self) -> None:
+        self.age = (self.age + 1) & 63
+
+    def probe(self, key: int) -> Optional[tuple[int, int, int, int]]:
+        """
+        Returns:
+            The stored packed move, depth, bound flag and score.
+            None if the position is not in the table.
+        """
+        start = (key % self.num_buckets) * self.BUCKET_SIZE
+        keys = self.keys
+        for index in range(start, start + self.BUCKET_SIZE):
+            data = self.data[index]
+            if data and keys[index] ^ data == key:
+                return (
+                    data & 0xFFFF,
+                    (data >> 16) & 0xFF,
+                    (data >> 24) & 0x3,
+                    (data >> 32) - self.SCORE_OFFSET,
+                )
+        return None
+
+    def store(self, key: int, move: int, depth: int, flag: int, score: int) -> None:
+        start = (key % self.num_buckets) * self.BUCKET_SIZE
+        keys = self.keys
+        data = self.data
+        replace = start
+        replace_worth = INFINITY
+        for index in range(start, start + self.BUCKET_SIZE):
+            entry = data[index]
+            same_key = keys[index] ^ entry == key
+            if same_key or not entry:
+                replace = index
+                # Keep the old best move if this search did not find one
+                if not move and same_key:
+                    move = entry & 0xFFFF
+                break
+            worth = (entry >> 16) & 0xFF
+            if (entry >> 26) & 0x3F == self.age:
+                worth += 256
+            if worth < replace_worth:
+                replace = index
+                replace_worth = worth
+        entry = (
+            move
+            | min(depth, 255) << 16
+            | flag << 24
+            | self.age << 26
+            | (score + self.SCORE_OFFSET) << 32
+        )
+        keys[replace] = key ^ entry
+        data[replace] = entry
+
+    def hashfull(self) -> int:
+        """Permille of the first thousand slots used by the current search."""
+        sample = min(1000, self.size)
+        used = sum(
+            1
+            for index in range(sample)
+            if self.data[index] and (self.data[index] >> 26) & 0x3F == self.age
+        )
+        return used * 1000 // sample
+
+
+class SearchResult:
+    def __init__(
+        self,
+        best_move: Optional[Move],
+        score: int,
+        pv: list[Move],
+        depth: int,
+        nodes: int,
+        seconds: float,
+    ):
+        self.best_move = best_move
+        self.score = score
+        self.pv = pv
+        self.depth = depth
+        self.nodes = nodes
+        self.seconds = seconds
+        self.nps = int(nodes / seconds) if seconds > 0 else 0
+
+
+class Search:
+    """
+    Negamax alpha-beta search over a Game with iterative deepening, a
+    quiescence search over captures and a shared transposition table.
+    """
+
+    # Limits are checked every CHECK_INTERVAL nodes (a power of two), which
+    # bounds how long a stop request can go unnoticed
+    CHECK_INTERVAL = 256
+
+    def __init__(
+        self,
+        game: Game,
+        hash_mb: float = 16,
+        table: Optional[TranspositionTable] = None,
+        tablebases: Optional[Tablebases] = None,
+    ):
+        self.game = game
+        self.table = table if table is not None else TranspositionTable(hash_mb)
+        # Endgame tables probed below the root, where they end the search
+        self.tablebases = tablebases
+        self.nodes = 0
+        self.stopped = False
+        self.deadline: Optional[float] = None
+        self.node_limit: Optional[int] = None
+        self.time_manager: Optional[TimeManager] = None
+        # Principal variation per ply, as packed moves
+        self.pv: list[list[int]] = [[] for _ in range(MAX_PLY + 1)]
+        # The last two quiet moves per ply that caused a beta cutoff
+        self.killers: list[list[int]] = [[0, 0] for _ in range(MAX_PLY + 1)]
+        # Cutoff credit of quiet moves by side to move (white first) and
+        # origin and destination square
+        self.history: list[list[int]] = [[0] * 4096, [0] * 4096]
+
+    def search(
+        self,
+        depth: int = MAX_DEPTH,
+        time_limit: Optional[float] = None,
+        nodes: Optional[int] = None,
+        on_iteration: Optional[Callable[[SearchResult], None]] = None,
+        start_depth: int = 1,
+        time_manager: Optional[TimeManager] = None,
+    ) -> SearchResult:
+        """
+        Search the game's current position.
+        Args:
+            depth: The deepest iteration to run
+            time_limit: Seconds to search before stopping
+            nodes: Number of nodes to search before stopping
+            on_iteration: Called with the result of every completed iteration
+            start_depth: The first iteration to run, so that several searches
+                sharing a table can work at different depths
+            time_manager: Sets a hard deadline (on top of any time_limit) and
+                decides after each iteration whether to start another
+        Returns:
+            The result of the deepest completed iteration.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = start + time_limit if time_limit is not None else None
+        self.node_limit = nodes
+        self.time_manager = time_manager
+        if time_manager is not None:
+            time_manager.start()
+            if self.deadline is None or time_manager.hard_deadline < self.deadline:
+                self.deadline = time_manager.hard_deadline
+        self.table.new_search()
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self.history = [[0] * 4096, [0] * 4096]
+        stack_size = len(self.game.move_stack)
+
+        legal_moves = self.game.generate_legal_moves()
+        result = SearchResult(
+            legal_moves[0] if legal_moves else None, 0, legal_moves[:1], 0, 0, 0.0
+        )
+        if len(legal_moves) <= 1:
+            self.stopped = False
+            return result
+
+        for iteration in range(start_depth, depth + 1):
+            try:
+                score = self.negamax(iteration, -INFINITY, INFINITY, 0)
+            except SearchTimeout:
+                # Unwind the moves left on the board by the interrupted iteration
+                while len(self.game.move_stack) > stack_size:
+                    self.game.unmake_move()
+                break
+            pv = [Move.from_code(code) for code in self.pv[0]]
+            result = SearchResult(
+                pv[0],
+                score,
+                pv,
+                iteration,
+                self.nodes,
+                time.perf_counter() - start,
+            )
+            if on_iteration is not None:
+                on_iteration(result)
+            if abs(score) >= MATE_THRESHOLD:
+                break
+            time_manager = self.time_manager
+            if time_manager is not None:
+                time_manager.update(self.pv[0][0])
+                if time_manager.should_stop():
+                    break
+
+        # A stop requested before or during this search must not carry over
+        self.stopped = False
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - start
+        result.nps = int(result.nodes / result.seconds) if result.seconds > 0 else 0
+        return result
+
+    def stop(self) -> None:
+        """Stop the running search, or the next one if none is running."""
+        self.stopped = True
+
+    def check_limits(self) -> None:
+        if self.stopped:
+            raise SearchTimeout()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def evaluate(self) -> int:
+        return evaluate(self.game)
+
+    def capture_score(self, move: int) -> int:
+        """MVV-LVA: most valuable victim first, then least valuable attacker."""
+        piece_at = self.game.board.piece_at
+        attacker = piece_at(move & 63)
+        score = 0
+        if move & (CAPTURE << 12):
+            # En passant captures land on an empty square and take a pawn
+            victim = piece_at((move >> 6) & 63).value or 1
+            score = 10 * victim - attacker.value
+        if move & (PROMOTION << 12):
+            score += 10 * PROMOTION_PIECES[attacker.colour][(move >> 12) & 3].value
+        return score
+
+    def order_moves(self, moves: list[int], table_move: int) -> list[int]:
+        """Table move first, then captures by most valuable victim, then the rest."""
+        scored = []
+        for move in moves:
+            if move == table_move:
+                score = INFINITY
+            elif move & (CAPTURE << 12):
+                score = 1000 + self.capture_score(move)
+            else:
+                score = 0
+            scored.append((score, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def pick_moves(self, table_move: int, ply: int) -> Iterator[int]:
+        """
+        Yield the legal moves in stages, so that a cutoff early on saves the
+        work of the later stages:
+
+        1. The table move, checked for legality on its own, before any moves
+           are generated.
+        2. Captures that do not lose material by static exchange evaluation,
+           and promotions, by MVV-LVA.
+        3. The killer moves of this ply.
+        4. The other quiet moves, by history score. These are only scored
+           and sorted once the earlier stages have failed to cut off.
+        5. Captures that lose material.
+
+        The caller plays and takes back each move before asking for the next.
+        """
+        game = self.game
+        if table_move and game.is_legal(table_move):
+            yield table_move
+
+        tactical = []
+        bad_captures = []
+        quiets = []
+        for move in game.generate_legal_move_codes():
+            if move == table_move:
+                continue
+            if move & (PROMOTION << 12):
+                tactical.append(move)
+            elif move & (CAPTURE << 12):
+                if game.see(move) < 0:
+                    bad_captures.append(move)
+                else:
+                    tactical.append(move)
+            else:
+                quiets.append(move)
+        tactical.sort(key=self.capture_score, reverse=True)
+        yield from tactical
+
+        killers = [move for move in self.killers[ply] if move and move in quiets]
+        yield from killers
+
+        history = self.history[game.current_player == -1]
+        rest = [move for move in quiets if move not in killers]
+        rest.sort(key=lambda move: history[move & 4095], reverse=True)
+        yield from rest
+
+        bad_captures.sort(key=self.capture_score, reverse=True)
+        yield from bad_captures
+
+    def record_cutoff(self, move: int, depth: int, ply: int) -> None:
+        """Credit a quiet move that caused a beta cutoff."""
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[self.game.current_player == -1][move & 4095] += depth * depth
+
+    def negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.pv[ply] = []
+        self.nodes += 1
+        if not self.nodes & (self.CHECK_INTERVAL - 1):
+            self.check_limits()
+        # A repetition is scored as a draw straight away: if it was worth
+        # repeating once it is worth repeating again
+        if ply > 0 and (self.game.halfmove_clock >= 100 or self.game.repetitions()):
+            return 0
+        if self.tablebases is not None and ply > 0:
+            found = self.tablebases.probe(self.game)
+            if found is not None:
+                wdl, plies = found
+                if wdl > 0:
+                    return MATE_SCORE - ply - plies
+                if wdl < 0:
+                    return -MATE_SCORE + ply + plies
+                return 0
+        if depth <= 0 or ply >= MAX_PLY:
+            return self.quiescence(alpha, beta, ply)
+
+        game = self.game
+        key = game.zobrist_key
+        original_alpha = alpha
+        table_move = 0
+        entry = self.table.probe(key)
+        if entry is not None:
+            table_move, table_depth, flag, table_score = entry
+            if ply > 0 and table_depth >= depth:
+                table_score = score_from_table(table_score, ply)
+                if flag == EXACT:
+                    return table_score
+                if flag == LOWER_BOUND and table_score >= beta:
+                    return table_score
+                if flag == UPPER_BOUND and table_score <= alpha:
+                    return table_score
+
+        best_score = -INFINITY
+        best_move = 0
+        for move in self.pick_moves(table_move, ply):
+            game.make_move(move, validate=False)
+            score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            game.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv[ply] = [move] + self.pv[ply + 1]
+                    if alpha >= beta:
+                        if not move & ((CAPTURE | PROMOTION) << 12):
+                            self.record_cutoff(move, depth, ply)
+                        break
+        if best_score == -INFINITY:
+            return -MATE_SCORE + ply if game.check_if_in_check() else 0
+
+        if best_score >= beta:
+            flag = LOWER_BOUND
+        elif best_score > original_alpha:
+            flag = EXACT
+        else:
+            flag = UPPER_BOUND
+            best_move = 0
+        self.table.store(key, best_move, depth, flag, score_to_table(best_score, ply))
+        return best_score
+
+    def quiescence(self, alpha: int, beta: int, ply: int) -> int:
+        """Search captures only until the position is quiet."""
+        self.pv[ply] = []
+        self.nodes += 1
+        if not self.nodes & (self.CHECK_INTERVAL - 1):
+            self.check_limits()
+
+        stand_pat = self.evaluate()
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        game = self.game
+        # Captures that lose material by SEE are not searched, standing pat
+        # being assumed at least as good
+        captures = [
+            move
+            for move in game.generate_legal_move_codes()
+            if move & (CAPTURE << 12) and game.see(move) >= 0
+        ]
+        for move in self.order_moves(captures, 0):
+            game.make_move(move, validate=False)
+            score = -self.quiescence(-beta, -alpha, ply + 1)
+            game.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+
+def score_to_table(score: int, ply: int) -> int:
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def benchmark(depth: int, backend: str = "list", hash_mb: float = 16) -> None:
+    """Search each standard perft position to depth with a fresh table."""
+    print(f"{'position':<10} {'nodes':>9} {'time (s)':>9} {'nps':>8}  best")
+    total_nodes = 0
+    total_time = 0.0
+    for name, (fen_str, _) in PERFT_POSITIONS.items():
+        game = Game(Fen(fen_str), backend=backend)
+        result = Search(game, hash_mb).search(depth=depth)
+        total_nodes += result.nodes
+        total_time += result.seconds
+        print(
+            f"{name:<10} {result.nodes:>9} {result.seconds:>9.3f} {result.nps:>8}  "
+            f"{result.best_move} {result.score}"
+        )
+    print(
+        f"{'total':<10} {total_nodes:>9} {total_time:>9.3f} "
+        f"{total_nodes / total_time:>8.0f}"
+    )
+
+
+def see_benchmark(backend: str = "list", repeat: int = 1000) -> float:
+    """
+    Time Game.see over every capture in the standard perft positions.
+    Returns:
+        Microseconds per call.
+    """
+    calls = []
+    for fen_str, _ in PERFT_POSITIONS.values():
+        game = Game(Fen(fen_str), backend=backend)
+        calls += [
+            (game, move)
+            for move in game.generate_legal_move_codes()
+            if move & (CAPTURE << 12)
+        ]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for game, move in calls:
+            game.see(move)
+    return (time.perf_counter() - start) / (repeat * len(calls)) * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chess.search",
+        description=(
+            "Count the nodes and time needed to search the standard positions "
+            "to a depth."
+        ),
+    )
+    parser.add_argument("depth", type=int, help="search depth in plies")
+    parser.add_argument("--backend", choices=BACKENDS, default="list")
+    parser.add_argument("--hash", type=float, default=16, help="hash size in MB")
+    parser.add_argument(
+        "--see", action="store_true", help="also time static exchange evaluation"
+    )
+    args = parser.parse_args(argv)
+    benchmark(args.depth, args.backend, args.hash)
+    if args.see:
+        print(f"see {see_benchmark(args.backend):.1f} us/call")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+import argparse
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+from chess.exceptions import SearchTimeout
+from chess.fen import STARTING_FEN_STR, Fen
+from chess.game import BACKENDS, Game
+from chess.perft import PERFT_POSITIONS
+from chess.search import MAX_DEPTH, Search, SearchResult, TranspositionTable
+from chess.tablebase import Tablebases
+from chess.timeman import TimeManager
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Transposition table whose key and data arrays live in a shared memory
+    block, so that several processes can probe and store into the same table.
+
+    Writes are not locked. Each slot's key is stored XORed with its data (see
+    TranspositionTable), so a slot torn by two processes writing at once fails
+    verification and is treated as a miss rather than returning bad data.
+    """
+
+    def __init__(self, size_mb: float = 16, name: Optional[str] = None):
+        """
+        Args:
+            size_mb: The table size in megabytes, which must match the
+                creator's when attaching
+            name: The name of an existing table to attach to. A new block is
+                created when this is None.
+        """
+        self.name = name
+        self.owner = name is None
+        self.shm = None
+        super().__init__(size_mb)
+
+    def clear(self) -> None:
+        nbytes = self.ENTRY_BYTES * self.size
+        if self.shm is None:
+            if self.owner:
+                self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                self.name = self.shm.name
+            else:
+                self.shm = _attach(self.name)
+            self.keys = self.shm.buf[: nbytes // 2].cast("Q")
+            self.data = self.shm.buf[nbytes // 2 : nbytes].cast("Q")
+            if not self.owner:
+                return
+        self.shm.buf[:nbytes] = bytes(nbytes)
+
+    def close(self) -> None:
+        """Detach from the block, freeing it if this process created it."""
+        if self.shm is None:
+            return
+        self.keys.release()
+        self.data.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching always registers the block with the
+        # resource tracker. Helpers share their parent's tracker, where the
+        # block is already registered, so this is harmless.
+        return shared_memory.SharedMemory(name=name)
+
+
+class HelperSearch(Search):
+    """A search that also stops once the main process sets the stop event."""
+
+    def __init__(
+        self,
+        game: Game,
+        table: TranspositionTable,
+        stop_event,
+        tablebases: Optional[Tablebases] = None,
+    ):
+        super().__init__(game, table=table, tablebases=tablebases)
+        self.stop_event = stop_event
+
+    def check_limits(self) -> None:
+        if self.stop_event.is_set():
+            raise SearchTimeout()
+        super().check_limits()
+
+
+def _helper(
+    name: str,
+    size_mb: float,
+    backend: str,
+    tablebase_directory: Optional[str],
+    tasks,
+    done,
+    stop_event,
+    node_counts,
+    index: int,
+) -> None:
+    """
+    Run searches for the main process until it sends None. Each task is the
+    table age, position and depths of one search, and is answered on done
+    with its task number once the search has stopped.
+    """
+    table = SharedTranspositionTable(size_mb, name=name)
+    tablebases = Tablebases(tablebase_directory) if tablebase_directory else None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            number, age, fen_str, moves, depth, start_depth = task
+            # Search.search advances the age, which then matches the main search's
+            table.age = age
+            game = Game(Fen(fen_str), backend=backend)
+            for uci in moves:
+                game.make_move(game.parse_uci(uci))
+            search = HelperSearch(game, table, stop_event, tablebases)
+            try:
+                search.search(depth=depth, start_depth=start_depth)
+            finally:
+                node_counts[index] = search.nodes
+                done.put(number)
+    finally:
+        if tablebases is not None:
+            tablebases.close()
+        table.close()
+
+
+class LazySMP:
+    """
+    Lazy SMP: the main process searches the root as usual while helper
+    processes search the same root, alternately starting one ply deeper, and
+    all of them share one transposition table. The helpers' results reach the
+    main search only through the table. The main process's best move is the
+    one reported.
+
+    The helpers are started once, with the spawn start method, and wait for
+    work between searches. Forking is avoided because searches are usually
+    started from a thread (as the UCI front-end does), and forking a process
+    with several threads is unsafe.
+    """
+
+    # Seconds to wait for a helper to notice the stop event
+    STOP_TIMEOUT = 5
+
+    def __init__(
+        self,
+        threads: int = 1,
+        hash_mb: float = 16,
+        backend: str = "list",
+        tablebases: Optional[Tablebases] = None,
+    ):
+        """
+        Args:
+            threads: Number of processes searching, including this one
+            hash_mb: Size of the shared transposition table
+            backend: The board backend every process searches with
+            tablebases: Endgame tables for the main search. The helpers open
+                the same directory themselves.
+        """
+        self.threads = max(1, threads)
+        self.hash_mb = hash_mb
+        self.backend = backend
+        self.tablebases = tablebases
+        self.table = SharedTranspositionTable(hash_mb)
+        self.main: Optional[Search] = None
+        self.searches = 0
+
+        context = multiprocessing.get_context("spawn")
+        self.stop_event = context.Event()
+        self.node_counts = context.Array("q", self.threads - 1, lock=False)
+        self.done = context.Queue()
+        self.tasks = [context.Queue() for _ in range(self.threads - 1)]
+        self.helpers = [
+            context.Process(
+                target=_helper,
+                args=(
+                    self.table.name,
+                    hash_mb,
+                    backend,
+                    str(tablebases.directory) if tablebases is not None else None,
+                    tasks,
+                    self.done,
+                    self.stop_event,
+                    self.node_counts,
+                    index,
+                ),
+                daemon=True,
+            )
+            for index, tasks in enumerate(self.tasks)
+        ]
+        for helper in self.helpers:
+            helper.start()
+
+    def search(
+        self,
+        fen_str: str = STARTING_FEN_STR,
+        moves: tuple[str, ...] = (),
+        depth: int = MAX_DEPTH,
+        time_limit: Optional[float] = None,
+        nodes: Optional[int] = None,
+        on_iteration: Optional[Callable[[SearchResult], None]] = None,
+        time_manager: Optional[TimeManager] = None,
+    ) -> SearchResult:
+        """
+        Search the position reached by playing the UCI moves from the FEN.
+        Limits apply to the main search, and the helpers stop when it does.
+        Returns:
+            The main search's result, with the helpers' nodes added in.
+        """
+        game = Game(Fen(fen_str), backend=self.backend)
+        for uci in moves:
+            game.make_move(game.parse_uci(uci))
+        self.main = Search(game, table=self.table, tablebases=self.tablebases)
+
+        self.searches += 1
+        self.stop_event.clear()
+        for index, tasks in enumerate(self.tasks):
+            self.node_counts[index] = 0
+            tasks.put(
+                (
+                    self.searches,
+                    self.table.age,
+                    fen_str,
+                    list(moves),
+                    min(depth + 1, MAX_DEPTH),
+                    1 + (index + 1) % 2,
+                )
+            )
+
+        try:
+            result = self.main.search(
+                depth=depth,
+                time_limit=time_limit,
+                nodes=nodes,
+                on_iteration=on_iteration,
+                time_manager=time_manager,
+            )
+        finally:
+            self.stop_event.set()
+            self.wait_for_helpers()
+
+        result.nodes += sum(self.node_counts)
+        result.nps = int(result.nodes / result.seconds) if result.seconds > 0 else 0
+        return result
+
+    def wait_for_helpers(self) -> None:
+        """Wait until every helper has finished the current search."""
+        deadline = time.perf_counter() + self.STOP_TIMEOUT
+        finished = 0
+        while finished < len(self.helpers):
+            try:
+                number = self.done.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                break
+            # Answers left over from a search that timed out are skipped
+            if number == self.searches:
+                finished += 1
+
+    def stop(self) -> None:
+        if self.main is not None:
+            self.main.stop()
+
+    def clear(self) -> None:
+        self.table.clear()
+
+    def close(self) -> None:
+        self.stop_event.set()
+        for tasks in self.tasks:
+            tasks.put(None)
+        for helper in self.helpers:
+            helper.join(self.STOP_TIMEOUT)
+            if helper.is_alive():
+                helper.terminate()
+                helper.join()
+        self.helpers = []
+        self.table.close()
+
+
+def benchmark(
+    fen_strs: list[str],
+    depth: int,
+    thread_counts: list[int],
+    hash_mb: float = 16,
+    backend: str = "list",
+) -> list[tuple[int, float, int]]:
+    """
+    Time how long each thread count takes to finish depth on every position,
+    starting from an empty table each time.
+    Returns:
+        The thread count, total seconds and total nodes of each run.
+    """
+    runs = []
+    for threads in thread_counts:
+        smp = LazySMP(threads, hash_mb, backend)
+        seconds = 0.0
+        nodes = 0
+        try:
+            for fen_str in fen_strs:
+                smp.clear()
+                start = time.perf_counter()
+                result = smp.search(fen_str, depth=depth)
+                seconds += time.perf_counter() - start
+                nodes += result.nodes
+        finally:
+            smp.close()
+        runs.append((threads, seconds, nodes))
+    return runs
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chess.smp",
+        description=(
+            "Search with Lazy SMP, or compare time to depth across thread counts."
+        ),
+    )
+    parser.add_argument("--threads", type=int, default=2, help="number of processes")
+    parser.add_argument("--hash", type=float, default=16, help="hash size in MB")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fen", help="FEN of the position to search")
+    parser.add_argument("--backend", choices=BACKENDS, default="list")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="time the standard perft positions with 1 and --threads processes",
+    )
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        fen_strs = [fen_str for fen_str, _ in PERFT_POSITIONS.values()]
+        runs = benchmark(
+            fen_strs, args.depth, sorted({1, args.threads}), args.hash, args.backend
+        )
+        base = runs[0][1]
+        print(f"{'threads':>7} {'time (s)':>9} {'nodes':>10} {'speedup':>8}")
+        for threads, seconds, nodes in runs:
+            print(f"{threads:>7} {seconds:>9.3f} {nodes:>10} {base / seconds:>8.2f}")
+        return 0
+
+    smp = LazySMP(args.threads, args.hash, args.backend)
+    try:
+        result = smp.search(args.fen or STARTING_FEN_STR, depth=args.depth)
+    finally:
+        smp.close()
+    pv = " ".join(str(move) for move in result.pv)
+    print(
+        f"depth {result.depth} score {result.score} nodes {result.nodes} "
+        f"time {result.seconds:.3f}s pv {pv}"
+    )
+    print(f"bestmove {result.best_move}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
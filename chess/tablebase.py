@@ -0,0 +1,404 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from itertools import product
+from pathlib import Path
+from typing import Optional, Union
+
+from chess.constants import ASSETS
+from chess.fen import Fen
+from chess.game import Game
+from chess.move import CAPTURE, PROMOTION, PROMOTION_KINDS
+
+# Tables are arrays of little-endian 16-bit values, one per position index:
+# 0 is a draw (or an index that is not a legal position), n + 1 means the side
+# to move mates in n plies and -(n + 1) that it is mated in n plies.
+VALUE = struct.Struct("<h")
+SUFFIX = ".tb"
+DEFAULT_DIRECTORY = ASSETS / "tablebases"
+
+# Piece letters from most to least valuable. Material names list the white
+# pieces then the black ones in this order, e.g. "KQK" or "KRKP", with the
+# stronger side as white.
+PIECE_ORDER = "KQRBNP"
+
+# Without pawns every position can be mirrored so the white king is in the
+# a1-d1-d4 triangle; with pawns only the left-right mirror keeps the position
+# the same, so the king is kept on files a-d.
+TRIANGLE = [sq for sq in range(64) if (sq >> 3) <= (sq & 7) <= 3]
+PAWNLESS_KING_SLOTS = {sq: slot for slot, sq in enumerate(TRIANGLE)}
+PAWN_KING_SLOTS = {
+    sq: slot for slot, sq in enumerate(sq for sq in range(64) if sq & 7 <= 3)
+}
+
+EMPTY_FEN = "4k3/8/8/8/8/8/8/4K3 w - - 0 1"
+
+
+def split_material(name: str) -> tuple[str, str]:
+    """Split a material name such as "KRKP" into its white and black pieces."""
+    if not name.startswith("K") or name.count("K") != 2:
+        raise ValueError(f"not a material name: {name}")
+    middle = name.index("K", 1)
+    return name[:middle], name[middle:]
+
+
+def material_name(white: str, black: str) -> tuple[str, bool]:
+    """
+    Args:
+        white: White's piece letters, in any order
+        black: Black's piece letters, in any order
+    Returns:
+        The name of the table holding this material, and whether the colours
+        have to be swapped to look the position up in it.
+    """
+    white = "".join(sorted(white, key=PIECE_ORDER.index))
+    black = "".join(sorted(black, key=PIECE_ORDER.index))
+
+    def strength(side: str) -> tuple[int, list[int]]:
+        return -len(side), [PIECE_ORDER.index(p) for p in side]
+
+    if strength(black) < strength(white):
+        return black + white, True
+    return white + black, False
+
+
+def is_insufficient(name: str) -> bool:
+    """Whether neither side can ever mate, so every position is a draw."""
+    pieces = name.replace("K", "")
+    return not any(p in "QRP" for p in pieces) and len(pieces) <= 1
+
+
+class Table:
+    """The values of one material set, read through a memory map."""
+
+    def __init__(self, name: str, path: Union[str, Path, None] = None):
+        self.name = name
+        self.white, self.black = split_material(name)
+        self.letters = self.white + self.black.lower()
+        self.pawns = "P" in name
+        self.king_slots = PAWN_KING_SLOTS if self.pawns else PAWNLESS_KING_SLOTS
+        self.size = len(self.king_slots) * 64 ** (len(name) - 1) * 2
+        self.path = Path(path) if path is not None else None
+        self.file = None
+        self.map = None
+        if self.path is not None:
+            self.file = open(self.path, "rb")
+            if self.path.stat().st_size != self.size * VALUE.size:
+                self.file.close()
+                raise ValueError(f"{self.path} is not a {name} table")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+            self.map = None
+
+    def index(self, squares: list[int], side: int) -> int:
+        """
+        The position index of the pieces on squares (in the order of the
+        material name, white king first) with side to move.
+        """
+        king = squares[0]
+        flip = 7 if king & 7 > 3 else 0
+        if not self.pawns:
+            flip |= 56 if king >> 3 > 3 else 0
+        squares = [sq ^ flip for sq in squares]
+        if not self.pawns and squares[0] >> 3 > squares[0] & 7:
+            squares = [(sq & 7) << 3 | sq >> 3 for sq in squares]
+        index = self.king_slots[squares[0]]
+        for sq in squares[1:]:
+            index = index * 64 + sq
+        return index * 2 + (side == -1)
+
+    def value(self, index: int) -> int:
+        return VALUE.unpack_from(self.map, index * VALUE.size)[0]
+
+
+class Tablebases:
+    """
+    The tables found in a directory. Each one is memory-mapped on first use,
+    so probing reads only the pages it needs.
+    """
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_DIRECTORY):
+        self.directory = Path(directory)
+        self.tables: dict[str, Optional[Table]] = {}
+        names = [path.stem for path in self.directory.glob("*" + SUFFIX)]
+        self.max_pieces = max((len(name) for name in names), default=0)
+
+    def close(self) -> None:
+        for table in self.tables.values():
+            if table is not None:
+                table.close()
+        self.tables.clear()
+
+    def table(self, name: str) -> Optional[Table]:
+        if name not in self.tables:
+            path = self.directory / (name + SUFFIX)
+            self.tables[name] = Table(name, path) if path.exists() else None
+        return self.tables[name]
+
+    def probe_pieces(self, pieces: list[tuple[str, int]], side: int) -> Optional[int]:
+        """
+        Look up a position given as (piece_str, square) pairs.
+        Returns:
+            The stored value (see VALUE), or None without a table for the
+            material.
+        """
+        white = "".join(p for p, _ in pieces if p.isupper())
+        black = "".join(p.upper() for p, _ in pieces if p.islower())
+        name, flipped = material_name(white, black)
+        if is_insufficient(name):
+            return 0
+        table = self.table(name)
+        if table is None:
+            return None
+        if flipped:
+            pieces = [(p.swapcase(), sq ^ 56) for p, sq in pieces]
+            side = -side
+        squares = []
+        for letter in dict.fromkeys(table.letters):
+            squares += sorted(sq for p, sq in pieces if p == letter)
+        return table.value(table.index(squares, side))
+
+    def probe(self, game: Game) -> Optional[tuple[int, int]]:
+        """
+        Returns:
+            1, 0 or -1 as the side to move wins, draws or loses, with the
+            number of plies to mate (0 for a draw), or None if the position is
+            not covered. Positions with castling rights or an en passant
+            square are never covered. The fifty-move rule is ignored.
+        """
+        if game.castles not in ("", "-") or game.en_passant != (-1, -1):
+            return None
+        board = game.board
+        squares = board.squares_of(1) + board.squares_of(-1)
+        if len(squares) > self.max_pieces:
+            return None
+        pieces = [(board.piece_at(sq).piece_str, sq) for sq in squares]
+        value = self.probe_pieces(pieces, game.current_player)
+        if value is None:
+            return None
+        if value == 0:
+            return 0, 0
+        return (1 if value > 0 else -1), abs(value) - 1
+
+
+def sub_materials(name: str) -> set[str]:
+    """The materials reached from name by one capture or promotion."""
+    white, black = split_material(name)
+    results = set()
+    sides = [white, black]
+    for side in (0, 1):
+        own, other = sides[side], sides[1 - side]
+        for index, letter in enumerate(own):
+            if letter == "K":
+                continue
+            # Captured by the other side
+            remaining = own[:index] + own[index + 1 :]
+            pair = (remaining, other) if side == 0 else (other, remaining)
+            results.add(material_name(*pair)[0])
+            if letter == "P":
+                for promoted in "QRBN":
+                    captures = [i for i, p in enumerate(other) if p != "K"]
+                    for captured in [None] + captures:
+                        changed = own[:index] + promoted + own[index + 1 :]
+                        rest = other
+                        if captured is not None:
+                            rest = other[:captured] + other[captured + 1 :]
+                        pair = (changed, rest) if side == 0 else (rest, changed)
+                        results.add(material_name(*pair)[0])
+    return results
+
+
+def generate(
+    name: str,
+    directory: Union[str, Path] = DEFAULT_DIRECTORY,
+    verbose: bool = False,
+) -> Path:
+    """
+    Build the table for a material set by retrograde analysis, first building
+    any table it needs for positions after a capture or promotion.
+
+    Every legal position is set up once on a Game and its moves are generated
+    with the engine's own move generator, recording which positions lead to
+    which. Mates are then resolved and the results propagated backwards one
+    ply at a time: a position is won as soon as one move reaches a lost
+    position, and lost once every move reaches a won one. Whatever is left
+    unresolved is a draw.
+    Args:
+        name: The material, e.g. "KQK", with the stronger side first
+        directory: Where tables are read from and written to
+        verbose: Print progress
+    Returns:
+        The path of the written table.
+    """
+    white, black = split_material(name)
+    canonical = material_name(white, black)[0]
+    if canonical != name:
+        raise ValueError(f"{name} should be written as {canonical}")
+    if "P" in white and "P" in black:
+        raise ValueError(
+            "tables with pawns on both sides would need en passant in the index"
+        )
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for sub in sorted(sub_materials(name)):
+        if not is_insufficient(sub) and not (directory / (sub + SUFFIX)).exists():
+            generate(sub, directory, verbose)
+
+    start = time.perf_counter()
+    tablebases = Tablebases(directory)
+    table = Table(name)
+    letters = table.letters
+    size = table.size
+    game = Game(Fen(EMPTY_FEN), backend="bitboard")
+    game.castles = "-"
+    board = game.board
+    pieces = [board.piece_key[letter] for letter in letters]
+
+    valid = bytearray(size)
+    remaining = array("h", bytes(2 * size))
+    # Set when some move avoids losing outright
+    no_loss = bytearray(size)
+    # The longest loss forced by moves that leave the table
+    exit_loss = array("h", bytes(2 * size))
+    predecessors: dict[int, list[int]] = {}
+    buckets: dict[int, list[tuple[int, bool]]] = {}
+    resolved = bytearray(size)
+    values = array("h", bytes(2 * size))
+
+    slots = list(table.king_slots)
+    # The kings of EMPTY_FEN
+    occupied = [4, 60]
+    for index, (king, *rest, black_to_move) in enumerate(
+        product(slots, *[range(64)] * (len(letters) - 1), (0, 1))
+    ):
+        squares = [king, *rest]
+        if len(set(squares)) < len(squares) or any(
+            letter in "Pp" and not 8 <= sq < 56 for letter, sq in zip(letters, squares)
+        ):
+            continue
+        for sq in occupied:
+            game.remove_piece(sq)
+        for sq, piece in zip(squares, pieces):
+            game.place_piece(sq, piece)
+        occupied = squares
+        side = -1 if black_to_move else 1
+        if game.check_if_in_check(-side):
+            continue
+        valid[index] = 1
+        game.current_player = side
+        codes = game.generate_legal_move_codes()
+        if not codes:
+            if game.check_if_in_check(side):
+                buckets.setdefault(0, []).append((index, False))
+            else:
+                resolved[index] = 1
+            continue
+
+        for code in codes:
+            from_sq, to_sq, flags = code & 63, code >> 6 & 63, code >> 12
+            mover = squares.index(from_sq)
+            if not flags & (CAPTURE | PROMOTION):
+                child = list(squares)
+                child[mover] = to_sq
+                predecessors.setdefault(table.index(child, -side), []).append(index)
+                remaining[index] += 1
+                continue
+            child_pieces = []
+            for i, sq in enumerate(squares):
+                if sq == to_sq:
+                    continue
+                letter = letters[i]
+                if i == mover:
+                    sq = to_sq
+                    if flags & PROMOTION:
+                        kind = PROMOTION_KINDS[flags & 3]
+                        letter = kind.upper() if side == 1 else kind
+                child_pieces.append((letter, sq))
+            value = tablebases.probe_pieces(child_pieces, -side)
+            if value < 0:
+                buckets.setdefault(-value, []).append((index, True))
+                no_loss[index] = 1
+            elif value == 0:
+                no_loss[index] = 1
+            else:
+                exit_loss[index] = max(exit_loss[index], value)
+        if not remaining[index] and not no_loss[index]:
+            buckets.setdefault(exit_loss[index], []).append((index, False))
+
+    ply = 0
+    while buckets:
+        for index, win in buckets.pop(ply, []):
+            if resolved[index]:
+                continue
+            resolved[index] = 1
+            values[index] = ply + 1 if win else -(ply + 1)
+            for parent in predecessors.get(index, ()):
+                if resolved[parent]:
+                    continue
+                if not win:
+                    buckets.setdefault(ply + 1, []).append((parent, True))
+                    continue
+                remaining[parent] -= 1
+                if not remaining[parent] and not no_loss[parent]:
+                    loss = max(ply + 1, exit_loss[parent])
+                    buckets.setdefault(loss, []).append((parent, False))
+        ply += 1
+
+    if sys.byteorder == "big":
+        values.byteswap()
+    path = directory / (name + SUFFIX)
+    with open(path, "wb") as file:
+        values.tofile(file)
+    tablebases.close()
+    if verbose:
+        wins = sum(1 for value in values if value > 0)
+        print(
+            f"{name}: {sum(valid)} positions, {wins} won for the side to move, "
+            f"longest mate {ply - 1} plies, {time.perf_counter() - start:.1f}s"
+        )
+    return path
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chess.tablebase",
+        description="Generate endgame tables or probe a position.",
+    )
+    parser.add_argument("--dir", default=str(DEFAULT_DIRECTORY), help="table directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("generate", help="build tables, e.g. KQK KRK KPK")
+    build.add_argument("names", nargs="+")
+    probe = commands.add_parser("probe", help="look up a position")
+    probe.add_argument("fen", help="FEN of the position")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        for name in args.names:
+            generate(name, args.dir, verbose=True)
+        return 0
+
+    tablebases = Tablebases(args.dir)
+    result = tablebases.probe(Game(Fen(args.fen)))
+    tablebases.close()
+    if result is None:
+        print("not in the tablebases")
+        return 1
+    wdl, plies = result
+    outcomes = {
+        1: f"win, mate in {plies} plies",
+        0: "draw",
+        -1: f"loss, mated in {plies} plies",
+    }
+    print(outcomes[wdl])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+import time
+from typing import Optional
+
+# Milliseconds kept back on every move for engine/GUI communication
+MOVE_OVERHEAD = 30
+# Assumed moves left in the game when the clock does not say
+DEFAULT_MOVES_TO_GO = 30
+MIN_MOVES_TO_GO = 12
+# The hard limit is this many times the soft budget, and never more than
+# MAX_USAGE of the time left on the clock
+HARD_FACTOR = 4
+MAX_USAGE = 0.4
+# The soft budget is stretched by INSTABILITY_BONUS for every recent change of
+# best move, up to MAX_STRETCH times
+INSTABILITY_BONUS = 0.5
+MAX_STRETCH = 2.5
+# A new iteration costs a few times the last one, so none is started once this
+# fraction of the soft budget is gone
+NEXT_ITERATION_SHARE = 0.6
+
+
+def moves_to_go_estimate(fullmove_number: int) -> int:
+    """Guess the moves left in a game from how far it has got."""
+    return max(MIN_MOVES_TO_GO, DEFAULT_MOVES_TO_GO + 10 - fullmove_number // 2)
+
+
+class TimeManager:
+    """
+    Turns a clock into deadlines for one search.
+
+    The soft budget is what a move should normally take: the search checks it
+    between iterations, and it grows while the best move keeps changing. The
+    hard deadline is checked inside the search every few hundred nodes and
+    ends it outright, so the clock cannot be blown by a slow iteration.
+    """
+
+    def __init__(
+        self,
+        time_left: int,
+        increment: int = 0,
+        moves_to_go: Optional[int] = None,
+        fullmove_number: int = 1,
+        move_overhead: int = MOVE_OVERHEAD,
+    ):
+        """
+        Args:
+            time_left: Milliseconds on the clock of the side to move
+            increment: Milliseconds added per move
+            moves_to_go: Moves until the next time control, if there is one
+            fullmove_number: Used to estimate moves left without moves_to_go
+            move_overhead: Milliseconds kept back for communication lag
+        """
+        available = max(time_left - move_overhead, 1)
+        moves = moves_to_go or moves_to_go_estimate(fullmove_number)
+        # On the last move before a time control most of the clock can go
+        soft = available / moves + increment * 3 / 4
+        hard = min(soft * HARD_FACTOR, available * (0.9 if moves == 1 else MAX_USAGE))
+        self.soft_limit = min(soft, hard) / 1000
+        self.hard_limit = max(hard, 1) / 1000
+        self.start_time = time.perf_counter()
+        self.best_move = None
+        self.instability = 0.0
+
+    def start(self) -> None:
+        self.start_time = time.perf_counter()
+
+    @property
+    def hard_deadline(self) -> float:
+        return self.start_time + self.hard_limit
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def update(self, best_move) -> None:
+        """Record the best move of a finished iteration."""
+        self.instability *= 0.5
+        if self.best_move is not None and best_move != self.best_move:
+            self.instability += 1
+        self.best_move = best_move
+
+    def soft_limit_now(self) -> float:
+        stretch = min(1 + INSTABILITY_BONUS * self.instability, MAX_STRETCH)
+        return min(self.soft_limit * stretch, self.hard_limit)
+
+    def should_stop(self) -> bool:
+        """Whether to stop rather than start another iteration."""
+        return self.elapsed() >= self.soft_limit_now() * NEXT_ITERATION_SHARE
@@ -0,0 +1,30 @@
+"""
+Opt-in diagnostics for the board and move making.
+
+Hot paths guard their log calls with ``if tracing.enabled:`` so that, while
+tracing is off, no message is formatted and nothing is written. Turn tracing
+on with enable() or by setting the CHESS_TRACE environment variable; messages
+go to the "chess" logger at DEBUG level.
+"""
+import logging
+import os
+
+logger = logging.getLogger("chess")
+
+enabled = False
+
+
+def enable(on: bool = True) -> None:
+    global enabled
+    enabled = on
+    if not on:
+        return
+    if logger.getEffectiveLevel() > logging.DEBUG:
+        logger.setLevel(logging.DEBUG)
+    # Without any configured handler, debug records would be dropped
+    if not logger.hasHandlers():
+        logger.addHandler(logging.StreamHandler())
+
+
+if os.environ.get("CHESS_TRACE"):
+    enable()
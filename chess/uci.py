@@ -0,0 +1,425 @@
+import sys
+import threading
+from typing import Callable, Optional, TextIO
+
+from chess.book import OpeningBook
+from chess.exceptions import FENError
+from chess.fen import STARTING_FEN_STR, Fen
+from chess.game import Game
+from chess.move import code_to_uci
+from chess.search import (
+    MATE_SCORE,
+    MATE_THRESHOLD,
+    MAX_DEPTH,
+    Search,
+    SearchResult,
+    TranspositionTable,
+)
+from chess.smp import LazySMP
+from chess.tablebase import Tablebases
+from chess.timeman import MOVE_OVERHEAD, TimeManager
+
+ENGINE_NAME = "Chesson"
+ENGINE_AUTHOR = "John Higgins"
+
+DEFAULT_HASH_MB = 16
+MAX_HASH_MB = 4096
+MAX_THREADS = 64
+
+# Integer arguments of the go command
+GO_PARAMETERS = {
+    "depth",
+    "nodes",
+    "movetime",
+    "wtime",
+    "btime",
+    "winc",
+    "binc",
+    "movestogo",
+    "mate",
+}
+# The go arguments that end a search on their own
+BOUNDING_PARAMETERS = {"depth", "nodes", "movetime", "wtime", "btime", "mate"}
+# Depth searched when a go limit cannot be read and no other limit ends the
+# search, so the GUI gets a bestmove and later commands are not blocked
+FALLBACK_DEPTH = 1
+
+
+def format_score(score: int) -> str:
+    if score >= MATE_THRESHOLD:
+        return f"mate {(MATE_SCORE - score + 1) // 2}"
+    if score <= -MATE_THRESHOLD:
+        return f"mate {-((MATE_SCORE + score + 1) // 2)}"
+    return f"cp {score}"
+
+
+class UCIEngine:
+    """
+    Universal Chess Interface front-end.
+
+    Commands are read on the calling thread and each ``go`` runs its search on
+    a worker thread, so ``stop``, ``ponderhit`` and ``isready`` are answered
+    while a search is in progress.
+    """
+
+    def __init__(self, output: Optional[Callable[[str], None]] = None):
+        self.output = output or self.print
+        self.output_lock = threading.Lock()
+        self.hash_mb = DEFAULT_HASH_MB
+        self.threads = 1
+        self.move_overhead = MOVE_OVERHEAD
+        self.own_book = False
+        self.book: Optional[OpeningBook] = None
+        self.tablebases: Optional[Tablebases] = None
+        self.table = TranspositionTable(self.hash_mb)
+        self.smp: Optional[LazySMP] = None
+        self.fen_str = STARTING_FEN_STR
+        self.moves: list[str] = []
+        self.game = Game(Fen(STARTING_FEN_STR))
+        self.search: Optional[Search] = None
+        self.worker: Optional[threading.Thread] = None
+        # Set once the GUI allows a bestmove to be sent for an infinite or
+        # ponder search, which may otherwise finish before it is asked to stop
+        self.release = threading.Event()
+        # The clock for a ponder search, applied once the opponent plays
+        self.ponder_clock: Optional[TimeManager] = None
+
+    @staticmethod
+    def print(line: str) -> None:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    def send(self, line: str) -> None:
+        with self.output_lock:
+            self.output(line)
+
+    def handle(self, line: str) -> bool:
+        """
+        Process one line of input.
+        Returns:
+            False once the engine has been told to quit.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        match command:
+            case "uci":
+                self.send(f"id name {ENGINE_NAME}")
+                self.send(f"id author {ENGINE_AUTHOR}")
+                self.send(
+                    f"option name Hash type spin default {DEFAULT_HASH_MB} "
+                    f"min 1 max {MAX_HASH_MB}"
+                )
+                self.send(
+                    f"option name Threads type spin default 1 min 1 max {MAX_THREADS}"
+                )
+                self.send("option name Ponder type check default false")
+                self.send(
+                    f"option name Move Overhead type spin default {MOVE_OVERHEAD} "
+                    "min 0 max 5000"
+                )
+                self.send("option name OwnBook type check default false")
+                self.send("option name Book File type string default <empty>")
+                self.send("option name Tablebase Path type string default <empty>")
+                self.send("uciok")
+            case "isready":
+                self.send("readyok")
+            case "setoption":
+                self.wait()
+                try:
+                    self.set_option(args)
+                except ValueError:
+                    self.send(f"info string invalid option {' '.join(args)}")
+            case "ucinewgame":
+                self.wait()
+                self.table.clear()
+                if self.smp is not None:
+                    self.smp.clear()
+                self.set_position(STARTING_FEN_STR, [])
+            case "position":
+                self.wait()
+                self.position(args)
+            case "go":
+                self.wait()
+                self.go(args)
+            case "stop":
+                self.stop()
+            case "ponderhit":
+                self.ponderhit()
+            case "quit":
+                self.stop()
+                if self.smp is not None:
+                    self.smp.close()
+                if self.book is not None:
+                    self.book.close()
+                if self.tablebases is not None:
+                    self.tablebases.close()
+                return False
+        return True
+
+    def set_option(self, args: list[str]) -> None:
+        if "name" not in args or "value" not in args:
+            return
+        name = " ".join(args[args.index("name") + 1 : args.index("value")]).lower()
+        value = " ".join(args[args.index("value") + 1 :])
+        if name == "hash":
+            self.hash_mb = min(max(int(value), 1), MAX_HASH_MB)
+            self.table = TranspositionTable(self.hash_mb)
+            if self.smp is not None:
+                self.smp.close()
+                self.smp = None
+        elif name == "threads":
+            self.threads = min(max(int(value), 1), MAX_THREADS)
+            if self.smp is not None:
+                self.smp.close()
+                self.smp = None
+        elif name == "move overhead":
+            self.move_overhead = max(int(value), 0)
+        elif name == "ownbook":
+            self.own_book = value.lower() == "true"
+        elif name == "book file":
+            self.set_book(value)
+        elif name == "tablebase path":
+            if self.tablebases is not None:
+                self.tablebases.close()
+            empty = not value or value == "<empty>"
+            self.tablebases = None if empty else Tablebases(value)
+            # The helpers opened the old directory
+            if self.smp is not None:
+                self.smp.close()
+                self.smp = None
+
+    def set_book(self, path: str) -> None:
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+        if not path or path == "<empty>":
+            return
+        try:
+            self.book = OpeningBook(path)
+        except OSError as error:
+            self.send(f"info string cannot open book {path}: {error.strerror}")
+
+    def position(self, args: list[str]) -> None:
+        if not args:
+            return
+        if args[0] == "startpos":
+            fen_str = STARTING_FEN_STR
+            rest = args[1:]
+        elif args[0] == "fen":
+            end = args.index("moves") if "moves" in args else len(args)
+            fen_str = " ".join(args[1:end])
+            rest = args[end:]
+        else:
+            return
+        moves = rest[1:] if rest and rest[0] == "moves" else []
+        self.set_position(fen_str, moves)
+
+    def set_position(self, fen_str: str, moves: list[str]) -> None:
+        """
+        Move the game to the position after the moves. When the new position
+        shares its start and a prefix of moves with the current one (as it
+        does in a game, where each command adds a move or two), only the
+        moves that differ are taken back and played. An invalid FEN is
+        reported and leaves the current position in place.
+        """
+        if fen_str != self.fen_str:
+            try:
+                fen = Fen(fen_str)
+            except FENError as error:
+                self.send(f"info string invalid fen {fen_str}: {error}")
+                return
+            self.game = Game(fen)
+            self.fen_str = fen_str
+            self.moves = []
+
+        common = 0
+        while (
+            common < len(self.moves)
+            and common < len(moves)
+            and self.moves[common] == moves[common]
+        ):
+            common += 1
+        for _ in range(len(self.moves) - common):
+            self.game.unmake_move()
+        del self.moves[common:]
+
+        for uci in moves[common:]:
+            try:
+                code = self.game.parse_uci(uci)
+            except ValueError:
+                code = None
+            if code not in self.game.generate_legal_move_codes():
+                self.send(f"info string illegal move {uci}")
+                break
+            self.game.make_move(code, validate=False)
+            self.moves.append(uci)
+
+    def go(self, args: list[str]) -> None:
+        limits = {}
+        infinite = "infinite" in args
+        ponder = "ponder" in args
+        invalid = False
+        for index, token in enumerate(args[:-1]):
+            if token in GO_PARAMETERS:
+                try:
+                    limits[token] = int(args[index + 1])
+                except ValueError:
+                    self.send(f"info string invalid {token} {args[index + 1]}")
+                    invalid = True
+        if invalid and not BOUNDING_PARAMETERS & limits.keys():
+            limits["depth"] = FALLBACK_DEPTH
+
+        depth = limits.get("depth", MAX_DEPTH)
+        if "mate" in limits:
+            depth = min(depth, 2 * limits["mate"])
+        time_limit = None
+        clock = None
+        if "movetime" in limits:
+            time_limit = limits["movetime"] / 1000
+        else:
+            white = self.game.current_player == 1
+            time_left = limits.get("wtime" if white else "btime")
+            if time_left is not None:
+                clock = TimeManager(
+                    time_left,
+                    limits.get("winc" if white else "binc", 0),
+                    limits.get("movestogo"),
+                    self.game.fullmove_number,
+                    self.move_overhead,
+                )
+
+        # A book move is played at once, except when the GUI expects a
+        # search it can stop
+        if self.own_book and self.book is not None and not (infinite or ponder):
+            code = self.book.choose(self.game)
+            if code is not None:
+                self.send(f"bestmove {code_to_uci(code)}")
+                return
+
+        self.release.clear()
+        self.ponder_clock = None
+        if infinite or ponder:
+            if ponder:
+                self.ponder_clock = clock
+            time_limit = None
+            clock = None
+        else:
+            self.release.set()
+
+        if self.threads > 1:
+            if self.smp is None:
+                self.smp = LazySMP(
+                    self.threads, self.hash_mb, tablebases=self.tablebases
+                )
+            self.search = self.smp
+        else:
+            self.search = Search(
+                self.game, table=self.table, tablebases=self.tablebases
+            )
+        self.worker = threading.Thread(
+            target=self.run_search,
+            args=(depth, time_limit, limits.get("nodes"), clock),
+            daemon=True,
+        )
+        self.worker.start()
+
+    def run_search(
+        self,
+        depth: int,
+        time_limit: Optional[float],
+        nodes: Optional[int],
+        clock: Optional[TimeManager],
+    ) -> None:
+        if isinstance(self.search, LazySMP):
+            result = self.search.search(
+                self.fen_str,
+                tuple(self.moves),
+                depth=depth,
+                time_limit=time_limit,
+                nodes=nodes,
+                on_iteration=self.info,
+                time_manager=clock,
+            )
+        else:
+            result = self.search.search(
+                depth=depth,
+                time_limit=time_limit,
+                nodes=nodes,
+                on_iteration=self.info,
+                time_manager=clock,
+            )
+
+        # Infinite and ponder searches report only once released
+        self.release.wait()
+        if result.best_move is None:
+            self.send("bestmove 0000")
+        elif len(result.pv) > 1:
+            self.send(f"bestmove {result.best_move} ponder {result.pv[1]}")
+        else:
+            self.send(f"bestmove {result.best_move}")
+
+    def info(self, result: SearchResult) -> None:
+        pv = " ".join(str(move) for move in result.pv)
+        search = self.search
+        hashfull = f"hashfull {search.table.hashfull()} " if search is not None else ""
+        self.send(
+            f"info depth {result.depth} score {format_score(result.score)} "
+            f"nodes {result.nodes} nps {result.nps} {hashfull}"
+            f"time {int(result.seconds * 1000)} pv {pv}"
+        )
+
+    def ponderhit(self) -> None:
+        """The expected move was played: carry on as a normal timed search."""
+        search = self.search
+        clock = self.ponder_clock
+        if search is not None and clock is not None:
+            main = search.main if isinstance(search, LazySMP) else search
+            if main is not None:
+                clock.start()
+                main.time_manager = clock
+                main.deadline = clock.hard_deadline
+        self.ponder_clock = None
+        self.release.set()
+
+    def wait(self) -> None:
+        """
+        Let a running search finish before the position or settings change.
+        Infinite and ponder searches would never finish, so they are stopped.
+        """
+        if self.worker is None:
+            return
+        if not self.release.is_set():
+            self.stop()
+            return
+        self.worker.join()
+        self.worker = None
+        self.search = None
+
+    def stop(self) -> None:
+        """Stop any running search and wait for its bestmove to be sent."""
+        worker = self.worker
+        if worker is None:
+            return
+        self.release.set()
+        # Repeated in case the worker had not yet started searching
+        while worker.is_alive():
+            self.search.stop()
+            worker.join(0.005)
+        self.worker = None
+        self.search = None
+
+
+def main(stdin: TextIO = sys.stdin) -> int:
+    engine = UCIEngine()
+    for line in stdin:
+        if not engine.handle(line):
+            break
+    else:
+        engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
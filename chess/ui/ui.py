@@ -1,6 +1,5 @@
 # ======= IMPORTS =======
 import logging
-import logging
 from typing import Optional
 import pygame
 
@@ -21,11 +20,11 @@ class UI:
     font: pygame.font.Font
     game: Game
     legal_moves: list[Move]
+    outcome: Optional[str]
     piece_images: dict[str, pygame.Surface]
     running: bool
     screen: pygame.Surface
     selected_square: Optional[POSITION]
-    selected_square: Optional[POSITION]
 
     def __init__(self) -> None:
         # ======= VARIABLES SETUP =======
@@ -43,6 +42,7 @@ class UI:
         # Game State
         self.selected_square = None
         self.legal_moves = []
+        self.outcome = None
 
         # Load piece images
         self.piece_images = {}
@@ -70,7 +70,6 @@ class UI:
             )
 
     # ======= SUPPORTING FUNCTIONS =======
-    def get_square_from_mouse(self, pos: tuple[int, int]) -> Optional[POSITION]:
     def get_square_from_mouse(self, pos: tuple[int, int]) -> Optional[POSITION]:
         """
         Get the square from the mouse position.
@@ -91,6 +90,9 @@ class UI:
         return (row, col)
 
     def handle_mouse_click(self, event: pygame.event.Event) -> None:
+        # No more moves once the game is over
+        if self.outcome is not None:
+            return
         if event.button == 1:
             clicked_square = self.get_square_from_mouse(event.pos)
             if clicked_square:
@@ -111,6 +113,7 @@ class UI:
                     print(f"Selected legal move, piece is {clicked_piece}")
                     self.game.make_move(move)
                     self.selected_square = None
+                    self.outcome = self.game.outcome()
 
                 # If selecting a piece, select it and update the legal moves
                 elif not isinstance(self.game.board.get_piece(*clicked_square), Empty):
@@ -120,9 +123,11 @@ class UI:
                     )
                     if self.game.piece_matches_player(clicked_piece):
                         self.selected_square = clicked_square
-                        self.legal_moves = self.game.get_legal_moves(
-                            *self.selected_square
-                        )
+                        self.legal_moves = [
+                            legal_move
+                            for legal_move in self.game.generate_legal_moves()
+                            if legal_move.start_pos == self.selected_square
+                        ]
 
     # ======= MAIN GAME LOOP =======
     def run(self) -> None:
@@ -195,6 +200,11 @@ class UI:
                 text = self.font.render(chr(96 + col), True, "black")
                 self.screen.blit(text, (x, 451))
 
+            # Result
+            if self.outcome is not None:
+                text = self.font.render(f"Game over: {self.outcome}", True, "black")
+                self.screen.blit(text, (50, 20))
+
             # flip() the display to show rendered work
             pygame.display.flip()
 
@@ -0,0 +1,50 @@
+import random
+
+from chess.constants import POSITION
+
+# Fixed seed so keys are identical in every process, unlike hash()
+ZOBRIST_SEED = 0x5EED_C4E5
+
+_random = random.Random(ZOBRIST_SEED)
+
+# One key per piece per square, squares numbered 0-63 from a1
+PIECE_KEYS = {
+    piece_str: [_random.getrandbits(64) for _ in range(64)]
+    for piece_str in "PNBRQKpnbrqk"
+}
+CASTLING_KEYS = {right: _random.getrandbits(64) for right in "KQkq"}
+# Indexed by the en passant column, 1-8
+EN_PASSANT_KEYS = [0] + [_random.getrandbits(64) for _ in range(8)]
+# XORed in when black is to move
+SIDE_KEY = _random.getrandbits(64)
+
+
+def castling_key(castles: str) -> int:
+    key = 0
+    for right in castles:
+        key ^= CASTLING_KEYS.get(right, 0)
+    return key
+
+
+def en_passant_key(en_passant: POSITION) -> int:
+    if en_passant == (-1, -1):
+        return 0
+    return EN_PASSANT_KEYS[en_passant[1]]
+
+
+def compute_key(board, current_player: int, castles: str, en_passant: POSITION) -> int:
+    """
+    Compute a position's Zobrist key from scratch. Game keeps its key up to
+    date incrementally, so this is only needed when a position is loaded.
+    """
+    key = 0
+    for row in range(1, 9):
+        for col in range(1, 9):
+            piece = board.get_piece(row, col)
+            if piece.colour:
+                key ^= PIECE_KEYS[piece.piece_str][(row - 1) * 8 + (col - 1)]
+    key ^= castling_key(castles)
+    key ^= en_passant_key(en_passant)
+    if current_player == -1:
+        key ^= SIDE_KEY
+    return key
@@ -0,0 +1,146 @@
+import random
+
+import pytest
+
+from chess.bitboard import (
+    BISHOP_DIRECTIONS,
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    PAWN_ATTACKS,
+    ROOK_DIRECTIONS,
+    BitBoard,
+    bishop_attacks,
+    iter_squares,
+    queen_attacks,
+    ray_attacks,
+    rook_attacks,
+    square_index,
+)
+from chess.board import Board
+from chess.fen import Fen
+from chess.game import Game
+
+POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "rnbqkb1r/pp1p1ppp/5n2/2pPp3/8/8/PPP1PPPP/RNBQKBNR w KQkq e6 0 1",
+]
+
+
+def squares(*names: str) -> set[int]:
+    return {square_index(int(name[1]), ord(name[0]) - 96) for name in names}
+
+
+def test_leaper_attack_tables():
+    assert set(iter_squares(KNIGHT_ATTACKS[square_index(1, 1)])) == squares("b3", "c2")
+    assert set(iter_squares(KING_ATTACKS[square_index(1, 8)])) == squares(
+        "g1", "g2", "h2"
+    )
+    assert set(iter_squares(PAWN_ATTACKS[1][square_index(2, 1)])) == squares("b3")
+    assert set(iter_squares(PAWN_ATTACKS[-1][square_index(7, 5)])) == squares(
+        "d6", "f6"
+    )
+
+
+def test_slider_tables_match_ray_walk():
+    rng = random.Random(0)
+    for _ in range(2000):
+        sq = rng.randrange(64)
+        occupied = rng.getrandbits(64) & rng.getrandbits(64)
+        assert rook_attacks(sq, occupied) == ray_attacks(sq, occupied, ROOK_DIRECTIONS)
+        assert bishop_attacks(sq, occupied) == ray_attacks(
+            sq, occupied, BISHOP_DIRECTIONS
+        )
+        assert queen_attacks(sq, occupied) == ray_attacks(
+            sq, occupied, ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+        )
+
+
+def test_slider_attacks_stop_at_blockers():
+    occupied = 1 << square_index(1, 4) | 1 << square_index(4, 1)
+    assert set(iter_squares(rook_attacks(square_index(1, 1), occupied))) == squares(
+        "b1", "c1", "d1", "a2", "a3", "a4"
+    )
+
+
+@pytest.mark.parametrize("fen_str", POSITIONS)
+def test_bitboard_matches_list_board(fen_str: str):
+    board = Board(Fen(fen_str))
+    bitboard = BitBoard(Fen(fen_str))
+    assert str(board) == str(bitboard)
+    for row in range(1, 9):
+        for col in range(1, 9):
+            assert (
+                board.get_piece(row, col).piece_str
+                == bitboard.get_piece(row, col).piece_str
+            )
+
+
+def test_bitboard_change_piece_updates_occupancy():
+    bitboard = BitBoard()
+    knight = bitboard.get_piece(1, 2)
+    bitboard.change_piece_in_location(1, 2, bitboard.piece_key["."])
+    bitboard.change_piece_in_location(3, 3, knight)
+    assert bitboard.bitboards["N"] == (1 << square_index(1, 7)) | (
+        1 << square_index(3, 3)
+    )
+    assert not bitboard.occupied & (1 << square_index(1, 2))
+    assert bitboard.occupancy[1] & (1 << square_index(3, 3))
+
+
+@pytest.mark.parametrize("fen_str", POSITIONS)
+def test_legal_moves_match_between_backends(fen_str: str):
+    list_game = Game(Fen(fen_str))
+    bitboard_game = Game(Fen(fen_str), backend="bitboard")
+    for row, col in list_game.get_piece_locations(list_game.current_player):
+        list_moves = {
+            (move.start_pos, move.end_pos)
+            for move in list_game.get_legal_moves(row, col)
+        }
+        bitboard_moves = {
+            (move.start_pos, move.end_pos)
+            for move in bitboard_game.get_legal_moves(row, col)
+        }
+        assert list_moves == bitboard_moves
+
+
+ATTACK_FEN = "3r2k1/8/3p4/8/8/2N5/8/4K3 w - - 0 1"
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+@pytest.mark.parametrize(
+    "attacked, by_colour, expected",
+    [
+        ((5, 5), -1, True),  # pawn
+        ((5, 4), 1, True),  # knight
+        ((2, 6), 1, True),  # king
+        ((7, 4), -1, True),  # rook
+        ((1, 4), -1, False),  # rook blocked by its own pawn
+        ((8, 8), 1, False),
+        ((1, 1), -1, False),
+    ],
+)
+def test_is_square_attacked(backend, attacked, by_colour, expected):
+    game = Game(Fen(ATTACK_FEN), backend=backend)
+    assert game.is_square_attacked(attacked, by_colour) == expected
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+def test_check_detection(backend):
+    game = Game(Fen("4k3/8/8/8/1b6/8/8/4K3 w - - 0 1"), backend=backend)
+    assert game.check_if_in_check(1)
+    assert not game.check_if_in_check(-1)
+
+
+def test_incremental_attack_maps_match_recompute():
+    game = Game(Fen(POSITIONS[1]), backend="bitboard")
+    game.board.track_attacks()
+    for move in game.get_legal_moves(5, 5) + game.get_legal_moves(3, 6):
+        game.make_move(move)
+        for colour in (1, -1):
+            expected = 0
+            for sq in iter_squares(game.board.occupancy[colour]):
+                expected |= game.board.piece_attacks(sq)
+            assert game.board.attack_map(colour) == expected
+        game.unmake_move()
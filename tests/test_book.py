@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from chess.book import (
+    RANDOM64,
+    OpeningBook,
+    decode_move,
+    encode_move,
+    load_random64,
+    polyglot_key,
+    seeded_random64,
+    write_book,
+)
+from chess.fen import STARTING_FEN_STR, Fen
+from chess.game import Game
+from chess.move import code_to_uci
+from chess.uci import UCIEngine
+
+CASTLING_FEN = "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"
+
+
+@pytest.fixture
+def random64():
+    return RANDOM64
+
+
+@pytest.fixture
+def book_path(tmp_path, random64):
+    start = polyglot_key(Game(Fen(STARTING_FEN_STR)), random64)
+    castling = polyglot_key(Game(Fen(CASTLING_FEN)), random64)
+    path = tmp_path / "book.bin"
+    write_book(
+        path,
+        [
+            (start, "e2e4", 30),
+            (start, "d2d4", 10),
+            (start, "a2a5", 50),  # illegal, so never chosen
+            (castling, "e1g1", 1),
+            (castling + 1, "a1a2", 1),
+        ],
+    )
+    return path
+
+
+def test_move_encoding_round_trips():
+    for uci in ("e2e4", "g7g8q", "a2a1n"):
+        assert decode_move(encode_move(uci)) == uci
+    assert decode_move(encode_move("e1g1")) == "e1h1"
+
+
+def test_keys_match_published_polyglot_keys():
+    game = Game(Fen(STARTING_FEN_STR))
+    assert polyglot_key(game) == 0x463B96181691FC9C
+    game.make_move(game.parse_uci("e2e4"))
+    assert polyglot_key(game) == 0x823C9B50FD114196
+    game.make_move(game.parse_uci("d7d5"))
+    assert polyglot_key(game) == 0x0756B94461C50FB0
+
+
+def test_other_tables_are_opt_in(tmp_path):
+    seeded = seeded_random64()
+    assert len(seeded) == 781 and list(seeded) != list(RANDOM64)
+    path = tmp_path / "random64.txt"
+    path.write_text(", ".join(f"0x{value:016X}" for value in seeded))
+    assert load_random64(path) == seeded
+    path.write_text("0x1 0x2")
+    with pytest.raises(ValueError):
+        load_random64(path)
+
+
+def test_key_ignores_en_passant_without_a_capturing_pawn(random64):
+    game = Game(Fen(STARTING_FEN_STR))
+    game.make_move(game.parse_uci("e2e4"))
+    without = Game(Fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"))
+    assert polyglot_key(game, random64) == polyglot_key(without, random64)
+
+
+def test_lookup_returns_legal_moves_by_weight(book_path):
+    with OpeningBook(book_path) as book:
+        assert len(book) == 5
+        moves = book.moves(Game(Fen(STARTING_FEN_STR)))
+    assert [(code_to_uci(code), weight) for code, weight in moves] == [
+        ("e2e4", 30),
+        ("d2d4", 10),
+    ]
+
+
+def test_choose_best_and_weighted(book_path):
+    game = Game(Fen(STARTING_FEN_STR))
+    with OpeningBook(book_path) as book:
+        assert code_to_uci(book.choose(game, weighted=False)) == "e2e4"
+        rng = random.Random(1)
+        picks = {code_to_uci(book.choose(game, rng=rng)) for _ in range(50)}
+    assert picks == {"e2e4", "d2d4"}
+
+
+def test_castling_is_converted_to_the_king_move(book_path):
+    with OpeningBook(book_path) as book:
+        code = book.choose(Game(Fen(CASTLING_FEN)), weighted=False)
+    assert code_to_uci(code) == "e1g1"
+
+
+def test_position_not_in_book(book_path):
+    game = Game(Fen(STARTING_FEN_STR))
+    game.make_move(game.parse_uci("g1f3"))
+    with OpeningBook(book_path) as book:
+        assert book.choose(game) is None
+
+
+def test_empty_book(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    with OpeningBook(path) as book:
+        assert len(book) == 0
+        assert book.choose(Game(Fen(STARTING_FEN_STR))) is None
+
+
+def test_uci_plays_book_moves(book_path):
+    output = []
+    engine = UCIEngine(output=output.append)
+    for line in (
+        f"setoption name Book File value {book_path}",
+        "setoption name OwnBook value true",
+        "position startpos",
+        "go wtime 1000 btime 1000",
+    ):
+        engine.handle(line)
+    engine.wait()
+    assert output[-1] in ("bestmove e2e4", "bestmove d2d4")
+    assert not any(line.startswith("info depth") for line in output)
@@ -0,0 +1,69 @@
+import json
+
+from chess.epd import main, run_position, run_suite
+
+MATE = '6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - bm Rd8#; id "back rank";'
+WIN_QUEEN = '4k3/8/8/3q4/8/8/3R4/4K3 w - - bm Rxd5; am Kd1; id "queen";'
+AVOID = '4k3/8/8/3q4/8/8/3R4/4K3 w - - am Rxd5; id "avoid";'
+
+
+def test_run_position_solves_mate():
+    record = run_position(MATE, depth=3)
+    assert record["id"] == "back rank"
+    assert record["bm"] == ["Rd8#"]
+    assert (record["move"], record["uci"]) == ("Rd8#", "d1d8")
+    assert record["solved"]
+    assert record["solved_depth"] <= record["depth"]
+    assert record["solved_nodes"] <= record["nodes"]
+    assert record["nodes"] > 0
+
+
+def test_avoid_move_fails_the_position():
+    record = run_position(AVOID, depth=2)
+    assert record["am"] == ["Rxd5"]
+    assert record["move"] == "Rxd5"
+    assert not record["solved"]
+    assert "solved_depth" not in record
+
+
+def test_unreadable_positions_are_reported():
+    record = run_position("4k3/8/8/8/8/8/8/4K3 w - - bm Qh5;")
+    assert "illegal move Qh5" in record["error"]
+    assert "error" in run_position("not a position")
+    assert run_position('4k3/8/8/8/8/8/8/4K3 w - - id "no solution";')["error"] == (
+        "no bm/am operation"
+    )
+
+
+def test_run_suite_summary():
+    lines = [
+        "# suite",
+        MATE,
+        "",
+        WIN_QUEEN,
+        "4k3/8/8/8/8/8/8/4K3 w - - bm Qh5;",
+        "4k3/8/8/8/8/8/8/4K3 w - -",
+    ]
+    report = run_suite(lines, nodes=5000, workers=2)
+    assert [position.get("id") for position in report["positions"]] == [
+        "back rank",
+        "queen",
+        None,
+        None,
+    ]
+    summary = report["summary"]
+    assert (summary["positions"], summary["solved"], summary["errors"]) == (4, 2, 2)
+    assert summary["solve_rate"] == 1.0
+    assert report["settings"]["nodes"] == 5000
+    assert report["settings"]["depth"] is None
+
+
+def test_main_writes_json(tmp_path, capsys):
+    suite = tmp_path / "suite.epd"
+    suite.write_text(f"{MATE}\n{AVOID}\n")
+    output = tmp_path / "run.json"
+    assert main([str(suite), "--depth", "2", "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["files"] == [str(suite)]
+    assert report["summary"]["solved"] == 1
+    assert "solved 1/2" in capsys.readouterr().err
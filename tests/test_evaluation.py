@@ -0,0 +1,58 @@
+import pytest
+
+from chess.evaluation import TOTAL_PHASE, compute_scores, evaluate
+from chess.fen import Fen
+from chess.game import Game
+from chess.perft import PERFT_POSITIONS
+
+
+def check_scores(game: Game, depth: int) -> None:
+    """Walk the move tree checking the incremental scores against a rebuild."""
+    assert (game.mg_score, game.eg_score, game.phase) == compute_scores(game.board)
+    if depth == 0:
+        return
+    for move in game.generate_legal_moves():
+        game.make_move(move, validate=False)
+        check_scores(game, depth - 1)
+        game.unmake_move()
+
+
+@pytest.mark.parametrize("name", ["kiwipete", "position4", "position5"])
+def test_incremental_scores_match_full_rebuild(name):
+    check_scores(Game(Fen(PERFT_POSITIONS[name][0])), 2)
+
+
+def test_start_position_is_level(starting_game: Game):
+    assert starting_game.phase == TOTAL_PHASE
+    assert evaluate(starting_game) == 0
+
+
+def test_mirrored_position_is_level():
+    game = Game(Fen(PERFT_POSITIONS["position4"][0]))
+    mirrored = Game(
+        Fen("r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1")
+    )
+    assert evaluate(game) == evaluate(mirrored)
+
+
+def test_evaluation_is_from_side_to_move():
+    white = Game(Fen("4k3/8/8/8/8/8/8/3QK3 w - - 0 1"))
+    black = Game(Fen("4k3/8/8/8/8/8/8/3QK3 b - - 0 1"))
+    assert evaluate(white) > 800
+    assert evaluate(black) == -evaluate(white)
+
+
+def test_endgame_tables_take_over_without_pieces():
+    game = Game(Fen("8/8/8/4k3/8/8/4P3/4K3 w - - 0 1"))
+    assert game.phase == 0
+    assert evaluate(game) == game.eg_score
+
+
+def test_promotion_updates_material():
+    game = Game(Fen("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1"))
+    before = evaluate(game)
+    queen = [move for move in game.generate_legal_moves() if str(move) == "b7b8q"][0]
+    game.make_move(queen)
+    assert -evaluate(game) > before + 700
+    game.unmake_move()
+    assert evaluate(game) == before
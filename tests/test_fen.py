@@ -0,0 +1,118 @@
+import io
+
+import pytest
+
+from chess.exceptions import FENError
+from chess.fen import STARTING_FEN_STR, Fen, parse_epd, read_fens
+from chess.game import Game, load_positions
+from chess.perft import PERFT_POSITIONS
+
+
+def test_fields_are_parsed_once_into_types():
+    fen = Fen("r3k2r/8/8/3pP3/8/8/8/R3K2R w Kq d6 3 42")
+    assert fen.board_str == "r3k2r/8/8/3pP3/8/8/8/R3K2R"
+    assert fen.turn == "w"
+    assert fen.castles == "Kq"
+    assert fen.en_passant == (6, 4)
+    assert fen.halfmove_clock == 3
+    assert fen.fullmove_number == 42
+
+
+def test_move_counters_default_when_left_out():
+    fen = Fen("4k3/8/8/8/8/8/8/4K3 b - -")
+    assert (fen.halfmove_clock, fen.fullmove_number) == (0, 1)
+    assert str(fen) == "4k3/8/8/8/8/8/8/4K3 b - - 0 1"
+
+
+@pytest.mark.parametrize(
+    "fen_str",
+    [
+        "",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+        "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "rnbqkbnr/pppppppp/7/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQ - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNP w kq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KKkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e4 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - x 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 0",
+        "4k3/8/8/8/8/8/8/4K3 w K - 0 1",
+        "r3k2r/8/8/8/8/8/8/R4K1R w KQkq - 0 1",
+        "r3k1r1/8/8/8/8/8/8/R3K2R w KQkq - 0 1",
+    ],
+)
+def test_invalid_fens_are_rejected(fen_str):
+    with pytest.raises(FENError):
+        Fen(fen_str)
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+@pytest.mark.parametrize(
+    "fen_str", [fen_str for fen_str, _ in PERFT_POSITIONS.values()]
+)
+def test_to_fen_round_trips(fen_str, backend):
+    assert str(Game(Fen(fen_str), backend=backend).to_fen()) == str(Fen(fen_str))
+
+
+def test_to_fen_follows_moves():
+    game = Game(Fen(STARTING_FEN_STR))
+    for uci in ("e2e4", "c7c5", "g1f3", "d8a5", "e1e2"):
+        game.make_move(game.parse_uci(uci))
+    assert str(game.to_fen()) == (
+        "rnb1kbnr/pp1ppppp/8/q1p5/4P3/5N2/PPPPKPPP/RNBQ1B1R b kq - 3 3"
+    )
+    while game.move_stack:
+        game.unmake_move()
+    assert str(game.to_fen()) == STARTING_FEN_STR
+
+
+def test_set_fen_resets_the_game_in_place():
+    game = Game(Fen(STARTING_FEN_STR), backend="bitboard")
+    board = game.board
+    game.make_move(game.parse_uci("e2e4"))
+    fen = Fen("4k3/8/8/8/8/8/4P3/4K3 b - - 7 30")
+    game.set_fen(fen)
+    assert game.board is board
+    assert game.move_stack == [] and len(game.key_history) == 0
+    assert game.to_fen() == fen
+    assert game.zobrist_key == Game(fen, backend="bitboard").zobrist_key
+
+
+def test_parse_epd_operations():
+    fen, operations = parse_epd(
+        '2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - bm Qg6; id "WAC.001";'
+    )
+    assert fen.turn == "w" and fen.fullmove_number == 1
+    assert operations == {"bm": "Qg6", "id": "WAC.001"}
+
+    fen, operations = parse_epd(
+        "4k3/8/8/8/8/8/8/4K3 w - - hmvc 12; fmvn 40; am Kd1 Kf1;"
+    )
+    assert (fen.halfmove_clock, fen.fullmove_number) == (12, 40)
+    assert operations["am"] == "Kd1 Kf1"
+
+    with pytest.raises(FENError):
+        parse_epd("4k3/8/8/8/8/8/8/4K3 w - - bm Kd1")
+
+
+def test_load_positions_reuses_one_game():
+    stream = io.StringIO(
+        "# perft positions\n"
+        f"{STARTING_FEN_STR}\n"
+        "\n"
+        '4k3/8/8/8/8/8/8/4K3 b - - id "bare kings";\n'
+    )
+    loaded = [
+        (id(game), str(game.to_fen()), operations)
+        for game, operations in load_positions(stream)
+    ]
+    assert loaded[0][0] == loaded[1][0]
+    assert [fen_str for _, fen_str, _ in loaded] == [
+        STARTING_FEN_STR,
+        "4k3/8/8/8/8/8/8/4K3 b - - 0 1",
+    ]
+    assert loaded[1][2] == {"id": "bare kings"}
+    assert len(list(read_fens(io.StringIO(f"{STARTING_FEN_STR}\n")))) == 1
@@ -1,7 +1,10 @@
 import logging
 import pytest
 
+from chess import tracing
+from chess.fen import Fen
 from chess.game import Game
+from chess.move import Move, code_to_uci
 
 # Configure logging
 logging.basicConfig(
@@ -11,8 +14,8 @@ logging.basicConfig(
 
 
 def test_board_setup_from_fen(starting_game: Game):
-    print(starting_game.board)
-    assert starting_game.board.board == [
+    ranks = starting_game.board.board[::-1]
+    assert [[piece.piece_str for piece in rank] for rank in ranks] == [
         ['r', 'n', 'b', 'q', 'k', 'b', 'n', 'r'],
         ['p', 'p', 'p', 'p', 'p', 'p', 'p', 'p'],
         ['.', '.', '.', '.', '.', '.', '.', '.'],
@@ -29,15 +32,15 @@ def test_board_setup_from_fen_with_castles(starting_game: Game):
 
 
 def test_board_setup_from_fen_with_en_passant(starting_game: Game):
-    assert starting_game.en_passant == "-"
+    assert starting_game.en_passant == (-1, -1)
 
 
 def test_board_setup_from_fen_with_halfmove_clock(starting_game: Game):
-    assert starting_game.halfmove_clock == "0"
+    assert starting_game.halfmove_clock == 0
 
 
 def test_board_setup_from_fen_with_fullmove_number(starting_game: Game):
-    assert starting_game.fullmove_number == "1"
+    assert starting_game.fullmove_number == 1
 
 
 @pytest.mark.parametrize("row, col, expected_moves", [
@@ -49,4 +52,251 @@ def test_board_setup_from_fen_with_fullmove_number(starting_game: Game):
     (1, 5, []),
 ], ids=["pawn", "rook", "knight", "bishop", "queen", "king"])
 def test_board_get_legal_moves(starting_game: Game, row, col, expected_moves):
-    assert set(starting_game.get_legal_moves(row, col)) == set(expected_moves)
+    moves = starting_game.get_legal_moves(row, col)
+    assert set(moves) == {Move((row, col), end_pos) for end_pos in expected_moves}
+
+
+def test_unmake_move_restores_position(starting_game: Game):
+    before = str(starting_game.board)
+    starting_game.make_move(Move((2, 5), (4, 5)))
+    assert starting_game.en_passant == (3, 5)
+    assert starting_game.current_player == -1
+
+    assert starting_game.unmake_move() == Move((2, 5), (4, 5))
+    assert str(starting_game.board) == before
+    assert starting_game.en_passant == (-1, -1)
+    assert starting_game.current_player == 1
+    assert starting_game.move_stack == []
+
+
+def test_unmake_move_restores_capture():
+    game = Game(Fen("4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1"))
+    before = str(game.board)
+    game.make_move(Move((4, 5), (5, 4)))
+    assert game.captured[-1][0].piece_str == "p"
+
+    game.unmake_move()
+    assert str(game.board) == before
+    assert game.captured == {1: [], -1: []}
+
+
+def test_unmake_move_restores_en_passant_capture():
+    game = Game(Fen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"))
+    before = str(game.board)
+    game.make_move(Move((5, 5), (6, 4)))
+    assert game.board.get_piece(5, 4).name == "Empty"
+
+    game.unmake_move()
+    assert str(game.board) == before
+    assert game.en_passant == (6, 4)
+
+
+def test_unmake_move_restores_castling():
+    game = Game(Fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"))
+    before = str(game.board)
+    game.make_move(Move((1, 5), (1, 7)))
+    assert game.board.get_piece(1, 6).name == "Rook"
+    assert game.castles == "kq"
+
+    game.unmake_move()
+    assert str(game.board) == before
+    assert game.castles == "KQkq"
+
+
+def test_castling_blocked_through_check():
+    game = Game(Fen("4kr2/8/8/8/8/8/8/R3K2R w KQ - 0 1"))
+    assert Move((1, 5), (1, 7)) not in game.get_legal_moves(1, 5)
+    assert Move((1, 5), (1, 3)) in game.get_legal_moves(1, 5)
+
+
+LEGAL_MOVE_POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    # Pinned knight and bishop
+    "4k3/4r3/8/8/b7/8/3N4/4K3 w - - 0 1",
+    # Single check that can be blocked or captured
+    "4k3/8/8/8/8/8/3q4/R3K2R w KQ - 0 1",
+    # Double check: only king moves
+    "4k3/8/8/8/8/5n2/8/4K2r w - - 0 1",
+    # En passant capture would expose the king along the rank
+    "8/8/8/KPp4r/8/8/8/7k w - c6 0 1",
+    # En passant capture of the checking pawn
+    "8/8/8/2k5/3Pp3/8/8/4K3 b - d3 0 1",
+]
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+@pytest.mark.parametrize("fen_str", LEGAL_MOVE_POSITIONS)
+def test_generate_legal_moves_matches_make_unmake(backend, fen_str):
+    game = Game(Fen(fen_str), backend=backend)
+    expected = set()
+    for location in game.get_piece_locations(game.current_player):
+        expected |= {
+            (move.start_pos, move.end_pos) for move in game.get_legal_moves(*location)
+        }
+    generated = [(move.start_pos, move.end_pos) for move in game.generate_legal_moves()]
+    assert len(generated) == len(set(generated))
+    assert set(generated) == expected
+
+
+def test_generate_legal_moves_double_check_only_king_moves():
+    game = Game(Fen("4k3/8/8/8/8/5n2/8/4K2r w - - 0 1"))
+    assert {move.start_pos for move in game.generate_legal_moves()} == {(1, 5)}
+
+
+def test_generate_legal_moves_en_passant_discovered_check():
+    game = Game(Fen("8/8/8/KPp4r/8/8/8/7k w - c6 0 1"))
+    assert ((5, 2), (6, 3)) not in {
+        (move.start_pos, move.end_pos) for move in game.generate_legal_moves()
+    }
+
+
+@pytest.mark.parametrize("fen_str", LEGAL_MOVE_POSITIONS)
+def test_piece_index_follows_moves(fen_str):
+    game = Game(Fen(fen_str))
+    board = game.board
+    for code in game.generate_legal_move_codes():
+        game.make_move(code)
+        for colour in (1, -1):
+            expected = [
+                sq for sq in range(64) if board.piece_at(sq).colour == colour
+            ]
+            assert sorted(board.squares_of(colour)) == expected
+        for piece_str, squares in board.piece_index.items():
+            assert all(board.piece_at(sq).piece_str == piece_str for sq in squares)
+        game.unmake_move()
+    assert board.find_king(1) == Game(Fen(fen_str)).board.find_king(1)
+
+
+def test_is_legal():
+    game = Game(Fen("4k3/8/8/8/8/8/4r3/4K2R w K - 0 1"))
+    assert game.is_legal(game.parse_uci("e1e2"))
+    assert not game.is_legal(game.parse_uci("e1f2"))
+    assert not game.is_legal(game.parse_uci("e1g1"))
+    assert not game.is_legal(game.parse_uci("e2e1"))
+    assert game.move_stack == []
+
+
+SEE_POSITIONS = [
+    # Rook takes a pawn defended only by a rook behind it on the file
+    ("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1", "e1e5", 1),
+    # Knight takes a pawn; the x-rayed queen and rook do not save the trade
+    ("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "d3e5", -2),
+    ("4k3/8/4p3/3n4/8/8/3Q4/4K3 w - - 0 1", "d2d5", -6),
+    # The king may only recapture a piece nothing defends
+    ("8/8/4k3/3p4/8/8/8/3RK3 w - - 0 1", "d1d5", -4),
+    ("8/8/4k3/3p4/2P5/8/8/3RK3 w - - 0 1", "d1d5", 1),
+    ("8/8/4k3/3q4/2P5/8/8/4K3 w - - 0 1", "c4d5", 8),
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6", 1),
+    ("1r2k3/P7/8/8/8/8/8/4K3 w - - 0 1", "a7b8q", 13),
+]
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+@pytest.mark.parametrize("fen_str, uci, expected", SEE_POSITIONS)
+def test_see(backend, fen_str, uci, expected):
+    game = Game(Fen(fen_str), backend=backend)
+    before = str(game.board)
+    assert game.see(game.parse_uci(uci)) == expected
+    assert str(game.board) == before
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+def test_see_follows_moves(backend):
+    game = Game(Fen("4k3/8/4p3/3n4/8/8/3Q4/4K3 w - - 0 1"), backend=backend)
+    capture = game.parse_uci("d2d5")
+    assert game.see(capture) == -6
+    game.make_move(game.parse_uci("e1f1"))
+    game.make_move(game.parse_uci("e6e5"))
+    # The defending pawn has moved, so the knight now hangs
+    assert game.see(game.parse_uci("d2d5")) == 3
+    game.unmake_move()
+    game.unmake_move()
+    assert game.see(capture) == -6
+
+
+def test_halfmove_clock_follows_moves(starting_game: Game):
+    game = starting_game
+    for uci, clock in [("g1f3", 1), ("g8f6", 2), ("e2e4", 0), ("f6e4", 0), ("b1c3", 1)]:
+        game.make_move(game.parse_uci(uci))
+        assert game.halfmove_clock == clock
+    game.unmake_move()
+    game.unmake_move()
+    assert game.halfmove_clock == 0
+    game.unmake_move()
+    assert game.halfmove_clock == 2
+    assert len(game.key_history) == 2
+
+
+def test_threefold_repetition(starting_game: Game):
+    game = starting_game
+    shuffle = ["g1f3", "g8f6", "f3g1", "f6g8"]
+    for uci in shuffle:
+        game.make_move(game.parse_uci(uci))
+    assert game.repetitions() == 1
+    assert not game.is_threefold_repetition()
+    for uci in shuffle:
+        game.make_move(game.parse_uci(uci))
+    assert game.is_threefold_repetition()
+    assert game.outcome() == "threefold repetition"
+    game.unmake_move()
+    assert game.repetitions() == 1
+
+
+def test_repetitions_stop_at_irreversible_moves(starting_game: Game):
+    game = starting_game
+    for uci in ["g1f3", "g8f6", "f3g1", "f6g8", "e2e3"]:
+        game.make_move(game.parse_uci(uci))
+    for uci in ["g8f6", "g1f3", "f6g8", "f3g1"]:
+        game.make_move(game.parse_uci(uci))
+    assert game.repetitions() == 1
+
+
+def test_fifty_move_rule():
+    game = Game(Fen("4k3/8/8/8/8/8/8/R3K3 w - - 99 80"))
+    assert not game.is_fifty_move_rule()
+    game.make_move(game.parse_uci("a1a2"))
+    assert game.is_fifty_move_rule()
+    assert game.outcome() == "fifty-move rule"
+    game.unmake_move()
+    game.make_move(game.parse_uci("e1e2"))
+    assert game.halfmove_clock == 100
+
+
+def test_outcome_checkmate_and_stalemate():
+    assert Game(Fen("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1")).outcome() == "checkmate"
+    assert Game(Fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")).outcome() == "stalemate"
+    assert Game().outcome() is None
+
+
+def test_make_move_rejects_wrong_side(starting_game: Game):
+    starting_game.make_move(Move((7, 5), (5, 5)))
+    assert starting_game.move_stack == []
+
+
+def test_make_move_is_silent_without_tracing(capsys, caplog, monkeypatch):
+    monkeypatch.setattr(tracing, "enabled", False)
+    with caplog.at_level(logging.DEBUG):
+        game = Game()
+        game.perft(2)
+        game.make_move(Move((2, 5), (4, 5)))
+    assert capsys.readouterr().out == ""
+    assert caplog.records == []
+
+
+def test_tracing_logs_moves(caplog, monkeypatch):
+    monkeypatch.setattr(tracing, "enabled", True)
+    with caplog.at_level(logging.DEBUG, logger="chess"):
+        Game().make_move(Move((2, 5), (4, 5)))
+    assert any("made e2e4" in record.getMessage() for record in caplog.records)
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+def test_castling_needs_the_rook_at_home(backend):
+    game = Game(Fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1"), backend=backend)
+    # A right left over without its rook, as a bad FEN used to allow
+    game.castles = "K"
+    legal = [code_to_uci(code) for code in game.generate_legal_move_codes()]
+    assert "e1g1" not in legal
+    assert game.perft(2) == 25
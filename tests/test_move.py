@@ -0,0 +1,92 @@
+import pytest
+
+from chess.fen import Fen
+from chess.game import Game
+from chess.move import (
+    CAPTURE,
+    DOUBLE_PAWN_PUSH,
+    EN_PASSANT,
+    KING_CASTLE,
+    PROMOTION,
+    QUEEN_CASTLE,
+    Move,
+    code_flags,
+    code_to_uci,
+    encode,
+    promotion_kind,
+)
+
+CASTLING_FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+PROMOTION_FEN = "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1"
+
+
+def test_code_layout():
+    code = encode(12, 28, DOUBLE_PAWN_PUSH)
+    assert code < 1 << 16
+    assert code & 63 == 12
+    assert (code >> 6) & 63 == 28
+    assert code_flags(code) == DOUBLE_PAWN_PUSH
+    assert code_to_uci(code) == "e2e4"
+
+
+def test_promotion_codes():
+    code = encode(52, 61, PROMOTION | CAPTURE | 3)
+    assert promotion_kind(code) == "q"
+    assert code_to_uci(code) == "e7f8q"
+    assert promotion_kind(encode(12, 28)) is None
+
+
+@pytest.mark.parametrize("uci", ["e2e4", "a7a8q", "h2h1n", "e1g1"])
+def test_uci_round_trip(uci):
+    move = Move.from_uci(uci)
+    assert str(move) == uci
+    assert Move.from_uci(uci) == move
+
+
+@pytest.mark.parametrize("uci", ["", "e2", "e2e9", "i2i4", "a7a8k", "e2e4qq"])
+def test_from_uci_rejects_bad_input(uci):
+    with pytest.raises(ValueError):
+        Move.from_uci(uci)
+
+
+@pytest.mark.parametrize(
+    "fen_str, uci, flags",
+    [
+        (CASTLING_FEN, "e1g1", KING_CASTLE),
+        (CASTLING_FEN, "e1c1", QUEEN_CASTLE),
+        (CASTLING_FEN, "e5f7", CAPTURE),
+        (CASTLING_FEN, "a2a4", DOUBLE_PAWN_PUSH),
+        (CASTLING_FEN, "a2a3", 0),
+        ("8/8/8/3pP3/8/8/8/4K2k w - d6 0 1", "e5d6", EN_PASSANT),
+        (PROMOTION_FEN, "g2g1r", PROMOTION | 2),
+        (PROMOTION_FEN, "g2h1n", PROMOTION | CAPTURE),
+    ],
+)
+def test_parse_uci_sets_flags(fen_str, uci, flags):
+    game = Game(Fen(fen_str))
+    code = game.parse_uci(uci)
+    assert code_flags(code) == flags
+    assert code_to_uci(code) == uci
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+@pytest.mark.parametrize("fen_str", [CASTLING_FEN, PROMOTION_FEN])
+def test_generated_codes_match_moves(fen_str, backend):
+    game = Game(Fen(fen_str), backend=backend)
+    codes = game.generate_legal_move_codes()
+    moves = game.generate_legal_moves()
+    assert [Move.from_code(code) for code in codes] == moves
+    assert [game.encode_move(move) for move in moves] == codes
+
+
+def test_make_move_accepts_codes():
+    by_move = Game(Fen(CASTLING_FEN))
+    by_code = Game(Fen(CASTLING_FEN))
+    for uci in ["e1c1", "h3g2", "d5e6", "g2h1q"]:
+        by_move.make_move(Move.from_uci(uci))
+        by_code.make_move(by_code.parse_uci(uci))
+        assert str(by_move.board) == str(by_code.board)
+        assert by_move.zobrist_key == by_code.zobrist_key
+        assert by_move.castles == by_code.castles
+    code = by_code.move_stack[-1][1]
+    assert by_code.unmake_move() == code
@@ -0,0 +1,46 @@
+from chess.fen import Fen
+from chess.game import Game
+from chess.parallel import (
+    analyse_positions,
+    main,
+    parallel_divide,
+    parallel_perft,
+    scaling,
+)
+from chess.perft import PERFT_POSITIONS
+
+KIWIPETE = PERFT_POSITIONS["kiwipete"][0]
+
+
+def test_parallel_divide_matches_divide():
+    counts = parallel_divide(KIWIPETE, 2, workers=2)
+    assert counts == Game(Fen(KIWIPETE)).divide(2)
+    assert list(counts) == sorted(counts)
+
+
+def test_parallel_perft_counts():
+    nodes, seconds = parallel_perft(PERFT_POSITIONS["position3"][0], 3, workers=2)
+    assert nodes == 2812
+    assert seconds > 0
+    assert parallel_perft(PERFT_POSITIONS["start"][0], 1, workers=2)[0] == 20
+
+
+def test_analyse_positions_keeps_order():
+    fen_strs = [
+        "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+        "4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1",
+    ]
+    results = analyse_positions(fen_strs, 2, workers=2)
+    assert [result.fen for result in results] == fen_strs
+    assert [result.best_move for result in results] == ["d1d8", "d2d5"]
+    assert all(result.nodes > 0 for result in results)
+
+
+def test_scaling_reports_each_worker_count():
+    runs = scaling(PERFT_POSITIONS["position3"][0], 2, [1, 2])
+    assert [(workers, nodes) for workers, nodes, _ in runs] == [(1, 191), (2, 191)]
+
+
+def test_parallel_cli(capsys):
+    assert main(["--workers", "2", "perft", "2", "--position", "position3"]) == 0
+    assert "nodes 191" in capsys.readouterr().out
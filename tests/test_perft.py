@@ -0,0 +1,48 @@
+import pytest
+
+from chess.fen import Fen
+from chess.game import Game
+from chess.perft import PERFT_POSITIONS, main, run_perft
+
+# Node budget for the fast tier; anything deeper only runs with --runslow
+FAST_NODE_LIMIT = 10_000
+
+
+def perft_cases():
+    cases = []
+    for name, (fen_str, expected) in PERFT_POSITIONS.items():
+        for depth, nodes in enumerate(expected[:4], start=1):
+            marks = [] if nodes <= FAST_NODE_LIMIT else [pytest.mark.slow]
+            cases.append(
+                pytest.param(fen_str, depth, nodes, id=f"{name}-{depth}", marks=marks)
+            )
+    return cases
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+@pytest.mark.parametrize("fen_str, depth, expected", perft_cases())
+def test_perft(backend, fen_str, depth, expected):
+    nodes, seconds = run_perft(fen_str, depth, backend)
+    assert nodes == expected
+
+
+def test_divide_sums_to_perft():
+    game = Game(Fen(PERFT_POSITIONS["kiwipete"][0]))
+    counts = game.divide(2)
+    assert len(counts) == 48
+    assert sum(counts.values()) == game.perft(2)
+    assert counts["e1g1"] == 43
+
+
+def test_perft_leaves_game_unchanged():
+    game = Game(Fen(PERFT_POSITIONS["position4"][0]))
+    before = str(game.board)
+    game.perft(2)
+    assert str(game.board) == before
+    assert game.castles == "kq"
+    assert game.move_stack == []
+
+
+def test_perft_cli(capsys):
+    assert main(["2", "--position", "position3"]) == 0
+    assert "nodes 191" in capsys.readouterr().out
@@ -0,0 +1,118 @@
+import io
+
+import pytest
+
+from chess.exceptions import PGNError
+from chess.fen import Fen
+from chess.game import Game
+from chess.move import code_to_uci
+from chess.pgn import (
+    format_game,
+    format_san,
+    main,
+    parse_san,
+    read_games,
+    write_game,
+)
+
+PGN = """[Event "Casual"]
+[White "Morphy, \\"Paul\\""]
+[Black "Duke Karl / Count Isouard"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 d6 3. d4 Bg4 {This is a weak move
+already.} 4. dxe5 Bxf3 5. Qxf3 dxe5 6. Bc4 Nf6 7. Qb3 Qe7 8. Nc3 c6 9. Bg5 b5
+10. Nxb5 cxb5 11. Bxb5+ Nbd7 12. O-O-O Rd8 13. Rxd7 Rxd7 (13... Nxd7 14. Qb3)
+14. Rd1 Qe6 $1 15. Bxd7+ Nxd7 16. Qb8+ Nxb8 17. Rd8# 1-0
+
+[Event "Short"]
+[Result "0-1"]
+; a comment line
+1. f3 e5 2. g4?? Qh4# 0-1
+"""
+
+
+def test_read_games():
+    games = list(read_games(io.StringIO(PGN)))
+    assert len(games) == 2
+    first, second = games
+    assert first.headers["White"] == 'Morphy, "Paul"'
+    assert first.result == "1-0"
+    assert len(first.sans) == 33
+    assert first.sans[-1] == "Rd8#"
+    assert second.sans == ["f3", "e5", "g4??", "Qh4#"]
+    assert second.result == "0-1"
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_replay_resolves_moves(validate):
+    game = next(read_games(io.StringIO(PGN)))
+    moves = [code_to_uci(code) for code in game.moves(validate)]
+    assert moves[:4] == ["e2e4", "e7e5", "g1f3", "d7d6"]
+    assert moves[22] == "e1c1"
+    assert moves[-1] == "d1d8"
+    # Once the replay is exhausted the last move has been played too
+    final = list(game.replay(validate))[-1][0]
+    assert final.check_if_in_check() and not final.generate_legal_move_codes()
+
+
+def test_parse_san_disambiguation_and_promotion():
+    game = Game(Fen("4k3/1P6/8/8/R6R/8/8/4K3 w - - 0 1"))
+    assert code_to_uci(parse_san(game, "Rad4")) == "a4d4"
+    assert code_to_uci(parse_san(game, "b8=N")) == "b7b8n"
+    assert code_to_uci(parse_san(game, "b8Q+")) == "b7b8q"
+    with pytest.raises(PGNError, match="ambiguous"):
+        parse_san(game, "Rd4")
+    with pytest.raises(PGNError, match="illegal"):
+        parse_san(game, "Nf3")
+    with pytest.raises(PGNError, match="cannot read"):
+        parse_san(game, "Zz9")
+
+
+def test_parse_san_skips_pinned_pieces_without_validation():
+    # The knight on e2 is pinned, so Nc3 can only be the b1 knight
+    game = Game(Fen("4r1k1/8/8/8/8/8/4N3/1N2K3 w - - 0 1"))
+    assert code_to_uci(parse_san(game, "Nc3", validate=False)) == "b1c3"
+
+
+def test_format_san():
+    game = Game(Fen("r3k2r/1P6/8/8/8/8/8/R3K2R w KQkq - 0 1"))
+    assert format_san(game, game.parse_uci("e1g1")) == "O-O"
+    assert format_san(game, game.parse_uci("b7a8q")) == "bxa8=Q+"
+    assert format_san(game, game.parse_uci("a1a8")) == "Rxa8+"
+    assert format_san(game, game.parse_uci("h1h7")) == "Rh7"
+
+
+def test_written_games_read_back():
+    source = next(read_games(io.StringIO(PGN)))
+    codes = source.moves()
+    output = io.StringIO()
+    write_game(output, codes, {"Event": "Casual"}, result="1-0")
+    text = output.getvalue()
+    assert text.startswith('[Event "Casual"]\n[Site "?"]')
+    assert "12. O-O-O Rd8" in text
+    assert all(len(line) <= 80 for line in text.splitlines())
+    assert next(read_games(io.StringIO(text))).moves() == codes
+
+
+def test_written_game_from_a_position():
+    fen_str = "4k3/8/8/8/8/8/8/4K2R b K - 0 30"
+    game = Game(Fen(fen_str))
+    codes = [game.parse_uci("e8d7")]
+    text = format_game(codes, fen_str=fen_str)
+    assert '[FEN "4k3/8/8/8/8/8/8/4K2R b K - 0 30"]' in text
+    assert "30... Kd7 *" in text
+    assert next(read_games(io.StringIO(text))).moves() == codes
+
+
+def test_bad_fen_tag_is_a_pgn_error(tmp_path, capsys):
+    text = '[FEN "not a fen"]\n\n1. e4 *\n\n1. d4 d5 *\n'
+    game = next(read_games(io.StringIO(text)))
+    with pytest.raises(PGNError, match="bad FEN tag"):
+        game.moves()
+    path = tmp_path / "games.pgn"
+    path.write_text(text)
+    assert main([str(path)]) == 0
+    output = capsys.readouterr().out
+    assert "game 1: bad FEN tag" in output
+    assert "games 2 moves 2 errors 1" in output
@@ -0,0 +1,36 @@
+import copy
+import pickle
+
+import pytest
+
+from chess.board import Board
+from chess.pieces import EMPTY_SQUARE, Empty, King, Knight, Pawn, Queen
+
+
+def test_pieces_are_shared_per_type_and_colour():
+    assert Knight(1) is Knight(1)
+    assert Knight(1) is not Knight(-1)
+    assert Empty() is EMPTY_SQUARE
+    assert Queen(-1).piece_str == "q"
+    assert King(1).piece_str == "K"
+    assert Pawn(1).func("n") == "N"
+
+
+def test_pieces_are_immutable():
+    with pytest.raises(AttributeError):
+        Knight(1).colour = -1
+
+
+def test_copying_keeps_identity():
+    board = Board()
+    copied = copy.deepcopy(board)
+    assert copied.get_piece(1, 2) is Knight(1)
+    assert copied.get_piece(4, 4) is EMPTY_SQUARE
+    assert pickle.loads(pickle.dumps(Knight(-1))) is Knight(-1)
+    assert pickle.loads(pickle.dumps(EMPTY_SQUARE)) is EMPTY_SQUARE
+
+
+def test_board_holds_flyweights():
+    board = Board()
+    assert board.get_piece(0, 0) is EMPTY_SQUARE
+    assert board.get_piece(2, 1) is board.get_piece(2, 8) is Pawn(1)
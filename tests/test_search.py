@@ -0,0 +1,159 @@
+import time
+
+from chess.fen import Fen
+from chess.game import Game
+from chess.move import code_to_uci
+from chess.search import (
+    EXACT,
+    INFINITY,
+    LOWER_BOUND,
+    MATE_THRESHOLD,
+    Search,
+    TranspositionTable,
+)
+
+
+def test_finds_back_rank_mate():
+    game = Game(Fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1"))
+    result = Search(game).search(depth=3)
+    assert str(result.best_move) == "d1d8"
+    assert result.score >= MATE_THRESHOLD
+    assert result.pv[0] is result.best_move
+
+
+def test_wins_hanging_queen():
+    game = Game(Fen("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1"))
+    result = Search(game).search(depth=2)
+    assert str(result.best_move) == "d2d5"
+    assert result.score > 0
+
+
+def test_quiescence_sees_recapture():
+    # Qxd5 wins a knight but loses the queen to exd5
+    game = Game(Fen("4k3/8/4p3/3n4/8/8/3Q4/4K3 w - - 0 1"))
+    result = Search(game).search(depth=1)
+    assert str(result.best_move) != "d2d5"
+
+
+def test_search_leaves_game_unchanged():
+    game = Game()
+    before = str(game.board)
+    result = Search(game).search(depth=2)
+    assert str(game.board) == before
+    assert game.move_stack == []
+    assert result.depth == 2
+    assert result.nodes > 0
+    assert result.nps > 0
+    assert len(result.pv) == 2
+
+
+def test_time_limit_stops_search():
+    game = Game()
+    start = time.perf_counter()
+    result = Search(game).search(time_limit=0.3)
+    assert time.perf_counter() - start < 1.5
+    assert result.best_move is not None
+    assert game.move_stack == []
+
+
+def test_node_limit_stops_search():
+    game = Game()
+    result = Search(game).search(nodes=2000)
+    assert result.nodes < 4000
+    assert result.best_move is not None
+
+
+def test_no_legal_moves():
+    game = Game(Fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"))
+    assert Search(game).search(depth=3).best_move is None
+
+
+def test_transposition_table_sized_from_budget():
+    table = TranspositionTable(1)
+    assert table.size == 1024 * 1024 // TranspositionTable.ENTRY_BYTES
+    assert table.keys.itemsize * table.size + table.data.itemsize * table.size == (
+        1024 * 1024
+    )
+
+
+def test_transposition_table_round_trip():
+    table = TranspositionTable(0.01)
+    key = (1 << 64) - 12345
+    table.store(key, 0x1234, 7, LOWER_BOUND, -350)
+    assert table.probe(key) == (0x1234, 7, LOWER_BOUND, -350)
+    assert table.probe(key ^ 1) is None
+
+
+def test_transposition_table_prefers_deep_entries():
+    table = TranspositionTable(0.01)
+    buckets = table.num_buckets
+    keys = [1 + buckets * index for index in range(table.BUCKET_SIZE + 1)]
+    for depth, key in enumerate(keys[:-1], start=5):
+        table.store(key, 1, depth, EXACT, 0)
+    table.store(keys[-1], 1, 1, EXACT, 0)
+    # The depth 5 entry was the shallowest in the bucket
+    assert table.probe(keys[0]) is None
+    assert all(table.probe(key) is not None for key in keys[1:])
+
+
+def test_transposition_table_replaces_old_searches_first():
+    table = TranspositionTable(0.01)
+    buckets = table.num_buckets
+    keys = [1 + buckets * index for index in range(table.BUCKET_SIZE + 1)]
+    table.store(keys[0], 1, 20, EXACT, 0)
+    table.new_search()
+    for key in keys[1:-1]:
+        table.store(key, 1, 1, EXACT, 0)
+    table.store(keys[-1], 1, 1, EXACT, 0)
+    assert table.probe(keys[0]) is None
+
+
+def test_pick_moves_stages():
+    game = Game(Fen("4k3/8/8/3p4/4P3/8/8/R3K3 w - - 0 1"))
+    search = Search(game)
+    table_move = game.parse_uci("a1a7")
+    killer = game.parse_uci("e1f2")
+    search.killers[0] = [killer, 0]
+    search.history[0][game.parse_uci("a1a2") & 4095] = 50
+    moves = []
+    for move in search.pick_moves(table_move, 0):
+        moves.append(code_to_uci(move))
+        game.make_move(move, validate=False)
+        game.unmake_move()
+    assert moves[:4] == ["a1a7", "e4d5", "e1f2", "a1a2"]
+    assert sorted(moves) == sorted(
+        code_to_uci(move) for move in game.generate_legal_move_codes()
+    )
+
+
+def test_pick_moves_skips_illegal_table_move():
+    game = Game(Fen("4k3/8/8/8/8/8/4r3/4K3 w - - 0 1"))
+    illegal = game.parse_uci("e1e2") ^ (1 << 14)  # quiet flags on a capture
+    moves = list(Search(game).pick_moves(illegal, 0))
+    assert illegal not in moves
+    assert code_to_uci(moves[0]) == "e1e2"
+
+
+def test_quiet_cutoffs_become_killers():
+    game = Game()
+    search = Search(game)
+    search.search(depth=3)
+    assert any(any(killers) for killers in search.killers)
+    assert any(search.history[0]) or any(search.history[1])
+
+
+def test_losing_captures_are_picked_last():
+    # Rxd5 loses the rook to exd5
+    game = Game(Fen("4k3/8/4p3/3p4/8/8/3R4/4K3 w - - 0 1"))
+    moves = [code_to_uci(move) for move in Search(game).pick_moves(0, 0)]
+    assert moves[-1] == "d2d5"
+
+
+def test_repetition_is_scored_as_a_draw():
+    game = Game()
+    for uci in ["g1f3", "g8f6", "f3g1", "f6g8"]:
+        game.make_move(game.parse_uci(uci))
+    search = Search(game)
+    assert search.negamax(3, -INFINITY, INFINITY, 1) == 0
+    # The root is always searched
+    assert search.search(depth=1).best_move is not None
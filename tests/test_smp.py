@@ -0,0 +1,85 @@
+import multiprocessing
+import threading
+
+from chess.search import EXACT, LOWER_BOUND, MATE_THRESHOLD
+from chess.smp import LazySMP, SharedTranspositionTable, benchmark
+
+
+def _store(name, size_mb, key):
+    table = SharedTranspositionTable(size_mb, name=name)
+    table.store(key, 0x0ABC, 9, LOWER_BOUND, 123)
+    table.close()
+
+
+def test_shared_table_is_visible_across_processes():
+    table = SharedTranspositionTable(0.01)
+    try:
+        key = (1 << 63) + 77
+        process = multiprocessing.get_context().Process(
+            target=_store, args=(table.name, 0.01, key)
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        assert table.probe(key) == (0x0ABC, 9, LOWER_BOUND, 123)
+    finally:
+        table.close()
+
+
+def test_torn_entries_read_as_misses():
+    table = SharedTranspositionTable(0.01)
+    try:
+        key = 12345
+        table.store(key, 1, 3, EXACT, 0)
+        index = next(i for i in range(table.size) if table.data[i])
+        # Data from a different write than the key it was stored with
+        table.data[index] ^= 1 << 16
+        assert table.probe(key) is None
+    finally:
+        table.close()
+
+
+def test_lazy_smp_finds_mate():
+    smp = LazySMP(threads=2, hash_mb=1)
+    try:
+        result = smp.search("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", depth=3)
+        assert str(result.best_move) == "d1d8"
+        assert result.score >= MATE_THRESHOLD
+    finally:
+        smp.close()
+
+
+def test_lazy_smp_plays_moves_and_respects_limits():
+    smp = LazySMP(threads=2, hash_mb=1)
+    try:
+        result = smp.search(moves=("e2e4", "e7e5"), time_limit=0.3)
+        assert result.best_move is not None
+        assert result.nodes > 0
+    finally:
+        smp.close()
+
+
+def test_helpers_are_reused_from_a_thread():
+    smp = LazySMP(threads=2, hash_mb=1)
+    try:
+        pids = [helper.pid for helper in smp.helpers]
+        results = []
+        worker = threading.Thread(
+            target=lambda: results.extend(
+                smp.search(moves=moves, depth=2) for moves in ((), ("e2e4",))
+            )
+        )
+        worker.start()
+        worker.join()
+        assert [helper.pid for helper in smp.helpers] == pids
+        assert all(helper.is_alive() for helper in smp.helpers)
+        assert len(results) == 2 and all(result.nodes > 0 for result in results)
+    finally:
+        smp.close()
+    assert smp.helpers == []
+
+
+def test_benchmark_reports_each_thread_count():
+    runs = benchmark(["4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1"], 2, [1, 2], hash_mb=1)
+    assert [threads for threads, _, _ in runs] == [1, 2]
+    assert all(seconds > 0 and nodes > 0 for _, seconds, nodes in runs)
@@ -0,0 +1,96 @@
+import pytest
+
+from chess.fen import Fen
+from chess.game import Game
+from chess.search import MATE_SCORE, Search
+from chess.smp import LazySMP
+from chess.tablebase import (
+    Table,
+    Tablebases,
+    generate,
+    material_name,
+    sub_materials,
+)
+
+
+@pytest.fixture(scope="module")
+def tablebases(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("tablebases")
+    generate("KQK", directory)
+    tablebases = Tablebases(directory)
+    yield tablebases
+    tablebases.close()
+
+
+def probe(tablebases: Tablebases, fen_str: str):
+    return tablebases.probe(Game(Fen(fen_str)))
+
+
+def test_material_names():
+    assert material_name("QK", "K") == ("KQK", False)
+    assert material_name("K", "KQ") == ("KQK", True)
+    assert material_name("KP", "KR") == ("KRKP", True)
+    assert sub_materials("KPK") == {"KK", "KQK", "KRK", "KBK", "KNK"}
+
+
+def test_symmetric_positions_share_an_index():
+    table = Table("KQK")
+    # Kc2 Qd5 ke7, then mirrored left-right, top-bottom and along a1-h8
+    base = table.index([10, 35, 52], 1)
+    assert table.index([10 ^ 7, 35 ^ 7, 52 ^ 7], 1) == base
+    assert table.index([10 ^ 56, 35 ^ 56, 52 ^ 56], 1) == base
+    assert table.index([17, 28, 38], 1) != table.index([17, 28, 38], -1)
+    pawns = Table("KPK")
+    assert pawns.index([10 ^ 7, 35 ^ 7, 52 ^ 7], 1) == pawns.index([10, 35, 52], 1)
+
+
+def test_probe_kqk(tablebases):
+    assert probe(tablebases, "7k/8/6QK/8/8/8/8/8 w - - 0 1") == (1, 1)
+    assert probe(tablebases, "7k/6Q1/6K1/8/8/8/8/8 b - - 0 1") == (-1, 0)
+    # Stalemate, and the queen hanging to the king
+    assert probe(tablebases, "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1") == (0, 0)
+    assert probe(tablebases, "7k/6Q1/8/8/8/8/8/K7 b - - 0 1") == (0, 0)
+    # Colours swapped
+    assert probe(tablebases, "8/8/8/8/8/6qk/8/7K b - - 0 1") == (1, 1)
+    assert probe(tablebases, "8/8/8/8/8/8/8/K6k w - - 0 1") == (0, 0)
+    assert probe(tablebases, "r3k3/8/8/8/8/8/8/4K3 w q - 0 1") is None
+    assert probe(tablebases, "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1") is None
+
+
+def test_probe_agrees_with_search(tablebases):
+    game = Game(Fen("6k1/8/5K2/8/8/8/8/1Q6 w - - 0 1"))
+    wdl, plies = tablebases.probe(game)
+    result = Search(game).search(depth=plies + 1)
+    assert wdl == 1
+    assert result.score == MATE_SCORE - plies
+
+
+def test_search_stops_in_table_positions(tablebases):
+    fen_str = "8/8/3k4/8/8/8/8/KQ6 w - - 0 1"
+    wdl, plies = probe(tablebases, fen_str)
+    result = Search(Game(Fen(fen_str)), tablebases=tablebases).search(depth=3)
+    assert wdl == 1
+    assert result.score == MATE_SCORE - plies
+    assert result.depth == 1
+
+
+@pytest.mark.slow
+def test_generate_kpk(tmp_path):
+    generate("KPK", tmp_path)
+    tablebases = Tablebases(tmp_path)
+    assert tablebases.probe(Game(Fen("8/8/8/8/8/8/4P3/4K2k w - - 0 1")))[0] == 1
+    assert tablebases.probe(Game(Fen("8/8/8/8/8/k7/P7/K7 w - - 0 1"))) == (0, 0)
+    # Black pawn, found by swapping colours
+    assert tablebases.probe(Game(Fen("K6k/8/8/8/8/8/7p/8 b - - 0 1")))[0] == 1
+    tablebases.close()
+
+
+def test_lazy_smp_probes_tables(tablebases):
+    fen_str = "8/8/3k4/8/8/8/8/KQ6 w - - 0 1"
+    wdl, plies = probe(tablebases, fen_str)
+    smp = LazySMP(threads=2, hash_mb=1, tablebases=tablebases)
+    try:
+        result = smp.search(fen_str, depth=3)
+    finally:
+        smp.close()
+    assert result.score == MATE_SCORE - plies
@@ -0,0 +1,51 @@
+import time
+
+from chess.fen import Fen
+from chess.game import Game
+from chess.search import Search
+from chess.timeman import TimeManager
+
+
+def test_budget_splits_clock():
+    manager = TimeManager(60_000, 1_000, moves_to_go=30, move_overhead=0)
+    assert abs(manager.soft_limit - 2.75) < 1e-9
+    assert manager.hard_limit > manager.soft_limit
+    assert manager.hard_limit <= 60 * 0.4
+
+
+def test_low_clock_never_exceeds_time_left():
+    manager = TimeManager(200, 5_000, move_overhead=50)
+    assert manager.hard_limit <= 0.15
+    assert manager.soft_limit <= manager.hard_limit
+
+
+def test_last_move_before_control_can_use_most_of_clock():
+    manager = TimeManager(10_000, moves_to_go=1, move_overhead=0)
+    assert manager.hard_limit > 5
+
+
+def test_unstable_best_move_extends_soft_limit():
+    manager = TimeManager(60_000, moves_to_go=30, move_overhead=0)
+    stable = manager.soft_limit_now()
+    manager.update(1)
+    manager.update(2)
+    manager.update(3)
+    assert manager.soft_limit_now() > stable
+    assert manager.soft_limit_now() <= min(stable * 2.5, manager.hard_limit)
+
+
+def test_search_respects_hard_deadline():
+    manager = TimeManager(1_000, move_overhead=0)
+    start = time.perf_counter()
+    result = Search(Game()).search(time_manager=manager)
+    assert time.perf_counter() - start < manager.hard_limit + 0.2
+    assert result.best_move is not None
+
+
+def test_forced_move_returns_immediately():
+    game = Game(Fen("7k/8/8/8/8/8/6r1/K7 w - - 0 1"))
+    manager = TimeManager(600_000)
+    start = time.perf_counter()
+    result = Search(game).search(time_manager=manager)
+    assert time.perf_counter() - start < 0.1
+    assert str(result.best_move) == "a1b1"
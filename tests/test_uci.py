@@ -0,0 +1,134 @@
+import io
+import time
+
+from chess.uci import UCIEngine, format_score, main
+from chess.search import MATE_SCORE
+
+
+def run(engine: UCIEngine, *lines: str) -> None:
+    for line in lines:
+        engine.handle(line)
+
+
+def make_engine() -> tuple[UCIEngine, list[str]]:
+    output = []
+    return UCIEngine(output=output.append), output
+
+
+def test_handshake():
+    engine, output = make_engine()
+    run(engine, "uci", "isready")
+    assert output[0].startswith("id name")
+    assert output[-2:] == ["uciok", "readyok"]
+
+
+def test_go_depth_reports_bestmove():
+    engine, output = make_engine()
+    run(engine, "position fen 6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", "go depth 3")
+    engine.wait()
+    assert output[-1] == "bestmove d1d8"
+    assert any(line.startswith("info depth 2 score mate 1") for line in output)
+    assert all(" hashfull " in line for line in output if line.startswith("info depth"))
+
+
+def test_position_moves_are_applied_incrementally():
+    engine, _ = make_engine()
+    run(engine, "position startpos moves e2e4 e7e5")
+    game = engine.game
+    first = game.move_stack[0]
+    run(engine, "position startpos moves e2e4 e7e5 g1f3")
+    assert engine.game is game
+    assert game.move_stack[0] is first
+    assert len(game.move_stack) == 3
+    # Taking back a move only unmakes the moves that differ
+    run(engine, "position startpos moves e2e4 c7c5")
+    assert game.move_stack[0] is first
+    assert engine.moves == ["e2e4", "c7c5"]
+    fresh, _ = make_engine()
+    run(fresh, "position startpos moves e2e4 c7c5")
+    assert str(game.board) == str(fresh.game.board)
+    assert game.zobrist_key == fresh.game.zobrist_key
+
+
+def test_illegal_moves_are_reported():
+    engine, output = make_engine()
+    run(engine, "position startpos moves e2e5")
+    assert output == ["info string illegal move e2e5"]
+    assert engine.moves == []
+
+
+def test_invalid_fen_keeps_the_position():
+    engine, output = make_engine()
+    run(engine, "position startpos moves e2e4")
+    run(engine, "position fen garbage")
+    assert output[0].startswith("info string invalid fen garbage")
+    assert engine.moves == ["e2e4"]
+    run(engine, "go depth 1")
+    engine.wait()
+    assert output[-1].startswith("bestmove")
+
+
+def test_invalid_values_are_reported():
+    engine, output = make_engine()
+    run(engine, "setoption name Hash value lots")
+    run(engine, "go depth x movetime 50")
+    engine.wait()
+    assert output[0] == "info string invalid option name Hash value lots"
+    assert output[1] == "info string invalid depth x"
+    assert output[-1].startswith("bestmove")
+    assert engine.handle("isready")
+
+
+def test_unreadable_depth_falls_back_to_a_bounded_search():
+    engine, output = make_engine()
+    run(engine, "position startpos", "go depth x")
+    engine.wait()
+    assert output[0] == "info string invalid depth x"
+    assert output[-1].startswith("bestmove")
+    assert all(not line.startswith("info depth 2") for line in output)
+    run(engine, "position startpos moves e2e4", "go depth 1")
+    engine.wait()
+    assert engine.moves == ["e2e4"]
+    assert output[-1].startswith("bestmove")
+
+
+def test_stop_ends_infinite_search_quickly():
+    engine, output = make_engine()
+    run(engine, "position startpos", "go infinite")
+    time.sleep(0.2)
+    assert not any(line.startswith("bestmove") for line in output)
+    start = time.perf_counter()
+    run(engine, "stop")
+    assert time.perf_counter() - start < 0.25
+    assert output[-1].startswith("bestmove")
+
+
+def test_ponderhit_switches_to_timed_search():
+    engine, output = make_engine()
+    run(engine, "position startpos moves e2e4", "go ponder wtime 1000 btime 1000")
+    time.sleep(0.1)
+    run(engine, "ponderhit")
+    engine.wait()
+    assert output[-1].startswith("bestmove")
+
+
+def test_go_with_clock_returns_in_time():
+    engine, output = make_engine()
+    start = time.perf_counter()
+    run(engine, "position startpos", "go wtime 3000 btime 3000 winc 0 binc 0")
+    engine.wait()
+    assert time.perf_counter() - start < 1
+    assert output[-1].startswith("bestmove")
+
+
+def test_format_score():
+    assert format_score(35) == "cp 35"
+    assert format_score(MATE_SCORE - 1) == "mate 1"
+    assert format_score(-(MATE_SCORE - 2)) == "mate -1"
+
+
+def test_main_reads_until_quit(capsys):
+    assert main(io.StringIO("uci\nquit\nisready\n")) == 0
+    out = capsys.readouterr().out
+    assert "uciok" in out
+    assert "readyok" not in out
@@ -0,0 +1,61 @@
+import pytest
+
+from chess.fen import Fen
+from chess.game import Game
+from chess.move import Move
+from chess.perft import PERFT_POSITIONS
+from chess.zobrist import compute_key
+
+
+def full_key(game: Game) -> int:
+    return compute_key(game.board, game.current_player, game.castles, game.en_passant)
+
+
+def check_keys(game: Game, depth: int) -> None:
+    """Walk the move tree checking the incremental key against a full rebuild."""
+    assert game.zobrist_key == full_key(game)
+    if depth == 0:
+        return
+    for move in game.generate_legal_moves():
+        key = game.zobrist_key
+        game.make_move(move, validate=False)
+        check_keys(game, depth - 1)
+        game.unmake_move()
+        assert game.zobrist_key == key
+
+
+@pytest.mark.parametrize("name", ["kiwipete", "position4", "position5"])
+def test_incremental_key_matches_full_rebuild(name):
+    check_keys(Game(Fen(PERFT_POSITIONS[name][0])), 2)
+
+
+def test_transposition_has_same_key(starting_game: Game):
+    start_key = starting_game.zobrist_key
+    for move in [
+        Move((1, 7), (3, 6)),
+        Move((8, 7), (6, 6)),
+        Move((3, 6), (1, 7)),
+        Move((6, 6), (8, 7)),
+    ]:
+        starting_game.make_move(move)
+    assert starting_game.zobrist_key == start_key
+
+
+def test_key_depends_on_side_castling_and_en_passant():
+    keys = {
+        Game(Fen(fen_str)).zobrist_key
+        for fen_str in [
+            "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+            "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+            "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 1",
+            "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b Kkq - 0 1",
+        ]
+    }
+    assert len(keys) == 4
+
+
+def test_key_is_the_same_for_both_backends():
+    fen_str = PERFT_POSITIONS["kiwipete"][0]
+    assert Game(Fen(fen_str)).zobrist_key == Game(
+        Fen(fen_str), backend="bitboard"
+    ).zobrist_key